@@ -1,4 +1,5 @@
 import 'package:cloud_firestore/cloud_firestore.dart';
+import 'package:hotel_booking_app/utils/image_variants.dart';
 
 class Hotel {
   final String hotelId;
@@ -16,6 +17,7 @@ class Hotel {
   final DateTime createdAt;
   final DateTime updatedAt;
   final List<String> images; // CHANGED
+  final List<Map<String, String>> imageVariants;
   final List<String> amenities;
   final List<Map<String, dynamic>>
   restaurants; // List of maps with 'name' and 'location'
@@ -37,6 +39,7 @@ class Hotel {
     required this.createdAt,
     required this.updatedAt,
     this.images = const [], // CHANGED
+    this.imageVariants = const [],
     this.amenities = const [],
     this.restaurants = const [],
     this.conferenceRoomsCount = 0,
@@ -88,6 +91,7 @@ class Hotel {
       createdAt: (map['createdAt'] as Timestamp).toDate(),
       updatedAt: (map['updatedAt'] as Timestamp).toDate(),
       images: parsedImages, // CHANGED
+      imageVariants: parseImageVariants(map['imageVariants']),
       amenities: List<String>.from(map['amenities'] ?? []),
       restaurants: List<Map<String, dynamic>>.from(map['restaurants'] ?? []),
       conferenceRoomsCount: map['conferenceRoomsCount'] ?? 0,
@@ -111,6 +115,7 @@ class Hotel {
       'createdAt': Timestamp.fromDate(createdAt),
       'updatedAt': Timestamp.fromDate(updatedAt),
       'images': images, // CHANGED
+      'imageVariants': imageVariants,
       'amenities': amenities,
       'restaurants': restaurants,
       'conferenceRoomsCount': conferenceRoomsCount,
@@ -134,6 +139,7 @@ class Hotel {
       'createdAt': createdAt.toIso8601String(),
       'updatedAt': updatedAt.toIso8601String(),
       'images': images, // CHANGED
+      'imageVariants': imageVariants,
       'amenities': amenities,
       'restaurants': restaurants,
       'conferenceRoomsCount': conferenceRoomsCount,
@@ -170,6 +176,7 @@ class Hotel {
       createdAt: DateTime.parse(json['createdAt']),
       updatedAt: DateTime.parse(json['updatedAt']),
       images: parsedImages, // CHANGED
+      imageVariants: parseImageVariants(json['imageVariants']),
       amenities: List<String>.from(json['amenities'] ?? []),
       restaurants: List<Map<String, dynamic>>.from(json['restaurants'] ?? []),
       conferenceRoomsCount: json['conferenceRoomsCount'] ?? 0,
@@ -180,4 +187,9 @@ class Hotel {
   String get description => hotelDescription;
   List<String> get imageURLs => images; // CHANGED
   List<String> get allImages => images; // CHANGED
+  // Resized images for list cards (thumb) and the detail carousel (card)
+  List<String> get thumbImages =>
+      imagesForVariant(images, imageVariants, 'thumb');
+  List<String> get cardImages =>
+      imagesForVariant(images, imageVariants, 'card');
 }
@@ -1,4 +1,5 @@
 import 'package:cloud_firestore/cloud_firestore.dart';
+import 'package:hotel_booking_app/utils/image_variants.dart';
 
 class Room {
   final String roomId;
@@ -10,6 +11,7 @@ class Room {
   final double pricePerNight;
   final List<String> amenities;
   final List<String> images;
+  final List<Map<String, String>> imageVariants;
   final bool available;
   final DateTime createdAt;
   final DateTime updatedAt;
@@ -22,6 +24,7 @@ class Room {
     required this.pricePerNight,
     required this.amenities,
     required this.images,
+    this.imageVariants = const [],
     required this.maxChildren,
     required this.maxAdults,
     required this.available,
@@ -40,6 +43,7 @@ class Room {
       pricePerNight: (map['pricePerNight'] as num).toDouble(),
       amenities: List<String>.from(map['amenities'] ?? []),
       images: List<String>.from(map['images'] ?? []),
+      imageVariants: parseImageVariants(map['imageVariants']),
       available: map['available'] ?? true,
       createdAt: (map['createdAt'] as Timestamp).toDate(),
       updatedAt: (map['updatedAt'] as Timestamp).toDate(),
@@ -57,9 +61,16 @@ class Room {
       'pricePerNight': pricePerNight,
       'amenities': amenities,
       'images': images,
+      'imageVariants': imageVariants,
       'available': available,
       'createdAt': Timestamp.fromDate(createdAt),
       'updatedAt': Timestamp.fromDate(updatedAt),
     };
   }
+
+  // Resized images for list cards (thumb) and the detail carousel (card)
+  List<String> get thumbImages =>
+      imagesForVariant(images, imageVariants, 'thumb');
+  List<String> get cardImages =>
+      imagesForVariant(images, imageVariants, 'card');
 }
@@ -176,7 +176,7 @@ class _FavoritesScreenState extends State<FavoritesScreen> {
                 borderRadius: BorderRadius.circular(8),
                 child: hotel.imageURLs.isNotEmpty
                     ? Image.network(
-                        hotel.imageURLs.first,
+                        hotel.thumbImages.first,
                         width: 90,
                         height: 90,
                         fit: BoxFit.cover,
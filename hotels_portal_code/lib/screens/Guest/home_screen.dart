@@ -256,7 +256,7 @@ class _HomeScreenState extends State<HomeScreen> {
                                             ),
                                             child: hotel.imageURLs.isNotEmpty
                                                 ? Image.network(
-                                                    hotel.imageURLs.first,
+                                                    hotel.thumbImages.first,
                                                     width: 80,
                                                     height: 80,
                                                     fit: BoxFit.cover,
@@ -175,7 +175,7 @@ class _HotelInfoScreenState extends State<HotelInfoScreen>
                                     child: ClipRRect(
                                       borderRadius: BorderRadius.circular(8),
                                       child: Image.network(
-                                        hotel.imageURLs[index],
+                                        hotel.cardImages[index],
                                         fit: BoxFit.cover,
                                         loadingBuilder:
                                             (
@@ -286,7 +286,7 @@ class _HotelInfoScreenState extends State<HotelInfoScreen>
                                                 borderRadius:
                                                     BorderRadius.circular(8),
                                                 child: Image.network(
-                                                  room.images.first,
+                                                  room.cardImages.first,
                                                   height: 150,
                                                   width: double.infinity,
                                                   fit: BoxFit.cover,
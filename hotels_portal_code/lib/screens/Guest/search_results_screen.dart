@@ -243,7 +243,7 @@ class _SearchResultsScreenState extends State<SearchResultsScreen> {
               ? ClipRRect(
                   borderRadius: BorderRadius.circular(8.0),
                   child: Image.network(
-                    hotel.imageURLs.first,
+                    hotel.cardImages.first,
                     height: 150,
                     width: double.infinity,
                     fit: BoxFit.cover,
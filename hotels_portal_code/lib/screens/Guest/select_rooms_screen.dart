@@ -377,7 +377,7 @@ class _SelectRoomsScreenState extends State<SelectRoomsScreen> {
             ClipRRect(
               borderRadius: BorderRadius.circular(8),
               child: Image.network(
-                room.images.first,
+                room.cardImages.first,
                 height: 150,
                 width: double.infinity,
                 fit: BoxFit.cover,
@@ -100,7 +100,7 @@ class _RoomDetailsScreenState extends State<RoomDetailsScreen> {
                                         borderRadius: BorderRadius.circular(12),
                                       ),
                                       child: Image.network(
-                                        widget.room.images[index],
+                                        widget.room.cardImages[index],
                                         width: 300,
                                         fit: BoxFit.cover,
                                         errorBuilder:
@@ -554,6 +554,8 @@ class _AddRoomDialogState extends State<_AddRoomDialog> {
             .map((e) => e.trim())
             .toList(),
         images: finalImageUrls, // Use the final combined list
+        // Variants are matched by URL, so those of removed images are ignored
+        imageVariants: isEditing ? widget.roomToEdit!.imageVariants : const [],
         available: _isAvailable,
         createdAt: isEditing ? widget.roomToEdit!.createdAt : DateTime.now(),
         updatedAt: DateTime.now(),
@@ -377,7 +377,7 @@ class _HotelInfoAmenitiesScreenState extends State<HotelInfoAmenitiesScreen> {
                           child: ClipRRect(
                             borderRadius: BorderRadius.circular(8),
                             child: Image.network(
-                              widget.hotel.images[index],
+                              widget.hotel.cardImages[index],
                               width: 200,
                               fit: BoxFit.cover,
                             ),
@@ -3,6 +3,7 @@ import 'package:hotel_booking_app/models/booking.dart';
 import 'package:hotel_booking_app/models/generated_report.dart';
 import 'package:hotel_booking_app/models/hotel.dart';
 import 'package:hotel_booking_app/models/room.dart';
+import 'package:hotel_booking_app/utils/document_ids.dart';
 import 'package:intl/intl.dart';
 
 class AnalyticsService {
@@ -215,10 +216,98 @@ class AnalyticsService {
     }
   }
 
+  // Precomputed directory views written by scripts/user_directory.py
+  static const Map<String, String> _userDirectoryViews = {
+    'All': 'all',
+    'Guest': 'guest',
+    'Hotel Admin': 'hotel_admin',
+    'Ministry Admin': 'ministry_admin',
+  };
+
+  Map<String, dynamic> _userDirectoryReportRow(Map<String, dynamic> row) {
+    return {
+      'Name': row['name'],
+      'Email': row['email'],
+      'Role': row['role'],
+      'Status': row['active'] == true ? 'Active' : 'Inactive',
+      'Created At': (row['createdAt'] as Timestamp?)?.toDate().toString(),
+    };
+  }
+
+  DocumentReference<Map<String, dynamic>> _userDirectoryDoc(String userType) {
+    return _firestore
+        .collection('user_directory')
+        .doc(_userDirectoryViews[userType] ?? 'all');
+  }
+
+  // Returns pageSize, pageCount, total and the role/status/state summary
+  // of the precomputed directory, or null if it has not been built.
+  Future<Map<String, dynamic>?> getUserDirectorySummary({
+    String userType = 'All',
+  }) async {
+    try {
+      final doc = await _userDirectoryDoc(userType).get();
+      return doc.data();
+    } catch (e) {
+      print('Error reading user directory summary: $e');
+      return null;
+    }
+  }
+
+  // Loads one pre-sorted page of the user directory (one document read).
+  Future<List<Map<String, dynamic>>> getUserDirectoryPage({
+    String userType = 'All',
+    int page = 0,
+  }) async {
+    try {
+      final doc = await _userDirectoryDoc(
+        userType,
+      ).collection('pages').doc(page.toString().padLeft(5, '0')).get();
+      final rows = List<Map<String, dynamic>>.from(doc.data()?['rows'] ?? []);
+      return rows.map(_userDirectoryReportRow).toList();
+    } catch (e) {
+      print('Error reading user directory page $page: $e');
+      throw Exception('Failed to load user directory page.');
+    }
+  }
+
+  // Reads every page of a fresh precomputed directory, or returns null so
+  // the caller falls back to scanning the guests and admins collections.
+  Future<List<Map<String, dynamic>>?> _getUserDirectoryFromPages(
+    String userType,
+  ) async {
+    try {
+      final summary = await getUserDirectorySummary(userType: userType);
+      if (summary == null) return null;
+
+      final generatedAt = (summary['generatedAt'] as Timestamp?)?.toDate();
+      if (generatedAt == null ||
+          DateTime.now().difference(generatedAt) > const Duration(days: 1)) {
+        return null;
+      }
+
+      final pagesSnapshot = await _userDirectoryDoc(
+        userType,
+      ).collection('pages').orderBy(FieldPath.documentId).get();
+      return pagesSnapshot.docs
+          .expand(
+            (doc) => List<Map<String, dynamic>>.from(doc.data()['rows'] ?? []),
+          )
+          .map(_userDirectoryReportRow)
+          .toList();
+    } catch (e) {
+      print('Error reading precomputed user directory: $e');
+      return null;
+    }
+  }
+
   Future<List<Map<String, dynamic>>> getUserDirectoryReportData({
     String userType = 'All',
   }) async {
     try {
+      final precomputed = await _getUserDirectoryFromPages(userType);
+      if (precomputed != null) return precomputed;
+
       final List<Map<String, dynamic>> users = [];
       List<Future<QuerySnapshot<Map<String, dynamic>>>> futures = [];
 
@@ -641,7 +730,7 @@ class AnalyticsService {
       // Calculate booking stats per hotel
       for (var bookingDoc in bookingsSnapshot.docs) {
         final bookingData = bookingDoc.data();
-        final hotelId = bookingData['hotelId'] as String?;
+        final hotelId = documentIdOf(bookingData['hotelId']);
         final totalPrice =
             (bookingData['totalAmount'] as num?)?.toDouble() ?? 0.0;
         final status =
@@ -728,7 +817,7 @@ class AnalyticsService {
       // Calculate booking stats by location
       for (var bookingDoc in bookingsSnapshot.docs) {
         final bookingData = bookingDoc.data();
-        final hotelId = bookingData['hotelId'] as String?;
+        final hotelId = documentIdOf(bookingData['hotelId']);
         final totalPrice =
             (bookingData['totalAmount'] as num?)?.toDouble() ?? 0.0;
 
@@ -784,7 +873,7 @@ class AnalyticsService {
 
       for (var doc in bookingsSnapshot.docs) {
         final data = doc.data();
-        final hotelId = data['hotelId'] as String?;
+        final hotelId = documentIdOf(data['hotelId']);
         if (hotelId != null) {
           hotelBookings[hotelId] = (hotelBookings[hotelId] ?? 0) + 1;
         }
@@ -481,7 +481,10 @@ class BookingService {
     try {
       QuerySnapshot snapshot = await _firestore
           .collection('bookings')
-          .where('hotelId', isEqualTo: hotelId)
+          .where(
+            'hotelId',
+            isEqualTo: _firestore.collection('hotels').doc(hotelId),
+          )
           .where('bookingStatus', isEqualTo: 'completed')
           .where(
             'checkOutDate',
@@ -513,7 +516,10 @@ class BookingService {
     try {
       QuerySnapshot snapshot = await _firestore
           .collection('bookings')
-          .where('hotelId', isEqualTo: hotelId)
+          .where(
+            'hotelId',
+            isEqualTo: _firestore.collection('hotels').doc(hotelId),
+          )
           .where(
             'createdAt',
             isGreaterThanOrEqualTo: Timestamp.fromDate(startDate),
@@ -546,7 +552,10 @@ class BookingService {
     Query query = _firestore.collection('bookings');
 
     if (hotelId != null) {
-      query = query.where('hotelId', isEqualTo: hotelId);
+      query = query.where(
+        'hotelId',
+        isEqualTo: _firestore.collection('hotels').doc(hotelId),
+      );
     }
 
     if (guestId != null) {
@@ -575,7 +584,10 @@ class BookingService {
   ) {
     return _firestore
         .collection('bookings')
-        .where('hotelId', isEqualTo: hotelId)
+        .where(
+          'hotelId',
+          isEqualTo: _firestore.collection('hotels').doc(hotelId),
+        )
         .where('roomType', isEqualTo: roomType)
         .where('bookingStatus', whereIn: ['confirmed', 'checked_in'])
         .snapshots()
@@ -41,11 +41,13 @@ class GuestService {
           // Remove from favorites
           await guestRef.update({
             'favoriteHotelIds': FieldValue.arrayRemove([hotelId]),
+            'updatedAt': FieldValue.serverTimestamp(),
           });
         } else {
           // Add to favorites
           await guestRef.update({
             'favoriteHotelIds': FieldValue.arrayUnion([hotelId]),
+            'updatedAt': FieldValue.serverTimestamp(),
           });
         }
       }
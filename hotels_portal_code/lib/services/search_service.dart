@@ -1,5 +1,6 @@
 import 'package:cloud_firestore/cloud_firestore.dart';
 import 'package:hotel_booking_app/models/hotel.dart';
+import 'package:hotel_booking_app/utils/document_ids.dart';
 
 class SearchFilters {
   final String? location;
@@ -44,6 +45,14 @@ class SearchFilters {
 class SearchService {
   final FirebaseFirestore _firestore = FirebaseFirestore.instance;
 
+  // Suggestion index shards (scripts/search_suggestions.py), cached per shard.
+  // The manifest is re-read once the TTL passes, and the cached shards are
+  // dropped whenever it reports a newer build.
+  static const Duration _suggestionManifestTtl = Duration(minutes: 10);
+  final Map<String, Map<String, dynamic>?> _suggestionShards = {};
+  Map<String, dynamic>? _suggestionManifest;
+  DateTime? _suggestionManifestCheckedAt;
+
   // Advanced hotel search with multiple filters
   Future<List<Hotel>> searchHotels({
     required SearchFilters filters,
@@ -188,7 +197,10 @@ class SearchService {
     try {
       final bookingsSnapshot = await _firestore
           .collection('bookings')
-          .where('hotelId', isEqualTo: hotelId)
+          .where(
+            'hotelId',
+            isEqualTo: _firestore.collection('hotels').doc(hotelId),
+          )
           .where('bookingStatus', whereIn: ['confirmed', 'checked_in'])
           .get();
 
@@ -217,6 +229,10 @@ class SearchService {
   // Get popular hotels (based on booking count)
   Future<List<Hotel>> getPopularHotels({int limit = 10}) async {
     try {
+      // Prefer the precomputed leaderboard (scripts/popular_hotels.py): one read
+      final leaderboard = await _getPopularHotelsFromLeaderboard(limit);
+      if (leaderboard != null) return leaderboard;
+
       // Get hotels with most bookings in the last 30 days
       final thirtyDaysAgo = DateTime.now().subtract(const Duration(days: 30));
 
@@ -235,7 +251,7 @@ class SearchService {
       // Count bookings per hotel
       Map<String, int> hotelBookingCounts = {};
       for (var bookingDoc in bookingsSnapshot.docs) {
-        final hotelId = bookingDoc.data()['hotelId'] as String?;
+        final hotelId = documentIdOf(bookingDoc.data()['hotelId']);
         if (hotelId != null) {
           hotelBookingCounts[hotelId] = (hotelBookingCounts[hotelId] ?? 0) + 1;
         }
@@ -271,6 +287,39 @@ class SearchService {
     }
   }
 
+  // Reads popular hotels from the leaderboard document. Returns null when the
+  // leaderboard is missing, stale or too short, so the caller falls back.
+  Future<List<Hotel>?> _getPopularHotelsFromLeaderboard(int limit) async {
+    try {
+      final doc = await _firestore
+          .collection('leaderboards')
+          .doc('popular_hotels')
+          .get();
+      final data = doc.data();
+      if (data == null) return null;
+
+      final generatedAt = (data['generatedAt'] as Timestamp?)?.toDate();
+      if (generatedAt == null ||
+          DateTime.now().difference(generatedAt) > const Duration(days: 1)) {
+        return null;
+      }
+
+      final entries = List<Map<String, dynamic>>.from(data['hotels'] ?? []);
+      List<Hotel> hotels = [];
+      for (var entry in entries.take(limit)) {
+        try {
+          hotels.add(Hotel.fromMap(entry));
+        } catch (e) {
+          print('Skipping invalid leaderboard entry ${entry['hotelId']}: $e');
+        }
+      }
+      return hotels.isEmpty ? null : hotels;
+    } catch (e) {
+      print('Error reading popular hotels leaderboard: $e');
+      return null;
+    }
+  }
+
   // Get recommended hotels for a guest (based on past bookings and preferences)
   Future<List<Hotel>> getRecommendedHotels(
     String guestId, {
@@ -280,7 +329,10 @@ class SearchService {
       // Get guest's past bookings
       final pastBookingsSnapshot = await _firestore
           .collection('bookings')
-          .where('guestId', isEqualTo: guestId)
+          .where(
+            'guestId',
+            isEqualTo: _firestore.collection('guests').doc(guestId),
+          )
           .where('bookingStatus', isEqualTo: 'completed')
           .get();
 
@@ -291,7 +343,7 @@ class SearchService {
 
       for (var bookingDoc in pastBookingsSnapshot.docs) {
         final booking = bookingDoc.data();
-        final hotelId = booking['hotelId'] as String?;
+        final hotelId = documentIdOf(booking['hotelId']);
 
         if (hotelId != null) {
           try {
@@ -367,6 +419,9 @@ class SearchService {
 
       final lowercaseQuery = query.toLowerCase();
 
+      final indexed = await _getSuggestionsFromIndex(lowercaseQuery, limit);
+      if (indexed != null) return indexed;
+
       // Search in hotel names, cities, and states
       final hotelsSnapshot = await _firestore
           .collection('hotels')
@@ -413,6 +468,72 @@ class SearchService {
     }
   }
 
+  // Answers a suggestion query from the prebuilt n-gram index. Each shard holds
+  // every n-gram starting with one character (or, for shards listed in the
+  // manifest's splitShards, one character pair), so a query needs one shard
+  // read. Returns null only when the index has not been published; a missing
+  // shard means no term contains the query.
+  Future<List<String>?> _getSuggestionsFromIndex(
+    String lowercaseQuery,
+    int limit,
+  ) async {
+    try {
+      final suggestions = _firestore.collection('search_suggestions');
+      final checkedAt = _suggestionManifestCheckedAt;
+      if (checkedAt == null ||
+          DateTime.now().difference(checkedAt) > _suggestionManifestTtl) {
+        final manifest = (await suggestions.doc('manifest').get()).data();
+        if (manifest?['generatedAt'] != _suggestionManifest?['generatedAt']) {
+          _suggestionShards.clear();
+        }
+        _suggestionManifest = manifest;
+        _suggestionManifestCheckedAt = DateTime.now();
+      }
+      final manifest = _suggestionManifest;
+      if (manifest == null) return null;
+
+      String shardKey(int codeUnit) =>
+          'u${codeUnit.toRadixString(16).padLeft(4, '0')}';
+      var shardId = shardKey(lowercaseQuery.codeUnitAt(0));
+      final splitShards = List<String>.from(manifest['splitShards'] ?? []);
+      if (lowercaseQuery.length > 1 && splitShards.contains(shardId)) {
+        shardId += shardKey(lowercaseQuery.codeUnitAt(1));
+      }
+      if (!_suggestionShards.containsKey(shardId)) {
+        final doc = await suggestions.doc(shardId).get();
+        _suggestionShards[shardId] = doc.data();
+      }
+      final shard = _suggestionShards[shardId];
+      if (shard == null) return [];
+
+      final maxGram = shard['maxGram'] as int? ?? 3;
+      final terms = List<String>.from(shard['terms'] ?? []);
+      final grams = shard['grams'] as Map<String, dynamic>? ?? {};
+      final gram = lowercaseQuery.length > maxGram
+          ? lowercaseQuery.substring(0, maxGram)
+          : lowercaseQuery;
+
+      final suggestionsList = List<int>.from(grams[gram] ?? [])
+          .map((i) => terms[i])
+          .where((term) => term.toLowerCase().contains(lowercaseQuery))
+          .toList();
+      suggestionsList.sort((a, b) {
+        final aStartsWith = a.toLowerCase().startsWith(lowercaseQuery);
+        final bStartsWith = b.toLowerCase().startsWith(lowercaseQuery);
+
+        if (aStartsWith && !bStartsWith) return -1;
+        if (!aStartsWith && bStartsWith) return 1;
+
+        return a.compareTo(b);
+      });
+
+      return suggestionsList.take(limit).toList();
+    } catch (e) {
+      print('Error reading search suggestion index: $e');
+      return null;
+    }
+  }
+
   // Save search history for analytics
   Future<void> saveSearchHistory(String guestId, SearchFilters filters) async {
     try {
@@ -0,0 +1,10 @@
+import 'package:cloud_firestore/cloud_firestore.dart';
+
+/// Returns the document ID behind a reference field such as bookings'
+/// `hotelId`, which is stored as a [DocumentReference] but may still be a
+/// plain string on documents written before scripts/normalize_hotel_ids.py.
+String? documentIdOf(dynamic value) {
+  if (value is DocumentReference) return value.id;
+  if (value is String && value.isNotEmpty) return value;
+  return null;
+}
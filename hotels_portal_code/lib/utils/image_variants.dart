@@ -0,0 +1,23 @@
+/// Resized copies of uploaded images, stored next to `images` as
+/// `imageVariants`: one {'full', 'card', 'thumb'} map of URLs per image.
+List<Map<String, String>> parseImageVariants(dynamic value) {
+  if (value is! List) return [];
+  return value
+      .whereType<Map>()
+      .map((variant) => Map<String, String>.from(variant))
+      .toList();
+}
+
+/// Returns the [variant] URL of each image in [images], or the image itself
+/// when it has no such variant (e.g. images uploaded from the admin screens).
+List<String> imagesForVariant(
+  List<String> images,
+  List<Map<String, String>> variants,
+  String variant,
+) {
+  final byFullUrl = {
+    for (final entry in variants)
+      if (entry['full'] != null) entry['full']!: entry,
+  };
+  return images.map((url) => byFullUrl[url]?[variant] ?? url).toList();
+}
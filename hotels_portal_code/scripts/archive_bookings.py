@@ -0,0 +1,215 @@
+import argparse
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import backend
+from profiling import add_profile_arguments, run_entry_point
+from records import BookingRecord, from_micros
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; --no-parquet archives to Firestore only
+    pa = pq = None
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+BOOKINGS_COLLECTION = 'bookings'
+ARCHIVE_COLLECTION = 'bookings_archive'
+ARCHIVE_FOLDER = os.path.join(os.path.dirname(__file__), 'archive', 'bookings')
+ARCHIVABLE_STATUSES = ['completed', 'cancelled']
+DEFAULT_MAX_AGE_DAYS = 365
+CHUNK_SIZE = 2000
+BATCH_SIZE = 500
+
+# Column name -> pyarrow type; the columns are the BookingRecord fields
+PARQUET_COLUMNS = {
+    'bookingId': 'string',
+    'guestId': 'string',
+    'hotelId': 'string',
+    'roomId': 'string',
+    'checkInDate': 'timestamp',
+    'checkOutDate': 'timestamp',
+    'adultsGuests': 'int64',
+    'childrenGuests': 'int64',
+    'roomType': 'string',
+    'roomsQuantity': 'int64',
+    'totalAmount': 'float64',
+    'bookingStatus': 'string',
+    'specialRequests': 'string',
+    'confirmationCode': 'string',
+    'createdAt': 'timestamp',
+    'updatedAt': 'timestamp',
+    'guestName': 'string',
+    'hotelName': 'string',
+    'hotelCity': 'string',
+    'hotelState': 'string',
+}
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def _to_column_value(value, kind):
+    """Converts a BookingRecord field (IDs already plain, dates as int64 microseconds) to its column type."""
+    if value is None:
+        return None
+    if kind == 'timestamp':
+        return from_micros(value)
+    if kind == 'int64':
+        return int(value)
+    if kind == 'float64':
+        return float(value)
+    return str(value)
+
+
+def _parquet_schema():
+    types = {'string': pa.string(), 'int64': pa.int64(), 'float64': pa.float64(),
+             'timestamp': pa.timestamp('us', tz='UTC')}
+    return pa.schema([(name, types[kind]) for name, kind in PARQUET_COLUMNS.items()])
+
+
+def write_parquet_partitions(snapshots, run_id, chunk_number, folder=ARCHIVE_FOLDER):
+    """
+    Writes one Parquet file per checkout month (`month=YYYY-MM/`) for a chunk
+    of bookings, then reads each file back to confirm every booking ID landed.
+    Returns the set of verified booking document IDs.
+    """
+    by_month = defaultdict(list)
+    for snapshot in snapshots:
+        check_out = snapshot.get('checkOutDate')
+        by_month[check_out.strftime('%Y-%m') if check_out else 'unknown'].append(snapshot)
+
+    schema = _parquet_schema()
+    verified = set()
+    for month, month_snapshots in by_month.items():
+        columns = {name: [] for name in PARQUET_COLUMNS}
+        for snapshot in month_snapshots:
+            # The document ID is what verification and deletion key on
+            record = BookingRecord.from_firestore(snapshot.id, {**snapshot.to_dict(), 'bookingId': snapshot.id})
+            for name, kind in PARQUET_COLUMNS.items():
+                columns[name].append(_to_column_value(getattr(record, name), kind))
+
+        partition = os.path.join(folder, f"month={month}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"part-{run_id}-{chunk_number:05d}.parquet")
+        pq.write_table(pa.table(columns, schema=schema), path, compression='zstd')
+
+        written = set(pq.read_table(path, columns=['bookingId']).column('bookingId').to_pylist())
+        verified.update(snapshot.id for snapshot in month_snapshots if snapshot.id in written)
+    return verified
+
+
+def copy_to_archive_collection(db, snapshots, archived_at):
+    """Copies bookings into the archive collection, then reads them back to verify."""
+    archive = db.collection(ARCHIVE_COLLECTION)
+    for start in range(0, len(snapshots), BATCH_SIZE):
+        batch = db.batch()
+        for snapshot in snapshots[start:start + BATCH_SIZE]:
+            batch.set(archive.document(snapshot.id), {**snapshot.to_dict(), 'archivedAt': archived_at})
+        batch.commit()
+
+    originals = {snapshot.id: snapshot.to_dict() for snapshot in snapshots}
+    verified = set()
+    for copy in db.get_all([archive.document(snapshot.id) for snapshot in snapshots]):
+        if not copy.exists:
+            continue
+        data = copy.to_dict()
+        data.pop('archivedAt', None)
+        if data == originals[copy.id]:
+            verified.add(copy.id)
+    return verified
+
+
+def delete_from_hot_collection(db, snapshots):
+    for start in range(0, len(snapshots), BATCH_SIZE):
+        batch = db.batch()
+        for snapshot in snapshots[start:start + BATCH_SIZE]:
+            batch.delete(snapshot.reference)
+        batch.commit()
+
+
+def archive_bookings(db, max_age_days, apply, write_parquet=True, chunk_size=CHUNK_SIZE):
+    """
+    Moves completed and cancelled bookings that checked out more than
+    `max_age_days` ago out of the hot collection, one chunk at a time: copy to
+    the archive collection and Parquet, verify both copies, then delete.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=max_age_days)
+    run_id = now.strftime('%Y%m%d%H%M%S')
+    mode = 'APPLY' if apply else 'DRY RUN'
+    print(f"\n--- 🗄️ Archiving bookings checked out before {cutoff.date()} ({mode}) ---")
+
+    query = (db.collection(BOOKINGS_COLLECTION)
+             .where('bookingStatus', 'in', ARCHIVABLE_STATUSES)
+             .where('checkOutDate', '<', cutoff)
+             .order_by('checkOutDate')
+             .limit(chunk_size))
+
+    archived = failed = chunk_number = 0
+    cursor = None
+    while True:
+        chunk = list((query.start_after(cursor) if cursor else query).stream())
+        if not chunk:
+            break
+        chunk_number += 1
+        cursor = chunk[-1]
+
+        if not apply:
+            archived += len(chunk)
+            continue
+
+        verified = copy_to_archive_collection(db, chunk, now)
+        if write_parquet:
+            verified &= write_parquet_partitions(chunk, run_id, chunk_number)
+
+        movable = [snapshot for snapshot in chunk if snapshot.id in verified]
+        delete_from_hot_collection(db, movable)
+        archived += len(movable)
+        failed += len(chunk) - len(movable)
+        print(f"  Chunk {chunk_number}: archived {len(movable)}/{len(chunk)} booking(s)")
+
+    print("\n-----------------------------------------")
+    verb = 'Archived' if apply else 'Would archive'
+    print(f"{verb} {archived} booking(s) in {chunk_number} chunk(s).")
+    if failed:
+        print(f"⚠️ {failed} booking(s) failed verification and were kept in '{BOOKINGS_COLLECTION}'.")
+    print("-----------------------------------------")
+    return archived
+
+
+def main(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    write_parquet = not args.no_parquet
+    if write_parquet and pq is None:
+        print("❌ pyarrow is not installed. Install it or pass --no-parquet to archive to Firestore only.")
+        return
+    try:
+        archive_bookings(db, args.max_age_days, args.apply, write_parquet, args.chunk_size)
+    except Exception as e:
+        print(f"❌ An error occurred while archiving bookings: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Move old completed/cancelled bookings to cold storage.")
+    parser.add_argument('--max-age-days', type=int, default=DEFAULT_MAX_AGE_DAYS,
+                        help='Archive bookings that checked out more than this many days ago.')
+    parser.add_argument('--apply', action='store_true', help='Move the bookings (default is a dry run).')
+    parser.add_argument('--no-parquet', action='store_true', help='Skip the Parquet copy.')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Bookings processed per chunk.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'archive_bookings', args)
@@ -0,0 +1,215 @@
+import argparse
+import heapq
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import backend
+from profiling import add_profile_arguments, run_entry_point
+from records import BookingRecord, BookingTable
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+BOOKINGS_COLLECTION = 'bookings'
+ROOMS_COLLECTION = 'rooms'
+OUTPUT_JSON_FILE = os.path.join(os.path.dirname(__file__), 'double_booking_audit.json')
+# Statuses that hold a room, as in BookingService.getAvailableRoomCounts
+ACTIVE_STATUSES = ['confirmed', 'checked_in']
+BOOKING_FIELDS = ['bookingId', 'hotelId', 'roomId', 'roomType', 'roomsQuantity', 'checkInDate', 'checkOutDate']
+MAX_WORKERS = os.cpu_count() or 2
+MICROS_PER_DAY = 86_400_000_000
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def _doc_key(value):
+    """Returns a document ID whether the field holds a string or a DocumentReference."""
+    return value.id if hasattr(value, 'id') else str(value)
+
+
+def _day(micros):
+    """Converts int64 microseconds since the epoch (BookingTable dates) to a proleptic day ordinal."""
+    return micros // MICROS_PER_DAY + EPOCH_ORDINAL
+
+
+def load_inventory(db):
+    """Counts available room documents per (hotel, room type)."""
+    inventory = Counter()
+    query = db.collection(ROOMS_COLLECTION).where('available', '==', True).select(['hotelId', 'roomType'])
+    for doc in query.stream():
+        data = doc.to_dict()
+        if data.get('hotelId') is not None:
+            inventory[(_doc_key(data['hotelId']), data.get('roomType'))] += 1
+    return inventory
+
+
+def load_bookings(db):
+    """
+    Streams every active booking once, reading only the fields the audit
+    needs, into a column-wise BookingTable. Returns (table, skipped).
+    """
+    table = BookingTable()
+    skipped = 0
+    query = (db.collection(BOOKINGS_COLLECTION)
+             .where('bookingStatus', 'in', ACTIVE_STATUSES)
+             .select(BOOKING_FIELDS))
+    for doc in query.stream():
+        record = BookingRecord.from_firestore(doc.id, doc.to_dict())
+        if (record.hotelId is None or record.checkInDate is None or record.checkOutDate is None
+                or _day(record.checkOutDate) <= _day(record.checkInDate)):
+            skipped += 1
+            continue
+        table.append(record)
+    return table, skipped
+
+
+def group_by_hotel(table):
+    """
+    Yields (hotel_id, bookings) for each hotel in the table, with bookings as
+    compact tuples: (bookingId, roomId, roomType, quantity, checkInDay, checkOutDay).
+    """
+    hotel_codes, hotel_ids = table.codes('hotelId')
+    room_codes, room_ids = table.codes('roomId')
+    type_codes, room_types = table.codes('roomType')
+    rows_by_hotel = defaultdict(list)
+    for row, code in enumerate(hotel_codes):
+        rows_by_hotel[code].append(row)
+    for code, rows in rows_by_hotel.items():
+        yield hotel_ids[code], [(
+            table.bookingId[row],
+            room_ids[room_codes[row]],
+            room_types[type_codes[row]],
+            table.roomsQuantity[row],
+            _day(table.checkInDate[row]),
+            _day(table.checkOutDate[row]),
+        ) for row in rows]
+
+
+def find_overlapping_pairs(bookings):
+    """
+    Sweeps one room's bookings in check-in order, keeping the stays still in
+    progress in a heap keyed by check-out day. Every booking still in the heap
+    when another checks in overlaps it. Check-out days are exclusive.
+    """
+    pairs = []
+    active = []  # (checkOutDay, bookingId, checkInDay)
+    for booking_id, _, _, _, check_in, check_out in sorted(bookings, key=lambda b: (b[4], b[5])):
+        while active and active[0][0] <= check_in:
+            heapq.heappop(active)
+        for other_out, other_id, other_in in active:
+            pairs.append({
+                'bookingA': other_id,
+                'bookingB': booking_id,
+                'overlapFrom': date.fromordinal(check_in).isoformat(),
+                'overlapTo': date.fromordinal(min(check_out, other_out)).isoformat(),
+            })
+        heapq.heappush(active, (check_out, booking_id, check_in))
+    return pairs
+
+
+def find_overbooked_days(bookings, capacity):
+    """
+    Sweeps check-in (+rooms) and check-out (-rooms) events for one room type
+    and returns the date ranges where booked rooms exceed `capacity`.
+    """
+    events = defaultdict(int)
+    for _, _, _, quantity, check_in, check_out in bookings:
+        events[check_in] += quantity
+        events[check_out] -= quantity
+
+    ranges = []
+    demand = 0
+    days = sorted(events)
+    for index, day in enumerate(days):
+        demand += events[day]
+        if demand > capacity and index + 1 < len(days):
+            ranges.append({
+                'from': date.fromordinal(day).isoformat(),
+                'to': date.fromordinal(days[index + 1]).isoformat(),
+                'demand': demand,
+                'capacity': capacity,
+            })
+    return ranges
+
+
+def audit_hotel(hotel_id, bookings, inventory):
+    """Audits one hotel. `inventory` maps room type to available room count."""
+    by_room = defaultdict(list)
+    by_type = defaultdict(list)
+    for booking in bookings:
+        if booking[1] is not None:
+            by_room[booking[1]].append(booking)
+        by_type[booking[2]].append(booking)
+
+    overlaps = []
+    for room_id, room_bookings in by_room.items():
+        for pair in find_overlapping_pairs(room_bookings):
+            pair['roomId'] = room_id
+            overlaps.append(pair)
+
+    overbooked = []
+    for room_type, type_bookings in by_type.items():
+        for day_range in find_overbooked_days(type_bookings, inventory.get(room_type, 0)):
+            day_range['roomType'] = room_type
+            overbooked.append(day_range)
+
+    return {'hotelId': hotel_id, 'bookings': len(bookings), 'overlaps': overlaps, 'overbookedDays': overbooked}
+
+
+def _audit_hotel_args(args):
+    return audit_hotel(*args)
+
+
+def run_audit(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    try:
+        print("\n--- 🔍 Auditing bookings for double bookings ---")
+        inventory = load_inventory(db)
+        table, skipped = load_bookings(db)
+        print(f"Loaded {len(table)} active booking(s) across {len(table.codes('hotelId')[1])} hotel(s) "
+              f"({skipped} skipped as malformed, {table.nbytes() / 1024:.0f} KiB of columns).")
+
+        inventory_by_hotel = defaultdict(dict)
+        for (hotel_id, room_type), count in inventory.items():
+            inventory_by_hotel[hotel_id][room_type] = count
+
+        work = [(hotel_id, bookings, inventory_by_hotel.get(hotel_id, {})) for hotel_id, bookings in group_by_hotel(table)]
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            reports = list(executor.map(_audit_hotel_args, work, chunksize=max(1, len(work) // (args.workers * 4))))
+
+        flagged = [report for report in reports if report['overlaps'] or report['overbookedDays']]
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'generatedAt': datetime.now().isoformat(), 'hotels': flagged}, f, ensure_ascii=False, indent=2)
+
+        print("\n-----------------------------------------")
+        print(f"Hotels with problems: {len(flagged)}/{len(reports)}")
+        print(f"Overlapping room bookings: {sum(len(r['overlaps']) for r in flagged)}")
+        print(f"Over-capacity date ranges: {sum(len(r['overbookedDays']) for r in flagged)}")
+        print(f"Report written to '{args.output}'.")
+        print("-----------------------------------------")
+    except Exception as e:
+        print(f"❌ An error occurred during the audit: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report overlapping and over-capacity bookings across all hotels.")
+    parser.add_argument('--output', default=OUTPUT_JSON_FILE, help='Path of the JSON report.')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Processes auditing hotels in parallel.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: run_audit(args), 'audit_double_bookings', args)
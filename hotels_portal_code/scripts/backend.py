@@ -0,0 +1,104 @@
+"""
+Chooses where the scripts' Firestore, Auth and Storage calls go: the real
+Firebase Admin SDK (the default) or the in-memory fake in fake_backend.py.
+
+Scripts get their client from get_db() and import `firestore`, `auth` and
+`storage` from here instead of from firebase_admin; the names resolve
+against the active backend on every access, so `firestore.DELETE_FIELD`,
+`auth.create_user(...)`, `except auth.UserNotFoundError` and
+`storage.bucket()` work unchanged.
+
+The fake is selected with use_fake(), or by setting PORTAL_BACKEND=fake with
+optional PORTAL_FAKE_LATENCY_MS, PORTAL_FAKE_ERROR_RATE and PORTAL_FAKE_SEED.
+"""
+import os
+import threading
+
+BACKEND_ENV_VAR = 'PORTAL_BACKEND'
+
+_active = None
+_lock = threading.Lock()
+
+
+class FirebaseBackend:
+    """The Firebase Admin SDK; imported lazily so the fake runs without it installed."""
+
+    name = 'firebase'
+
+    def __init__(self):
+        import firebase_admin
+        from firebase_admin import auth, firestore, storage
+        self._firebase_admin = firebase_admin
+        self.firestore = firestore
+        self.auth = auth
+        self.storage = storage
+
+    def initialize_app(self, key_path, options=None):
+        from firebase_admin import credentials
+        if not self._firebase_admin._apps:
+            self._firebase_admin.initialize_app(credentials.Certificate(key_path), options)
+
+
+def _backend_from_environment():
+    if os.environ.get(BACKEND_ENV_VAR, 'firebase') != 'fake':
+        return FirebaseBackend()
+    from fake_backend import FakeBackend
+    return FakeBackend(
+        latency=float(os.environ.get('PORTAL_FAKE_LATENCY_MS', 0)) / 1000,
+        error_rate=float(os.environ.get('PORTAL_FAKE_ERROR_RATE', 0)),
+        seed=int(os.environ.get('PORTAL_FAKE_SEED', 0)),
+    )
+
+
+def current():
+    """Returns the active backend, creating it from the environment on first use."""
+    global _active
+    with _lock:
+        if _active is None:
+            _active = _backend_from_environment()
+        return _active
+
+
+def use_backend(backend):
+    """Makes `backend` the active backend and returns it."""
+    global _active
+    with _lock:
+        _active = backend
+    return backend
+
+
+def use_fake(latency=0.0, error_rate=0.0, seed=0):
+    """Switches to a fresh, empty in-memory backend; see fake_backend.FakeBackend for the settings."""
+    from fake_backend import FakeBackend
+    return use_backend(FakeBackend(latency, error_rate, seed))
+
+
+def is_fake():
+    return current().name == 'fake'
+
+
+def initialize_app(key_path, options=None):
+    """Initializes the active backend once; the fake ignores the key file."""
+    current().initialize_app(key_path, options)
+
+
+def get_db(key_path, options=None):
+    """Initializes the active backend once and returns its Firestore client."""
+    initialize_app(key_path, options)
+    return current().firestore.client()
+
+
+class _ModuleProxy:
+    def __init__(self, attribute):
+        self._attribute = attribute
+
+    def __getattr__(self, name):
+        return getattr(getattr(current(), self._attribute), name)
+
+    def __repr__(self):
+        return f"<{self._attribute} of the active backend>"
+
+
+firestore = _ModuleProxy('firestore')
+auth = _ModuleProxy('auth')
+storage = _ModuleProxy('storage')
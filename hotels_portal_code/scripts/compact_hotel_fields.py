@@ -0,0 +1,171 @@
+import argparse
+import os
+from datetime import datetime
+
+import backend
+from backend import firestore
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+HOTELS_COLLECTION = 'hotels'
+BATCH_SIZE = 500
+
+# Legacy field -> canonical field. The canonical names are the ones Hotel.fromMap
+# reads. 'email' is deliberately absent: HotelService.getAllHotels filters on
+# `email != null`, so removing it would hide hotels from the registry listing.
+DUPLICATE_FIELDS = {
+    'name': 'hotelName',
+    'city': 'hotelCity',
+    'state': 'hotelState',
+    'description': 'hotelDescription',
+    'phone': 'hotelPhone',
+    'address': 'hotelAddress',
+}
+# Optional fields Hotel.fromMap treats the same whether null or absent
+DROPPABLE_NULL_FIELDS = ['hotelPhone', 'hotelEmail', 'licenseNumber', 'adminId']
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def value_size(value):
+    """Returns the stored size of a field value, per Firestore's storage size rules."""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, datetime)):
+        return 8
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) + 1
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, list):
+        return sum(value_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(len(key.encode('utf-8')) + 1 + value_size(item) for key, item in value.items())
+    if hasattr(value, 'path'):  # DocumentReference
+        return document_name_size(value.path)
+    if hasattr(value, 'latitude'):  # GeoPoint
+        return 16
+    return len(str(value).encode('utf-8')) + 1
+
+
+def document_name_size(path):
+    return sum(len(segment.encode('utf-8')) + 1 for segment in path.split('/')) + 16
+
+
+def document_size(path, data):
+    """Returns the stored size of a document: name, fields and the 32-byte overhead."""
+    return document_name_size(path) + value_size(data) + 32
+
+
+def plan_compaction(data):
+    """
+    Returns (compacted_data, updates, conflicts) for one hotel. `updates` is
+    the Firestore update payload; `conflicts` lists legacy fields whose value
+    differed from a non-null canonical value (the canonical value is kept).
+    """
+    compacted = dict(data)
+    updates = {}
+    conflicts = []
+    for legacy, canonical in DUPLICATE_FIELDS.items():
+        if legacy not in compacted:
+            continue
+        legacy_value = compacted.pop(legacy)
+        updates[legacy] = firestore.DELETE_FIELD
+        canonical_value = compacted.get(canonical)
+        if canonical_value is None and legacy_value is not None:
+            compacted[canonical] = legacy_value
+            updates[canonical] = legacy_value
+        elif legacy_value is not None and legacy_value != canonical_value:
+            conflicts.append((legacy, legacy_value, canonical_value))
+
+    for field in DROPPABLE_NULL_FIELDS:
+        if field in compacted and compacted[field] is None:
+            del compacted[field]
+            updates[field] = firestore.DELETE_FIELD
+    return compacted, updates, conflicts
+
+
+def compact_hotels(db, apply, reads_per_day=None):
+    """
+    Streams every hotel, measures its size before and after compaction and,
+    when `apply` is set, removes the duplicates in batched updates.
+    """
+    mode = 'APPLY' if apply else 'DRY RUN'
+    print(f"\n--- 🗜️ Compacting duplicate hotel fields ({mode}) ---")
+
+    total_before = total_after = 0
+    count = changed = 0
+    conflict_count = 0
+    batch = db.batch()
+    pending = 0
+    docs = db.collection(HOTELS_COLLECTION).stream()
+    for doc in docs:
+        count += 1
+        data = doc.to_dict()
+        compacted, updates, conflicts = plan_compaction(data)
+        before = document_size(doc.reference.path, data)
+        after = document_size(doc.reference.path, compacted)
+        total_before += before
+        total_after += after
+
+        for legacy, legacy_value, canonical_value in conflicts:
+            conflict_count += 1
+            print(f"  ⚠️ {doc.id}: '{legacy}'={legacy_value!r} differs from "
+                  f"'{DUPLICATE_FIELDS[legacy]}'={canonical_value!r}; keeping the latter")
+
+        if not updates:
+            continue
+        changed += 1
+        if apply:
+            batch.update(doc.reference, updates)
+            pending += 1
+            if pending == BATCH_SIZE:
+                batch.commit()
+                batch = db.batch()
+                pending = 0
+
+    if apply and pending:
+        batch.commit()
+
+    saved = total_before - total_after
+    print("\n-----------------------------------------")
+    print(f"Hotels scanned: {count}, {'compacted' if apply else 'to compact'}: {changed}, conflicts: {conflict_count}")
+    if count:
+        print(f"Average size: {total_before / count:.0f} B -> {total_after / count:.0f} B "
+              f"({saved / count:.0f} B saved per document read)")
+        print(f"Full collection read (listing/export): {total_before / 1024:.1f} KiB -> "
+              f"{total_after / 1024:.1f} KiB ({saved / max(total_before, 1):.0%} smaller)")
+        if reads_per_day:
+            print(f"At {reads_per_day} hotel reads/day: {saved / count * reads_per_day / 1024 / 1024:.1f} MiB/day saved")
+    print("-----------------------------------------")
+    return saved
+
+
+def main(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    try:
+        compact_hotels(db, args.apply, args.reads_per_day)
+    except Exception as e:
+        print(f"❌ An error occurred during compaction: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Remove duplicate legacy fields from hotel documents.")
+    parser.add_argument('--apply', action='store_true', help='Write the changes (default is a dry run).')
+    parser.add_argument('--reads-per-day', type=int, help='Project the savings for this many hotel document reads per day.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'compact_hotel_fields', args)
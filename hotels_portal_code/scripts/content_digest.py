@@ -0,0 +1,96 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; blake2b is slower but always available
+    xxhash = None
+
+# --- CONFIGURATION ---
+DIGEST_STORE_FILE = os.path.join(os.path.dirname(__file__), 'content_digests.json.gz')
+ALGORITHM = 'xxh3_64' if xxhash else 'blake2b_64'
+
+
+def _canonical(value):
+    """Returns a JSON-safe form of a Firestore value with one spelling per value."""
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        return {'$ts': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'$bytes': base64.b64encode(value).decode('ascii')}
+    if hasattr(value, 'id') and hasattr(value, 'path'):  # DocumentReference
+        return {'$ref': value.path}
+    if hasattr(value, 'latitude'):  # GeoPoint
+        return {'$geo': [value.latitude, value.longitude]}
+    return value
+
+
+def canonicalize(data, ignore_fields=()):
+    """Returns the canonical bytes of a document: sorted keys, UTC timestamps, references by path."""
+    data = {key: value for key, value in (data or {}).items() if key not in ignore_fields}
+    return json.dumps(_canonical(data), sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def digest(data, ignore_fields=()):
+    """Returns a 16-hex-digit content hash of a document."""
+    payload = canonicalize(data, ignore_fields)
+    if xxhash:
+        return xxhash.xxh3_64_hexdigest(payload)
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+class DigestStore:
+    """
+    Per-collection {document ID: digest} maps kept in a gzip JSON file. A scan
+    stages new digests; commit() makes them current and save() persists them,
+    so an interrupted run leaves the previous state intact.
+    """
+
+    def __init__(self, path=DIGEST_STORE_FILE):
+        self.path = path
+        self.collections = {}
+        self._staged = {}
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                stored = json.load(f)
+            # Digests from another algorithm cannot be compared; start over
+            if stored.get('algorithm') == ALGORITHM:
+                self.collections = stored.get('collections', {})
+
+    def scan(self, collection, snapshots, ignore_fields=()):
+        """
+        Streams snapshots and yields ('added' | 'changed', doc_id, data) for
+        documents whose digest differs from the stored one, then
+        ('removed', doc_id, None) for stored documents that were not seen.
+        """
+        previous = self.collections.get(collection, {})
+        current = {}
+        for snapshot in snapshots:
+            data = snapshot.to_dict()
+            current[snapshot.id] = digest(data, ignore_fields)
+            old = previous.get(snapshot.id)
+            if old is None:
+                yield 'added', snapshot.id, data
+            elif old != current[snapshot.id]:
+                yield 'changed', snapshot.id, data
+        for doc_id in previous.keys() - current.keys():
+            yield 'removed', doc_id, None
+        self._staged[collection] = current
+
+    def commit(self, collection):
+        if collection in self._staged:
+            self.collections[collection] = self._staged.pop(collection)
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'algorithm': ALGORITHM, 'collections': self.collections}, f, separators=(',', ':'))
+        os.replace(temp_path, self.path)
@@ -1,20 +1,23 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import backend
+from backend import firestore
+import argparse
 import json
-from datetime import datetime
+from datetime import datetime, timezone
+from content_digest import DigestStore
+from profiling import add_profile_arguments, run_entry_point
 
 # --- CONFIGURATION ---
 SERVICE_ACCOUNT_KEY_PATH = 'scripts/serviceAccount.json'
 OUTPUT_JSON_FILE = 'hotels_export.json'
+# Each delta run writes its own file, named by UTC time so the files sort in the order they must be applied
+DELTA_JSON_FILE = 'hotels_export.delta.{timestamp}.json'
 COLLECTION_TO_EXPORT = 'hotels'
 
 def initialize_firebase():
     """Initializes the Firebase Admin SDK."""
     try:
-        # Check if the app is already initialized to prevent errors
-        if not firebase_admin._apps:
-            cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-            firebase_admin.initialize_app(cred)
+        # Initializes only once, so repeated calls are safe
+        backend.initialize_app(SERVICE_ACCOUNT_KEY_PATH)
         print("✅ Firebase Admin SDK initialized successfully.")
         return True
     except Exception as e:
@@ -79,5 +82,59 @@ def export_collection_to_json():
         print(f"❌ An unexpected error occurred during the export process: {e}")
         print("-----------------------------------------")
 
+def export_changes_to_json():
+    """
+    Streams the collection, compares each document's content hash with the
+    digest store and writes only the added, changed and removed hotels to a
+    new timestamped delta file. Catches edits that did not touch updatedAt.
+    A run with no changes still writes an empty delta, so the newest file
+    always reflects the latest run and earlier deltas are never overwritten
+    before a consumer has applied them.
+    """
+    if not initialize_firebase():
+        return
+
+    db = firestore.client()
+    store = DigestStore()
+    print(f"\n🚀 Starting delta export from '{COLLECTION_TO_EXPORT}' collection...")
+
+    try:
+        delta = {'added': [], 'changed': [], 'removed': []}
+        for kind, doc_id, doc_data in store.scan(COLLECTION_TO_EXPORT, db.collection(COLLECTION_TO_EXPORT).stream()):
+            if kind == 'removed':
+                delta['removed'].append(doc_id)
+                continue
+            doc_data['hotelId'] = doc_id
+            delta[kind].append(doc_data)
+            print(f"  - {kind.capitalize()}: {doc_id}")
+
+        counts = {kind: len(entries) for kind, entries in delta.items()}
+        if not any(counts.values()):
+            print("🟡 No hotels changed since the last export. Writing an empty delta.")
+        generated_at = datetime.now(timezone.utc)
+        delta_file = DELTA_JSON_FILE.format(timestamp=generated_at.strftime('%Y%m%dT%H%M%SZ'))
+        print(f"\nWriting delta to '{delta_file}'...")
+        # Exclusive mode: never replace a delta that may not have been consumed yet
+        with open(delta_file, 'x', encoding='utf-8') as f:
+            json.dump({'generatedAt': generated_at, **delta}, f,
+                      ensure_ascii=False, indent=4, default=json_serializer)
+
+        # Only record the new digests once the delta is safely on disk
+        store.commit(COLLECTION_TO_EXPORT)
+        store.save()
+        print("\n-----------------------------------------")
+        print(f"✅ Added: {counts['added']}, changed: {counts['changed']}, removed: {counts['removed']}")
+        print("-----------------------------------------")
+
+    except Exception as e:
+        print("\n-----------------------------------------")
+        print(f"❌ An unexpected error occurred during the delta export: {e}")
+        print("-----------------------------------------")
+
 if __name__ == "__main__":
-    export_collection_to_json()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export the hotels collection to JSON.")
+    parser.add_argument('--delta', action='store_true',
+                        help=f"Write only hotels added, changed or removed since the last --delta run to '{DELTA_JSON_FILE}'.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(export_changes_to_json if args.delta else export_collection_to_json, 'export_hotels', args)
\ No newline at end of file
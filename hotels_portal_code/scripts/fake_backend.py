@@ -0,0 +1,956 @@
+"""
+A pure-Python, in-memory stand-in for the Firestore, Auth and Storage calls
+the scripts make. Every RPC goes through FakeBackend.rpc(), which applies the
+configured latency and error injection and counts the call, so batching and
+concurrency changes can be benchmarked deterministically without a project
+or the emulator. Select it with backend.use_fake() or PORTAL_BACKEND=fake.
+"""
+import functools
+import itertools
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from enum import Enum
+
+MAX_BATCH_WRITES = 500
+
+
+class InjectedError(Exception):
+    """Raised by an RPC chosen for error injection; stands in for a transient UNAVAILABLE."""
+    code = 'UNAVAILABLE'
+
+
+# --- Firestore sentinels and transforms ---
+class _Sentinel:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+DELETE_FIELD = _Sentinel('DELETE_FIELD')
+SERVER_TIMESTAMP = _Sentinel('SERVER_TIMESTAMP')
+
+
+class Increment:
+    def __init__(self, value):
+        self.value = value
+
+
+class ArrayUnion:
+    def __init__(self, values):
+        self.values = list(values)
+
+
+class ArrayRemove:
+    def __init__(self, values):
+        self.values = list(values)
+
+
+class FieldFilter:
+    def __init__(self, field_path, op_string, value):
+        self.field_path = field_path
+        self.op_string = op_string
+        self.value = value
+
+
+class Query:
+    ASCENDING = 'ASCENDING'
+    DESCENDING = 'DESCENDING'
+
+
+_MISSING = object()
+
+
+def _get_path(data, field_path):
+    value = data
+    for part in field_path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _resolve(value, current, now):
+    """Returns the stored form of a written value given the field's current value; _MISSING deletes it."""
+    if value is DELETE_FIELD:
+        return _MISSING
+    if value is SERVER_TIMESTAMP:
+        return now
+    if isinstance(value, Increment):
+        return (current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0) + value.value
+    if isinstance(value, ArrayUnion):
+        existing = list(current) if isinstance(current, list) else []
+        return existing + [item for item in value.values if item not in existing]
+    if isinstance(value, ArrayRemove):
+        return [item for item in current if item not in value.values] if isinstance(current, list) else []
+    if isinstance(value, dict):
+        resolved = {}
+        for key, item in value.items():
+            item_current = current.get(key, _MISSING) if isinstance(current, dict) else _MISSING
+            item = _resolve(item, item_current, now)
+            if item is not _MISSING:
+                resolved[key] = item
+        return resolved
+    if isinstance(value, list):
+        return [_resolve(item, _MISSING, now) for item in value]
+    if isinstance(value, datetime):
+        # Firestore stores instants; reads come back timezone-aware in UTC
+        return _as_utc(value)
+    return value
+
+
+def _store(parent, key, value):
+    if value is _MISSING:
+        parent.pop(key, None)
+    else:
+        parent[key] = value
+
+
+def _apply_update(data, field_path, value, now):
+    """Applies one update() entry, where dots in the key address nested fields."""
+    parts = field_path.split('.')
+    parent = data
+    for part in parts[:-1]:
+        if not isinstance(parent.get(part), dict):
+            parent[part] = {}
+        parent = parent[part]
+    _store(parent, parts[-1], _resolve(value, parent.get(parts[-1], _MISSING), now))
+
+
+def _apply_merge(data, fields, now):
+    """Applies set(..., merge=True): nested maps merge into existing maps instead of replacing them."""
+    for key, value in fields.items():
+        if isinstance(value, dict) and isinstance(data.get(key), dict):
+            _apply_merge(data[key], value, now)
+        else:
+            _store(data, key, _resolve(value, data.get(key, _MISSING), now))
+
+
+def _copy(value):
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+# Firestore's cross-type ordering: null < bool < number < timestamp < string < bytes < reference < array < map
+def _type_rank(value):
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, DocumentReference):
+        return 6
+    if isinstance(value, list):
+        return 8
+    if isinstance(value, dict):
+        return 9
+    return 7
+
+
+def _compare_values(a, b):
+    rank_a, rank_b = _type_rank(a), _type_rank(b)
+    if rank_a != rank_b:
+        return -1 if rank_a < rank_b else 1
+    if isinstance(a, DocumentReference):
+        a, b = a.path, b.path
+    elif isinstance(a, datetime):
+        a, b = _as_utc(a), _as_utc(b)
+    elif isinstance(a, (list, dict)):
+        a, b = repr(a), repr(b)
+    return (a > b) - (a < b)
+
+
+def _as_utc(value):
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _equal(a, b):
+    return _type_rank(a) == _type_rank(b) and _compare_values(a, b) == 0
+
+
+def _matches(value, op, operand):
+    if value is _MISSING:
+        return False
+    if op == '==':
+        return _equal(value, operand)
+    if op == '!=':
+        return value is not None and not _equal(value, operand)
+    if op == 'in':
+        return any(_equal(value, item) for item in operand)
+    if op == 'not-in':
+        return value is not None and not any(_equal(value, item) for item in operand)
+    if op == 'array_contains':
+        return isinstance(value, list) and any(_equal(item, operand) for item in value)
+    if op == 'array_contains_any':
+        return isinstance(value, list) and any(_equal(item, other) for item in value for other in operand)
+    # Range operators only match values of the operand's type
+    if _type_rank(value) != _type_rank(operand):
+        return False
+    comparison = _compare_values(value, operand)
+    return {'<': comparison < 0, '<=': comparison <= 0, '>': comparison > 0, '>=': comparison >= 0}[op]
+
+
+# --- Firestore ---
+class DocumentSnapshot:
+    def __init__(self, reference, data, update_time=None, field_paths=None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self.update_time = update_time
+        if data is not None and field_paths is not None:
+            projected = {}
+            for field_path in field_paths:
+                value = _get_path(data, field_path)
+                if value is not _MISSING:
+                    _apply_update(projected, field_path, _copy(value), None)
+            data = projected
+        self._data = data
+
+    def to_dict(self):
+        return _copy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        value = _get_path(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return _copy(value)
+
+
+class DocumentReference:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def __eq__(self, other):
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f"DocumentReference({self.path!r})"
+
+    @property
+    def parent(self):
+        return CollectionReference(self._client, self.path.rsplit('/', 1)[0])
+
+    def collection(self, name):
+        return CollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self, field_paths=None, transaction=None):
+        self._client.backend.rpc('firestore.get')
+        data, update_time = self._client.read(self.path)
+        if transaction is not None:
+            transaction._record_read(self.path, update_time)
+        return DocumentSnapshot(self, data, update_time, field_paths)
+
+    def set(self, data, merge=False):
+        self._client.backend.rpc('firestore.set')
+        self._client.commit([('set', self.path, data, merge)])
+
+    def create(self, data):
+        self._client.backend.rpc('firestore.create')
+        self._client.commit([('create', self.path, data, False)])
+
+    def update(self, fields):
+        self._client.backend.rpc('firestore.update')
+        self._client.commit([('update', self.path, fields, False)])
+
+    def delete(self):
+        self._client.backend.rpc('firestore.delete')
+        self._client.commit([('delete', self.path, None, False)])
+
+
+class BaseQuery:
+    def __init__(self, client, path, filters=(), orders=(), limit=None, projection=None, cursor=None,
+                 all_descendants=False):
+        self._client = client
+        self._path = path
+        self._all_descendants = all_descendants
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._projection = projection
+        self._cursor = cursor
+
+    def _copy_with(self, **changes):
+        state = {'filters': self._filters, 'orders': self._orders, 'limit': self._limit,
+                 'projection': self._projection, 'cursor': self._cursor, 'all_descendants': self._all_descendants}
+        state.update(changes)
+        return BaseQuery(self._client, self._path, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy_with(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=Query.ASCENDING):
+        return self._copy_with(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy_with(limit=count)
+
+    def select(self, field_paths):
+        return self._copy_with(projection=list(field_paths))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy_with(cursor=document_fields_or_snapshot)
+
+    def _effective_orders(self):
+        orders = list(self._orders)
+        # Like Firestore, an inequality filter implies ordering on its field first
+        for field_path, op, _ in self._filters:
+            if op in ('<', '<=', '>', '>=', '!=', 'not-in') and not orders:
+                orders.append((field_path, Query.ASCENDING))
+        if not any(field_path == '__name__' for field_path, _ in orders):
+            direction = orders[-1][1] if orders else Query.ASCENDING
+            orders.append(('__name__', direction))
+        return orders
+
+    def _sort_key(self, doc_path, data, orders):
+        values = []
+        for field_path, _ in orders:
+            if field_path == '__name__':
+                values.append(doc_path)
+            else:
+                values.append(_get_path(data, field_path))
+        return values
+
+    def _cursor_key(self, orders):
+        cursor = self._cursor
+        if isinstance(cursor, DocumentSnapshot):
+            return self._sort_key(cursor.reference.path, cursor._data or {}, orders)
+        values = []
+        for field_path, _ in orders:
+            value = cursor.get(field_path, _MISSING)
+            if field_path == '__name__':
+                value = value.path if isinstance(value, DocumentReference) else f"{self._path}/{value}"
+            values.append(value)
+        return values
+
+    def _compare_keys(self, key_a, key_b, orders):
+        for (_, direction), a, b in zip(orders, key_a, key_b):
+            if a is _MISSING or b is _MISSING:
+                continue
+            comparison = _compare_values(a, b)
+            if comparison:
+                return -comparison if direction == Query.DESCENDING else comparison
+        return 0
+
+    def _run(self):
+        orders = self._effective_orders()
+        rows = []
+        if self._all_descendants:
+            documents = self._client.scan_group(self._path)
+        else:
+            documents = [(f"{self._path}/{doc_id}", data, update_time)
+                         for doc_id, data, update_time in self._client.scan(self._path)]
+        for path, data, update_time in documents:
+            if not all(_matches(_get_path(data, f), op, value) for f, op, value in self._filters):
+                continue
+            # Documents missing an order_by field are excluded, as in Firestore
+            if any(f != '__name__' and _get_path(data, f) is _MISSING for f, _ in orders):
+                continue
+            rows.append((self._sort_key(path, data, orders), path, data, update_time))
+
+        compare = functools.cmp_to_key(lambda a, b: self._compare_keys(a[0], b[0], orders))
+        rows.sort(key=compare)
+        if self._cursor is not None:
+            cursor_key = self._cursor_key(orders)
+            rows = [row for row in rows if self._compare_keys(row[0], cursor_key, orders) > 0]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        return [DocumentSnapshot(DocumentReference(self._client, path), data, update_time, self._projection)
+                for _, path, data, update_time in rows]
+
+    def stream(self, transaction=None):
+        self._client.backend.rpc('firestore.query')
+        snapshots = self._run()
+        if transaction is not None:
+            for snapshot in snapshots:
+                transaction._record_read(snapshot.reference.path, snapshot.update_time)
+        return iter(snapshots)
+
+    def get(self):
+        return list(self.stream())
+
+
+class CollectionReference(BaseQuery):
+    def __init__(self, client, path):
+        super().__init__(client, path)
+        self.id = path.rsplit('/', 1)[-1]
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, f"{self._path}/{document_id or uuid.uuid4().hex[:20]}")
+
+    def add(self, data):
+        doc_ref = self.document()
+        doc_ref.set(data)
+        return self._client.now(), doc_ref
+
+    def list_documents(self):
+        self._client.backend.rpc('firestore.list_documents')
+        return [DocumentReference(self._client, f"{self._path}/{doc_id}")
+                for doc_id, _, _ in self._client.scan(self._path)]
+
+    def on_snapshot(self, callback):
+        """
+        Calls `callback(snapshots, changes, read_time)` once with every
+        document, then after each commit that touches the collection.
+        """
+        return self._client.listen(self._path, callback)
+
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def _add(self, op, doc_ref, data, merge=False):
+        if len(self._writes) >= MAX_BATCH_WRITES:
+            raise ValueError(f"A batch holds at most {MAX_BATCH_WRITES} writes.")
+        self._writes.append((op, doc_ref.path, data, merge))
+        return self
+
+    def set(self, doc_ref, data, merge=False):
+        return self._add('set', doc_ref, data, merge)
+
+    def create(self, doc_ref, data):
+        return self._add('create', doc_ref, data)
+
+    def update(self, doc_ref, fields):
+        return self._add('update', doc_ref, fields)
+
+    def delete(self, doc_ref):
+        return self._add('delete', doc_ref, None)
+
+    def commit(self):
+        self._client.backend.rpc('firestore.commit')
+        self._client.commit(self._writes)
+        writes, self._writes = self._writes, []
+        return writes
+
+
+class Transaction(WriteBatch):
+    """
+    Buffers writes like a batch and remembers the update time of every
+    document read through it; commit fails with Aborted when any of them
+    changed meanwhile, and @transactional then retries the function.
+    """
+
+    def __init__(self, client, max_attempts=5):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._reads = {}
+
+    def _record_read(self, path, update_time):
+        self._reads.setdefault(path, update_time)
+
+    def get(self, ref_or_query):
+        if isinstance(ref_or_query, DocumentReference):
+            return iter([ref_or_query.get(transaction=self)])
+        return ref_or_query.stream(transaction=self)
+
+    def get_all(self, references, field_paths=None):
+        return self._client.get_all(references, field_paths, transaction=self)
+
+    def commit(self):
+        self._client.backend.rpc('firestore.commit')
+        self._client.commit(self._writes, self._reads)
+        writes, self._writes, self._reads = self._writes, [], {}
+        return writes
+
+
+class Aborted(Exception):
+    """A transaction read a document that changed before it committed."""
+    code = 'ABORTED'
+
+
+def transactional(func):
+    """Mirrors firestore.transactional: runs `func(transaction, ...)` and commits, retrying on Aborted."""
+    @functools.wraps(func)
+    def run(transaction, *args, **kwargs):
+        for attempt in range(transaction._max_attempts):
+            transaction._writes, transaction._reads = [], {}
+            result = func(transaction, *args, **kwargs)
+            try:
+                transaction.commit()
+                return result
+            except Aborted:
+                if attempt == transaction._max_attempts - 1:
+                    raise
+    return run
+
+
+class ChangeType(Enum):
+    ADDED = 1
+    MODIFIED = 2
+    REMOVED = 3
+
+
+class DocumentChange:
+    def __init__(self, change_type, document):
+        self.type = change_type
+        self.document = document
+
+
+class Watch:
+    def __init__(self, client, path, callback):
+        self._client = client
+        self.path = path
+        self.callback = callback
+
+    def unsubscribe(self):
+        self._client.unlisten(self)
+
+
+class FakeFirestoreClient:
+    """Documents live in one dict keyed by full path, e.g. 'guests/abc/notifications/xyz'."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._documents = {}  # path -> (data, update_time)
+        self._watches = []
+        self._lock = threading.Lock()
+
+    def now(self):
+        return datetime.now(timezone.utc)
+
+    def collection(self, name):
+        return CollectionReference(self, name)
+
+    def document(self, path):
+        return DocumentReference(self, path)
+
+    def collection_group(self, collection_id):
+        return BaseQuery(self, collection_id, all_descendants=True)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def transaction(self, max_attempts=5):
+        return Transaction(self, max_attempts)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        self.backend.rpc('firestore.batch_get')
+        for reference in references:
+            data, update_time = self.read(reference.path)
+            if transaction is not None:
+                transaction._record_read(reference.path, update_time)
+            yield DocumentSnapshot(reference, data, update_time, field_paths)
+
+    def collections(self):
+        with self._lock:
+            return [CollectionReference(self, name) for name in sorted({path.split('/', 1)[0] for path in self._documents})]
+
+    def read(self, path):
+        with self._lock:
+            data, update_time = self._documents.get(path, (None, None))
+            return _copy(data), update_time
+
+    def scan(self, collection_path):
+        prefix = collection_path + '/'
+        with self._lock:
+            return [(path[len(prefix):], _copy(data), update_time)
+                    for path, (data, update_time) in self._documents.items()
+                    if path.startswith(prefix) and '/' not in path[len(prefix):]]
+
+    def scan_group(self, collection_id):
+        """Returns (path, data, update_time) for documents in every collection named `collection_id`."""
+        with self._lock:
+            return [(path, _copy(data), update_time)
+                    for path, (data, update_time) in self._documents.items()
+                    if path.split('/')[-2] == collection_id]
+
+    def commit(self, writes, reads=None):
+        """
+        Applies writes atomically: all succeed or, on the first precondition
+        failure, none do. `reads` maps paths a transaction read to the update
+        time it saw; if any changed since, nothing is written and Aborted is raised.
+        """
+        now = self.now()
+        with self._lock:
+            for path, update_time in (reads or {}).items():
+                if self._documents.get(path, (None, None))[1] != update_time:
+                    raise Aborted(f"Transaction aborted: {path} changed after it was read.")
+            staged = {}
+            for op, path, data, merge in writes:
+                current = staged[path] if path in staged else self._documents.get(path, (None, None))[0]
+                if op == 'delete':
+                    staged[path] = None
+                    continue
+                if op == 'create' and current is not None:
+                    raise ValueError(f"Document already exists: {path}")
+                if op == 'update' and current is None:
+                    raise ValueError(f"No document to update: {path}")
+                document = _copy(current) if (op == 'update' or merge) and current is not None else {}
+                if op == 'update':
+                    for field_path, value in data.items():
+                        _apply_update(document, field_path, value, now)
+                else:
+                    _apply_merge(document, data or {}, now)
+                staged[path] = document
+            changes = []
+            for path, document in staged.items():
+                existed = path in self._documents
+                if document is None:
+                    self._documents.pop(path, None)
+                    if existed:
+                        changes.append((path, ChangeType.REMOVED, None))
+                else:
+                    self._documents[path] = (document, now)
+                    changes.append((path, ChangeType.MODIFIED if existed else ChangeType.ADDED, document))
+            watches = list(self._watches)
+        self._notify(watches, changes, now)
+
+    def listen(self, collection_path, callback):
+        watch = Watch(self, collection_path, callback)
+        snapshots = [DocumentSnapshot(DocumentReference(self, f"{collection_path}/{doc_id}"), data, update_time)
+                     for doc_id, data, update_time in self.scan(collection_path)]
+        with self._lock:
+            self._watches.append(watch)
+        callback(snapshots, [DocumentChange(ChangeType.ADDED, snapshot) for snapshot in snapshots], self.now())
+        return watch
+
+    def unlisten(self, watch):
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def _notify(self, watches, changes, read_time):
+        for watch in watches:
+            relevant = [(path, change_type, data) for path, change_type, data in changes
+                        if path.rsplit('/', 1)[0] == watch.path]
+            if not relevant:
+                continue
+            document_changes = [DocumentChange(change_type, DocumentSnapshot(DocumentReference(self, path), _copy(data),
+                                                                             read_time))
+                                for path, change_type, data in relevant]
+            snapshots = [DocumentSnapshot(DocumentReference(self, f"{watch.path}/{doc_id}"), data, update_time)
+                         for doc_id, data, update_time in self.scan(watch.path)]
+            watch.callback(snapshots, document_changes, read_time)
+
+    def document_count(self, collection_path=None):
+        """Returns how many documents are stored, optionally only directly under one collection."""
+        if collection_path is None:
+            with self._lock:
+                return len(self._documents)
+        return len(self.scan(collection_path))
+
+
+class FakeFirestoreModule:
+    """Mirrors the parts of firebase_admin.firestore the scripts use."""
+
+    DELETE_FIELD = DELETE_FIELD
+    SERVER_TIMESTAMP = SERVER_TIMESTAMP
+    Increment = Increment
+    ArrayUnion = ArrayUnion
+    ArrayRemove = ArrayRemove
+    FieldFilter = FieldFilter
+    Query = Query
+    DocumentReference = DocumentReference
+    DocumentSnapshot = DocumentSnapshot
+    transactional = staticmethod(transactional)
+
+    def __init__(self, backend):
+        self._client = FakeFirestoreClient(backend)
+
+    def client(self, app=None):
+        return self._client
+
+
+# --- Auth ---
+class UserNotFoundError(Exception):
+    pass
+
+
+class EmailAlreadyExistsError(Exception):
+    pass
+
+
+class UidAlreadyExistsError(Exception):
+    pass
+
+
+class UserRecord:
+    def __init__(self, uid, email=None, display_name=None, disabled=False):
+        self.uid = uid
+        self.email = email
+        self.display_name = display_name
+        self.disabled = disabled
+
+
+class ListUsersPage:
+    def __init__(self, auth, users, next_page_token):
+        self._auth = auth
+        self.users = users
+        self.next_page_token = next_page_token
+        self.has_next_page = bool(next_page_token)
+
+    def get_next_page(self):
+        return self._auth.list_users(page_token=self.next_page_token) if self.has_next_page else None
+
+    def iterate_all(self):
+        page = self
+        while page is not None:
+            yield from page.users
+            page = page.get_next_page()
+
+
+class FakeAuthModule:
+    """Mirrors the parts of firebase_admin.auth the scripts use."""
+
+    UserNotFoundError = UserNotFoundError
+    EmailAlreadyExistsError = EmailAlreadyExistsError
+    UidAlreadyExistsError = UidAlreadyExistsError
+    UserRecord = UserRecord
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._users = {}  # uid -> UserRecord, in creation order
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def create_user(self, uid=None, email=None, password=None, display_name=None, disabled=False, **_):
+        self._backend.rpc('auth.create_user')
+        with self._lock:
+            if email and any(user.email == email for user in self._users.values()):
+                raise EmailAlreadyExistsError(f"The user with the provided email already exists ({email}).")
+            uid = uid or f"fake-uid-{next(self._ids):06d}"
+            if uid in self._users:
+                raise UidAlreadyExistsError(f"The user with the provided uid already exists ({uid}).")
+            user = UserRecord(uid, email, display_name, disabled)
+            self._users[uid] = user
+            return user
+
+    def get_user(self, uid):
+        self._backend.rpc('auth.get_user')
+        with self._lock:
+            if uid not in self._users:
+                raise UserNotFoundError(f"No user record found for the provided user ID: {uid}.")
+            return self._users[uid]
+
+    def get_user_by_email(self, email):
+        self._backend.rpc('auth.get_user')
+        with self._lock:
+            for user in self._users.values():
+                if user.email == email:
+                    return user
+        raise UserNotFoundError(f"No user record found for the provided email: {email}.")
+
+    def delete_user(self, uid):
+        self._backend.rpc('auth.delete_user')
+        with self._lock:
+            if self._users.pop(uid, None) is None:
+                raise UserNotFoundError(f"No user record found for the provided user ID: {uid}.")
+
+    def list_users(self, page_token=None, max_results=1000):
+        self._backend.rpc('auth.list_users')
+        with self._lock:
+            uids = list(self._users)
+            start = uids.index(page_token) if page_token in self._users else 0
+            page = [self._users[uid] for uid in uids[start:start + max_results]]
+            next_token = uids[start + max_results] if start + max_results < len(uids) else None
+        return ListUsersPage(self, page, next_token)
+
+
+# --- Storage ---
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.cache_control = None
+        self.content_type = None
+        self.size = None
+        self._public = False
+
+    @property
+    def public_url(self):
+        return f"https://storage.googleapis.com/{self.bucket.name}/{self.name}"
+
+    def upload_from_filename(self, filename, content_type=None):
+        self.bucket._backend.rpc('storage.upload')
+        self.size = os.path.getsize(filename)
+        self.content_type = content_type
+        self.bucket._store(self)
+
+    def upload_from_string(self, data, content_type=None):
+        self.bucket._backend.rpc('storage.upload')
+        self.size = len(data)
+        self.content_type = content_type
+        self.bucket._store(self)
+
+    def make_public(self):
+        self.bucket._backend.rpc('storage.patch')
+        self._public = True
+
+    def exists(self):
+        self.bucket._backend.rpc('storage.get')
+        return self.bucket._get(self.name) is not None
+
+    def delete(self):
+        self.bucket._backend.rpc('storage.delete')
+        self.bucket._remove(self.name)
+
+
+class FakeBucket:
+    def __init__(self, backend, name):
+        self._backend = backend
+        self.name = name
+        self._blobs = {}
+        self._lock = threading.Lock()
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        self._backend.rpc('storage.get')
+        return self._get(name)
+
+    def list_blobs(self, prefix=None):
+        self._backend.rpc('storage.list')
+        with self._lock:
+            return [blob for name, blob in sorted(self._blobs.items()) if not prefix or name.startswith(prefix)]
+
+    def delete_blobs(self, blobs):
+        for blob in blobs:
+            blob.delete()
+
+    def _store(self, blob):
+        with self._lock:
+            self._blobs[blob.name] = blob
+
+    def _get(self, name):
+        with self._lock:
+            return self._blobs.get(name)
+
+    def _remove(self, name):
+        with self._lock:
+            if self._blobs.pop(name, None) is None:
+                raise FileNotFoundError(f"No such object: {self.name}/{name}")
+
+
+class FakeStorageModule:
+    """Mirrors firebase_admin.storage.bucket()."""
+
+    def __init__(self, backend, default_bucket='fake-bucket'):
+        self._backend = backend
+        self._default_bucket = default_bucket
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, name=None, app=None):
+        name = name or self._default_bucket
+        with self._lock:
+            if name not in self._buckets:
+                self._buckets[name] = FakeBucket(self._backend, name)
+            return self._buckets[name]
+
+
+# --- Backend ---
+class FakeBackend:
+    """
+    Bundles the fake firestore, auth and storage modules. `latency` is the
+    seconds each RPC sleeps, either one number or a dict keyed by RPC name
+    ('firestore.commit', 'auth.create_user', ...) with '*' as the default.
+    `error_rate` works the same way with probabilities; errors are drawn
+    from a seeded generator so a run is reproducible.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.errors = Counter()
+        self._lock = threading.Lock()
+        self.firestore = FakeFirestoreModule(self)
+        self.auth = FakeAuthModule(self)
+        self.storage = FakeStorageModule(self)
+
+    @staticmethod
+    def _setting(setting, rpc_name):
+        if isinstance(setting, dict):
+            return setting.get(rpc_name, setting.get(rpc_name.split('.', 1)[0], setting.get('*', 0)))
+        return setting
+
+    def rpc(self, rpc_name):
+        """Counts one RPC, sleeps its latency and raises InjectedError when chosen for failure."""
+        with self._lock:
+            self.calls[rpc_name] += 1
+            fail = self.random.random() < self._setting(self.error_rate, rpc_name)
+            if fail:
+                self.errors[rpc_name] += 1
+        delay = self._setting(self.latency, rpc_name)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise InjectedError(f"Injected failure in {rpc_name}")
+
+    def initialize_app(self, key_path=None, options=None):
+        if options and options.get('storageBucket'):
+            self.storage._default_bucket = options['storageBucket']
+
+    def stats(self):
+        with self._lock:
+            return {'calls': dict(self.calls), 'errors': dict(self.errors), 'total': sum(self.calls.values())}
+
+
+def benchmark_seeding(documents, latency, batch_size=MAX_BATCH_WRITES):
+    """Seeds `documents` bookings one set() at a time and then in batches; returns {mode: (seconds, rpcs)}."""
+    results = {}
+    for mode in ('per-document', 'batched'):
+        backend = FakeBackend(latency=latency)
+        db = backend.firestore.client()
+        bookings = db.collection('bookings')
+        rows = [{'bookingStatus': 'confirmed', 'totalAmount': float(i), 'createdAt': datetime.now(timezone.utc)}
+                for i in range(documents)]
+        started = time.perf_counter()
+        if mode == 'per-document':
+            for row in rows:
+                bookings.document().set(row)
+        else:
+            for start in range(0, len(rows), batch_size):
+                batch = db.batch()
+                for row in rows[start:start + batch_size]:
+                    batch.set(bookings.document(), row)
+                batch.commit()
+        results[mode] = (time.perf_counter() - started, backend.stats()['total'])
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+    from profiling import add_profile_arguments, run_entry_point
+
+    def main(args):
+        print(f"\n--- 🧪 Seeding {args.documents} documents against the fake backend "
+              f"({args.latency_ms:.1f} ms per RPC) ---")
+        for mode, (seconds, rpcs) in benchmark_seeding(args.documents, args.latency_ms / 1000).items():
+            print(f"  {mode:<13} {seconds * 1000:9.1f} ms  {rpcs:6} RPC(s)")
+
+    parser = argparse.ArgumentParser(description="Benchmark per-document vs batched writes on the in-memory backend.")
+    parser.add_argument('--documents', type=int, default=5000)
+    parser.add_argument('--latency-ms', type=float, default=1.0, help='Injected latency per RPC.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'fake_backend', args)
@@ -0,0 +1,285 @@
+import argparse
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import backend
+from backend import firestore
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+GUESTS_COLLECTION = 'guests'
+HOTELS_COLLECTION = 'hotels'
+# One document per (hotel, guest) pair, ID '{hotelId}_{guestId}', so both
+# "who favourited this hotel" and "what did this guest favourite" are
+# single-field equality queries.
+FAVORITES_COLLECTION = 'favorites'
+# favorite_counters/{hotelId}/shards/{n}: spreads concurrent increments over
+# NUM_SHARDS documents; the total is rolled up into hotels.favoriteCount.
+COUNTERS_COLLECTION = 'favorite_counters'
+NUM_SHARDS = 10
+AGGREGATES_COLLECTION = 'aggregates'
+FAVORITES_STATE_DOC = 'hotel_favorites'
+BATCH_SIZE = 500
+MAX_WORKERS = 8
+IN_QUERY_LIMIT = 30  # values Firestore accepts in one 'in' filter
+# Incremental runs between sweeps for deleted guests. A sweep lists every
+# guest and favorite, so it is amortized rather than paid on every run.
+SWEEP_EVERY_RUNS = 24
+
+# The earliest possible watermark, used before the first run
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def favorite_doc_id(hotel_id, guest_id):
+    return f"{hotel_id}_{guest_id}"
+
+
+def _read_state(db):
+    """Returns (updatedAt of the newest guest already indexed, incremental runs since the last deletion sweep)."""
+    snapshot = db.collection(AGGREGATES_COLLECTION).document(FAVORITES_STATE_DOC).get()
+    data = snapshot.to_dict() if snapshot.exists else {}
+    return data.get('guestsWatermark') or EPOCH, data.get('runsSinceSweep', 0)
+
+
+def _write_watermark(db, watermark, mode, runs_since_sweep=0):
+    db.collection(AGGREGATES_COLLECTION).document(FAVORITES_STATE_DOC).set({
+        'guestsWatermark': watermark,
+        'runsSinceSweep': runs_since_sweep,
+        'lastRunMode': mode,
+        'lastRunAt': datetime.now(timezone.utc),
+    }, merge=True)
+
+
+def _commit_in_batches(db, writes):
+    """Applies (op, doc_ref, fields) writes in batches of BATCH_SIZE; op is 'set', 'merge', 'update' or 'delete'."""
+    for start in range(0, len(writes), BATCH_SIZE):
+        batch = db.batch()
+        for op, doc_ref, fields in writes[start:start + BATCH_SIZE]:
+            if op == 'delete':
+                batch.delete(doc_ref)
+            elif op == 'merge':
+                batch.set(doc_ref, fields, merge=True)
+            else:
+                getattr(batch, op)(doc_ref, fields)
+        batch.commit()
+
+
+def _shards(db, hotel_id):
+    return db.collection(COUNTERS_COLLECTION).document(hotel_id).collection('shards')
+
+
+def read_favorite_count(db, hotel_id):
+    """Returns a hotel's favorite count by summing its counter shards."""
+    return sum((doc.to_dict() or {}).get('count', 0) for doc in _shards(db, hotel_id).stream())
+
+
+def favorited_by(db, hotel_id):
+    """Returns the IDs of the guests who favourited a hotel, from the reverse index."""
+    query = db.collection(FAVORITES_COLLECTION).where('hotelId', '==', hotel_id)
+    return [doc.get('guestId') for doc in query.select(['guestId']).stream()]
+
+
+def _roll_up_counts(db, hotel_ids):
+    """Copies each hotel's shard total into hotels.favoriteCount for ranking queries."""
+    hotels = db.collection(HOTELS_COLLECTION)
+    existing = {snapshot.id for snapshot in db.get_all([hotels.document(h) for h in hotel_ids], field_paths=['hotelId'])
+                if snapshot.exists}
+    for hotel_id in set(hotel_ids) - existing:
+        print(f"  ⚠️ Skipping favorite count for missing hotel '{hotel_id}'")
+    _commit_in_batches(db, [('update', hotels.document(hotel_id), {'favoriteCount': read_favorite_count(db, hotel_id)})
+                            for hotel_id in existing])
+
+
+# --- Full rebuild ---
+def _scan_favorites(db):
+    """Returns (hotel -> set of guests, newest guest updatedAt) from one pass over the guests."""
+    by_hotel = defaultdict(set)
+    newest = EPOCH
+    for doc in db.collection(GUESTS_COLLECTION).select(['favoriteHotelIds', 'updatedAt']).stream():
+        data = doc.to_dict()
+        for hotel_id in data.get('favoriteHotelIds') or []:
+            by_hotel[hotel_id].add(doc.id)
+        if isinstance(data.get('updatedAt'), datetime):
+            newest = max(newest, data['updatedAt'])
+    return by_hotel, newest
+
+
+def _rebuild_hotel(db, hotel_id, guest_ids, now):
+    """Rewrites one hotel's reverse-index entries and counter shards to match `guest_ids`."""
+    favorites = db.collection(FAVORITES_COLLECTION)
+    indexed = set(favorited_by(db, hotel_id))
+    writes = [('delete', favorites.document(favorite_doc_id(hotel_id, guest_id)), None)
+              for guest_id in indexed - guest_ids]
+    writes += [('set', favorites.document(favorite_doc_id(hotel_id, guest_id)),
+                {'hotelId': hotel_id, 'guestId': guest_id, 'createdAt': now})
+               for guest_id in guest_ids - indexed]
+
+    # Spread the exact total over the shards so later increments land anywhere
+    base, remainder = divmod(len(guest_ids), NUM_SHARDS)
+    writes.append(('set', db.collection(COUNTERS_COLLECTION).document(hotel_id),
+                   {'hotelId': hotel_id, 'numShards': NUM_SHARDS, 'updatedAt': now}))
+    writes += [('set', _shards(db, hotel_id).document(str(shard)), {'count': base + (shard < remainder)})
+               for shard in range(NUM_SHARDS)]
+    _commit_in_batches(db, writes)
+    return hotel_id, len(guest_ids)
+
+
+def rebuild_index(db, max_workers=MAX_WORKERS):
+    """
+    Rebuilds the reverse index and counters from every guest's
+    favoriteHotelIds, one hotel per worker, and resets the watermark. Hotels
+    that previously had counters but no longer have favorites are reset to zero.
+    """
+    print("\n--- ❤️ Full favorites index rebuild ---")
+    by_hotel, newest = _scan_favorites(db)
+    for doc in db.collection(COUNTERS_COLLECTION).select([]).stream():
+        by_hotel.setdefault(doc.id, set())
+    now = datetime.now(timezone.utc)
+    print(f"Rebuilding {len(by_hotel)} hotel(s) with {max_workers} workers...")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda item: _rebuild_hotel(db, item[0], item[1], now), by_hotel.items()))
+
+    _roll_up_counts(db, list(by_hotel))
+    _write_watermark(db, newest, 'full')
+    total = sum(count for _, count in results)
+    print(f"✅ Indexed {total} favorite(s) across {len(results)} hotel(s).")
+    return total
+
+
+# --- Incremental ---
+def _indexed_hotels_by_guest(db, guest_ids):
+    """Returns guest -> indexed hotel IDs, reading the reverse index for IN_QUERY_LIMIT guests per query."""
+    favorites = db.collection(FAVORITES_COLLECTION)
+    guest_ids = sorted(guest_ids)
+    indexed = defaultdict(set)
+    for start in range(0, len(guest_ids), IN_QUERY_LIMIT):
+        query = (favorites.where('guestId', 'in', guest_ids[start:start + IN_QUERY_LIMIT])
+                 .select(['hotelId', 'guestId']))
+        for doc in query.stream():
+            data = doc.to_dict()
+            indexed[data['guestId']].add(data['hotelId'])
+    return indexed
+
+
+def _deleted_guests(db):
+    """
+    Returns the IDs of guests that still have reverse-index entries but whose
+    document is gone. Deleting a guest leaves no updatedAt behind, so this
+    compares ID-only listings of the guests and of the index.
+    """
+    live = {doc.id for doc in db.collection(GUESTS_COLLECTION).select([]).stream()}
+    indexed = {doc.get('guestId') for doc in db.collection(FAVORITES_COLLECTION).select(['guestId']).stream()}
+    return indexed - live
+
+
+def update_index_incrementally(db, sweep=False):
+    """
+    Diffs the favoriteHotelIds of every guest updated since the watermark
+    against that guest's reverse-index entries, then applies the added and
+    removed pairs with a +1/-1 on a random counter shard. Relies on
+    GuestService.toggleFavoriteHotel bumping updatedAt. Every
+    SWEEP_EVERY_RUNS runs, or with `sweep`, deleted guests are also found and
+    counted as having no favorites; until then their entries linger, which
+    notification targeting tolerates because it skips missing guests.
+    """
+    watermark, runs_since_sweep = _read_state(db)
+    sweep = sweep or runs_since_sweep + 1 >= SWEEP_EVERY_RUNS
+    runs_since_sweep = 0 if sweep else runs_since_sweep + 1
+    print(f"\n--- ❤️ Incremental favorites update (guests after {watermark.isoformat()}"
+          f"{', with deleted-guest sweep' if sweep else ''}) ---")
+
+    current_by_guest = {}
+    new_watermark = watermark
+    query = (db.collection(GUESTS_COLLECTION)
+             .where('updatedAt', '>', watermark)
+             .order_by('updatedAt')
+             .select(['favoriteHotelIds', 'updatedAt']))
+    for doc in query.stream():
+        data = doc.to_dict()
+        new_watermark = max(new_watermark, data['updatedAt'])
+        current_by_guest[doc.id] = set(data.get('favoriteHotelIds') or [])
+    guest_count = len(current_by_guest)
+    deleted = _deleted_guests(db) if sweep else set()
+    current_by_guest.update((guest_id, set()) for guest_id in deleted)
+
+    favorites = db.collection(FAVORITES_COLLECTION)
+    now = datetime.now(timezone.utc)
+    writes = []
+    deltas = defaultdict(int)
+    indexed_by_guest = _indexed_hotels_by_guest(db, current_by_guest)
+    for guest_id, current in current_by_guest.items():
+        indexed = indexed_by_guest.get(guest_id, set())
+        for hotel_id in current - indexed:
+            writes.append(('set', favorites.document(favorite_doc_id(hotel_id, guest_id)),
+                           {'hotelId': hotel_id, 'guestId': guest_id, 'createdAt': now}))
+            deltas[hotel_id] += 1
+        for hotel_id in indexed - current:
+            writes.append(('delete', favorites.document(favorite_doc_id(hotel_id, guest_id)), None))
+            deltas[hotel_id] -= 1
+
+    deltas = {hotel_id: delta for hotel_id, delta in deltas.items() if delta}
+    if not writes:
+        _write_watermark(db, new_watermark, 'incremental', runs_since_sweep)
+        print(f"🟡 No favorite changes among {guest_count} updated guest(s).")
+        return 0
+
+    change_count = len(writes)
+    for hotel_id, delta in deltas.items():
+        shard = _shards(db, hotel_id).document(str(random.randrange(NUM_SHARDS)))
+        writes.append(('merge', shard, {'count': firestore.Increment(delta)}))
+        writes.append(('merge', db.collection(COUNTERS_COLLECTION).document(hotel_id),
+                       {'hotelId': hotel_id, 'numShards': NUM_SHARDS, 'updatedAt': now}))
+    _commit_in_batches(db, writes)
+
+    _roll_up_counts(db, list(deltas))
+    _write_watermark(db, new_watermark, 'incremental', runs_since_sweep)
+    print(f"✅ Applied {change_count} favorite change(s) from {guest_count} updated and {len(deleted)} deleted "
+          f"guest(s) to {len(deltas)} hotel(s).")
+    return change_count
+
+
+def main(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    try:
+        if args.hotel:
+            guest_ids = favorited_by(db, args.hotel)
+            print(f"Hotel '{args.hotel}': {read_favorite_count(db, args.hotel)} favorite(s)")
+            for guest_id in guest_ids:
+                print(f"  - {guest_id}")
+        elif args.full:
+            rebuild_index(db, args.workers)
+        else:
+            update_index_incrementally(db, args.sweep)
+    except Exception as e:
+        print(f"❌ An error occurred while updating the favorites index: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain the hotel -> guests favorites index and counters.")
+    parser.add_argument('--full', action='store_true', help='Rebuild from every guest instead of the updatedAt watermark.')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Hotels rebuilt concurrently with --full.')
+    parser.add_argument('--hotel', help='Print the favorite count and guests of one hotel and exit.')
+    parser.add_argument('--sweep', action='store_true',
+                        help=f'Also remove deleted guests now instead of every {SWEEP_EVERY_RUNS} incremental runs.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'favorites_index', args)
@@ -0,0 +1,463 @@
+import argparse
+import base64
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import time
+import unicodedata
+import zlib
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import backend
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+HOTELS_COLLECTION = 'hotels'
+REVIEWS_COLLECTION = 'reviews'
+INDEX_FOLDER = os.path.join(os.path.dirname(__file__), 'fulltext_index')
+EXPORT_FILE = os.path.join(os.path.dirname(__file__), 'fulltext_index.json.gz')
+MANIFEST_FILE = 'manifest.json'
+MAX_SEGMENTS = 8
+MAX_WORKERS = 8
+
+# Field weights: a term in the hotel name counts as much as three in the description
+FIELD_WEIGHTS = {
+    'hotelName': 3,
+    'hotelCity': 2,
+    'hotelState': 2,
+    'amenities': 2,
+    'hotelDescription': 1,
+    'reviews': 1,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# --- Tokenization ---
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+ARABIC_DIACRITICS = re.compile('[\u0617-\u061a\u064b-\u0652\u0670\u0640]')  # tashkeel and tatweel
+ARABIC_NORMALIZATION = str.maketrans({'\u0623': '\u0627', '\u0625': '\u0627', '\u0622': '\u0627', '\u0671': '\u0627',
+                                     '\u0649': '\u064a', '\u0629': '\u0647', '\u0624': '\u0648', '\u0626': '\u064a'})
+ARABIC_PREFIXES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+STOPWORDS = {
+    # English
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'to', 'was', 'were', 'with', 'we', 'i', 'our',
+    # Arabic (normalized forms)
+    'في', 'من', 'علي', 'الي', 'عن', 'مع', 'هذا', 'هذه', 'ذلك', 'التي', 'الذي', 'و', 'او', 'ان', 'كان',
+}
+
+
+def tokenize(text):
+    """
+    Splits English/Arabic text into normalized index terms: NFKC and case
+    folding, Arabic diacritic removal and letter normalization, light Arabic
+    prefix stripping (definite article and attached conjunctions) and
+    stopword removal.
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = ARABIC_DIACRITICS.sub('', text).translate(ARABIC_NORMALIZATION)
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        if token in STOPWORDS:
+            continue
+        for prefix in ARABIC_PREFIXES:
+            if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+                token = token[len(prefix):]
+                break
+        tokens.append(token)
+    return tokens
+
+
+def hotel_terms(hotel, reviews):
+    """Returns the weighted term frequencies and length of one hotel document."""
+    weighted = Counter()
+    fields = dict(hotel)
+    fields['reviews'] = ' '.join(review.get('review') or '' for review in reviews)
+    for field, weight in FIELD_WEIGHTS.items():
+        value = fields.get(field)
+        if isinstance(value, list):
+            value = ' '.join(str(item) for item in value)
+        if not value:
+            continue
+        for token in tokenize(str(value)):
+            weighted[token] += weight
+    return weighted, sum(weighted.values())
+
+
+# --- Postings encoding ---
+def _encode_varints(numbers):
+    out = bytearray()
+    for number in numbers:
+        while number >= 0x80:
+            out.append((number & 0x7F) | 0x80)
+            number >>= 7
+        out.append(number)
+    return bytes(out)
+
+
+def _decode_varints(data):
+    numbers, number, shift = [], 0, 0
+    for byte in data:
+        number |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            numbers.append(number)
+            number, shift = 0, 0
+    return numbers
+
+
+def encode_postings(postings):
+    """Encodes sorted (ordinal, tf) pairs as delta-gap varints."""
+    numbers, previous = [], 0
+    for ordinal, tf in postings:
+        numbers.extend((ordinal - previous, tf))
+        previous = ordinal
+    return _encode_varints(numbers)
+
+
+def decode_postings(data):
+    numbers = _decode_varints(data)
+    postings, ordinal = [], 0
+    for i in range(0, len(numbers), 2):
+        ordinal += numbers[i]
+        postings.append((ordinal, numbers[i + 1]))
+    return postings
+
+
+class Segment:
+    """
+    An immutable batch of indexed hotels. `tombstones` lists hotel IDs this
+    segment deletes; a hotel in a newer segment supersedes older copies.
+    """
+
+    def __init__(self, doc_ids, doc_lengths, postings, tombstones=()):
+        self.doc_ids = doc_ids
+        self.doc_lengths = doc_lengths
+        self.postings = postings  # term -> encoded postings bytes
+        self.tombstones = set(tombstones)
+
+    @classmethod
+    def build(cls, documents, tombstones=()):
+        """Builds a segment from (hotel_id, term_frequencies, length) tuples."""
+        documents = sorted(documents, key=lambda doc: doc[0])
+        term_postings = defaultdict(list)
+        for ordinal, (_, frequencies, _) in enumerate(documents):
+            for term, tf in frequencies.items():
+                term_postings[term].append((ordinal, tf))
+        return cls(
+            [doc[0] for doc in documents],
+            [doc[2] for doc in documents],
+            {term: encode_postings(postings) for term, postings in term_postings.items()},
+            tombstones,
+        )
+
+    def to_bytes(self):
+        payload = {
+            'docIds': self.doc_ids,
+            'docLengths': self.doc_lengths,
+            'tombstones': sorted(self.tombstones),
+            'postings': {term: base64.b64encode(data).decode('ascii') for term, data in self.postings.items()},
+        }
+        return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        payload = json.loads(zlib.decompress(data).decode('utf-8'))
+        postings = {term: base64.b64decode(encoded) for term, encoded in payload['postings'].items()}
+        return cls(payload['docIds'], payload['docLengths'], postings, payload['tombstones'])
+
+
+def _write_atomic(path, data):
+    """Writes bytes to a temp file beside `path`, flushes them to disk and renames it into place."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class FullTextIndex:
+    """BM25 search over a stack of segments, oldest first."""
+
+    def __init__(self, segments=None, watermark=EPOCH):
+        self.segments = segments or []
+        self.watermark = watermark
+        self._refresh()
+
+    def _refresh(self):
+        """Resolves which copy of each hotel is live and recomputes corpus statistics."""
+        claimed = set()
+        self._live = [set() for _ in self.segments]
+        for index in range(len(self.segments) - 1, -1, -1):
+            segment = self.segments[index]
+            for ordinal, doc_id in enumerate(segment.doc_ids):
+                if doc_id not in claimed:
+                    self._live[index].add(ordinal)
+                    claimed.add(doc_id)
+            claimed.update(segment.tombstones)
+        lengths = [self.segments[i].doc_lengths[o] for i, live in enumerate(self._live) for o in live]
+        self.doc_count = len(lengths)
+        self.average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        self._postings_cache = {}
+
+    def live_ids(self):
+        """Returns the IDs of every hotel with a live copy in the index."""
+        return {self.segments[i].doc_ids[o] for i, live in enumerate(self._live) for o in live}
+
+    def add_segment(self, segment):
+        self.segments.append(segment)
+        self._refresh()
+
+    def merge(self):
+        """Collapses all segments into one holding only live hotels."""
+        documents = []
+        for index, segment in enumerate(self.segments):
+            frequencies = defaultdict(Counter)
+            live = self._live[index]
+            for term, data in segment.postings.items():
+                for ordinal, tf in decode_postings(data):
+                    if ordinal in live:
+                        frequencies[ordinal][term] = tf
+            documents.extend((segment.doc_ids[o], frequencies[o], segment.doc_lengths[o]) for o in live)
+        self.segments = [Segment.build(documents)]
+        self._refresh()
+
+    def _live_postings(self, term):
+        """Returns [(hotel_id, tf, length)] for a term across live documents, cached per term."""
+        cached = self._postings_cache.get(term)
+        if cached is not None:
+            return cached
+        result = []
+        for index, segment in enumerate(self.segments):
+            data = segment.postings.get(term)
+            if data is None:
+                continue
+            live = self._live[index]
+            result.extend(
+                (segment.doc_ids[ordinal], tf, segment.doc_lengths[ordinal])
+                for ordinal, tf in decode_postings(data) if ordinal in live
+            )
+        self._postings_cache[term] = result
+        return result
+
+    def search(self, text, limit=10):
+        """Returns up to `limit` (hotel_id, score) pairs ranked by BM25."""
+        if not self.doc_count:
+            return []
+        scores = defaultdict(float)
+        for term in set(tokenize(text)):
+            postings = self._live_postings(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+            for doc_id, tf, length in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self.average_length)
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    # --- Persistence ---
+    def save(self, folder=INDEX_FOLDER):
+        """
+        Writes the index crash-safely. Segment files are named by content
+        hash, so a file the current manifest references is never rewritten;
+        every file goes through a temp file and rename, and the manifest is
+        replaced last. Unreferenced segments are removed only after that.
+        """
+        os.makedirs(folder, exist_ok=True)
+        names = []
+        for segment in self.segments:
+            data = segment.to_bytes()
+            name = f"segment_{hashlib.sha1(data).hexdigest()[:16]}.bin"
+            if not os.path.exists(os.path.join(folder, name)):
+                _write_atomic(os.path.join(folder, name), data)
+            names.append(name)
+        manifest = {'segments': names, 'watermark': self.watermark.isoformat()}
+        _write_atomic(os.path.join(folder, MANIFEST_FILE), json.dumps(manifest, indent=2).encode('utf-8'))
+        for name in os.listdir(folder):
+            if name.startswith('segment_') and name not in names:
+                os.remove(os.path.join(folder, name))
+
+    @classmethod
+    def load(cls, folder=INDEX_FOLDER):
+        manifest_path = os.path.join(folder, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return cls()
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        segments = []
+        for name in manifest['segments']:
+            with open(os.path.join(folder, name), 'rb') as f:
+                segments.append(Segment.from_bytes(f.read()))
+        return cls(segments, datetime.fromisoformat(manifest['watermark']))
+
+    def export(self, path=EXPORT_FILE):
+        """Writes a single merged segment as gzipped JSON for the app or a search endpoint."""
+        if len(self.segments) > 1:
+            self.merge()
+        segment = self.segments[0] if self.segments else Segment([], [], {})
+        payload = json.loads(zlib.decompress(segment.to_bytes()).decode('utf-8'))
+        payload.update({'k1': BM25_K1, 'b': BM25_B, 'averageLength': self.average_length})
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"✅ Exported index to '{path}' ({os.path.getsize(path) / 1024:.1f} KiB).")
+
+
+# --- Firestore ---
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def _hotel_key(hotel_id):
+    return hotel_id.id if hasattr(hotel_id, 'id') else str(hotel_id)
+
+
+def _is_searchable(hotel):
+    return hotel is not None and hotel.get('approved', False)
+
+
+def full_build(db):
+    """Streams every hotel and review once and builds a single fresh segment."""
+    started = datetime.now(timezone.utc)
+    reviews_by_hotel = defaultdict(list)
+    for doc in db.collection(REVIEWS_COLLECTION).select(['hotelId', 'review']).stream():
+        data = doc.to_dict()
+        if data.get('hotelId') is not None:
+            reviews_by_hotel[_hotel_key(data['hotelId'])].append(data)
+
+    documents = []
+    for doc in db.collection(HOTELS_COLLECTION).select(list(FIELD_WEIGHTS) + ['approved']).stream():
+        hotel = doc.to_dict()
+        if _is_searchable(hotel):
+            frequencies, length = hotel_terms(hotel, reviews_by_hotel.get(doc.id, []))
+            documents.append((doc.id, frequencies, length))
+    print(f"Indexed {len(documents)} hotel(s).")
+    return FullTextIndex([Segment.build(documents)], started)
+
+
+def _load_hotel_document(db, hotel_id):
+    """Reads one hotel and its reviews, matching hotelId stored as a string or a reference like the full build."""
+    hotel_ref = db.collection(HOTELS_COLLECTION).document(hotel_id)
+    snapshot = hotel_ref.get()
+    hotel = snapshot.to_dict() if snapshot.exists else None
+    if not _is_searchable(hotel):
+        return hotel_id, None
+    reviews = db.collection(REVIEWS_COLLECTION)
+    review_docs = [doc.to_dict() for hotel_value in (hotel_id, hotel_ref)
+                   for doc in reviews.where('hotelId', '==', hotel_value).select(['review']).stream()]
+    return hotel_id, hotel_terms(hotel, review_docs)
+
+
+def incremental_build(db, index, max_workers=MAX_WORKERS):
+    """
+    Re-indexes only hotels whose document or reviews changed since the
+    index watermark, appending them as a new segment. Hotels that were
+    unapproved become tombstones, and so do deleted hotels, found by
+    comparing the indexed IDs with an ID-only listing of the collection.
+    """
+    started = datetime.now(timezone.utc)
+    existing = {doc.id for doc in db.collection(HOTELS_COLLECTION).select([]).stream()}
+    changed = index.live_ids() - existing
+    hotels_query = db.collection(HOTELS_COLLECTION).where('updatedAt', '>', index.watermark).select([])
+    changed.update(doc.id for doc in hotels_query.stream())
+    reviews_query = db.collection(REVIEWS_COLLECTION).where('updatedAt', '>', index.watermark).select(['hotelId'])
+    for doc in reviews_query.stream():
+        hotel_id = doc.to_dict().get('hotelId')
+        if hotel_id is not None:
+            changed.add(_hotel_key(hotel_id))
+
+    if not changed:
+        print("🟡 No hotels or reviews changed since the last run.")
+        index.watermark = started
+        return index
+
+    print(f"Re-indexing {len(changed)} changed or deleted hotel(s)...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda hotel_id: _load_hotel_document(db, hotel_id), changed))
+
+    documents = [(hotel_id, terms[0], terms[1]) for hotel_id, terms in results if terms is not None]
+    tombstones = [hotel_id for hotel_id, terms in results if terms is None]
+    index.add_segment(Segment.build(documents, tombstones))
+    index.watermark = started
+    print(f"Added segment with {len(documents)} hotel(s) and {len(tombstones)} removal(s).")
+
+    if len(index.segments) > MAX_SEGMENTS:
+        print(f"Merging {len(index.segments)} segments...")
+        index.merge()
+    return index
+
+
+def build_index(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    try:
+        print("\n--- 📚 Building full-text index ---")
+        if args.full:
+            index = full_build(db)
+        else:
+            index = incremental_build(db, FullTextIndex.load(args.index_dir), args.workers)
+        index.save(args.index_dir)
+        print(f"✅ Index has {index.doc_count} live hotel(s) in {len(index.segments)} segment(s).")
+        if args.export:
+            index.export(args.export)
+    except Exception as e:
+        print(f"❌ An error occurred while building the full-text index: {e}")
+
+
+def query_local(args):
+    """
+    Runs queries against the local index and reports latency: the index
+    load, cold queries that decode their postings, and warm cached queries.
+    """
+    started = time.perf_counter()
+    index = FullTextIndex.load(args.index_dir)
+    print(f"Loaded {index.doc_count} hotel(s) in {(time.perf_counter() - started) * 1e3:.1f} ms.")
+    repeats = 1000
+    for text in args.query:
+        cold = 0.0
+        for _ in range(repeats):
+            index._postings_cache.clear()
+            started = time.perf_counter()
+            index.search(text, args.limit)
+            cold += time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(repeats):
+            results = index.search(text, args.limit)
+        warm = time.perf_counter() - started
+        print(f"'{text}' (cold {cold / repeats * 1e6:.1f} µs/query, warm {warm / repeats * 1e6:.1f} µs/query):")
+        for hotel_id, score in results:
+            print(f"  {score:6.3f}  {hotel_id}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build or query the offline full-text hotel index.")
+    parser.add_argument('--full', action='store_true', help='Rebuild from scratch instead of indexing changes.')
+    parser.add_argument('--index-dir', default=INDEX_FOLDER, help='Folder holding the index segments.')
+    parser.add_argument('--export', nargs='?', const=EXPORT_FILE, help='Also write a merged, publishable index file.')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Concurrent hotel loads for incremental runs.')
+    parser.add_argument('--query', nargs='+', help='Query the local index instead of building it.')
+    parser.add_argument('--limit', type=int, default=10, help='Results per query.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    entry_point = query_local if args.query else build_index
+    run_entry_point(lambda: entry_point(args), 'fulltext_index', args)
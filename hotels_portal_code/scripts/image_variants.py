@@ -0,0 +1,99 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional; callers fall back to uploading originals
+    Image = None
+
+# --- CONFIGURATION ---
+VARIANT_CACHE_FOLDER = os.path.join(os.path.dirname(__file__), 'image_cache')
+# Longest edge in pixels for each variant, largest first so each resize starts
+# from the previous (already smaller) image instead of the full-size original.
+VARIANT_SIZES = {
+    'full': 1600,
+    'card': 800,
+    'thumb': 320,
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+MAX_WORKERS = os.cpu_count() or 2
+
+
+def is_available():
+    """Returns True when Pillow is installed and variants can be generated."""
+    return Image is not None
+
+
+def _output_format():
+    """Picks WebP when this Pillow build can encode it, otherwise JPEG."""
+    if features.check('webp'):
+        return 'WEBP', 'webp', {'quality': WEBP_QUALITY, 'method': 4}
+    return 'JPEG', 'jpg', {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True}
+
+
+def _source_digest(file_path):
+    """Hashes the source file so identical images are only processed once."""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def build_variants(file_path, cache_folder=VARIANT_CACHE_FOLDER):
+    """
+    Decodes `file_path` once and writes one resized copy per entry in
+    VARIANT_SIZES. Returns a dict with the source path, its size in bytes and
+    a `variants` mapping of variant name -> (local path, size in bytes).
+    Variants already present in the cache are reused without decoding.
+    """
+    pil_format, extension, save_options = _output_format()
+    digest = _source_digest(file_path)
+    targets = {
+        name: os.path.join(cache_folder, f"{digest}_{name}.{extension}")
+        for name in VARIANT_SIZES
+    }
+
+    if not all(os.path.exists(path) for path in targets.values()):
+        os.makedirs(cache_folder, exist_ok=True)
+        with Image.open(file_path) as source:
+            image = ImageOps.exif_transpose(source)
+            image = image.convert('RGB')
+            for name, max_edge in VARIANT_SIZES.items():
+                if max(image.size) > max_edge:
+                    image = image.copy()
+                    image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+                image.save(targets[name], pil_format, **save_options)
+
+    return {
+        'source': file_path,
+        'sourceBytes': os.path.getsize(file_path),
+        'variants': {name: (path, os.path.getsize(path)) for name, path in targets.items()},
+    }
+
+
+def build_all_variants(file_paths, max_workers=MAX_WORKERS, cache_folder=VARIANT_CACHE_FOLDER):
+    """
+    Generates variants for every path across a process pool. Returns a dict
+    keyed by source path; images that fail to decode are reported and left out.
+    """
+    results = {}
+    unique_paths = list(dict.fromkeys(file_paths))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(build_variants, path, cache_folder): path for path in unique_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                print(f"⚠️ Could not preprocess image {path}: {e}")
+
+    source_bytes = sum(r['sourceBytes'] for r in results.values())
+    full_bytes = sum(r['variants']['full'][1] for r in results.values())
+    card_bytes = sum(r['variants']['card'][1] for r in results.values())
+    print(f"  Preprocessed {len(results)}/{len(unique_paths)} images: "
+          f"originals {source_bytes / 1024:.0f} KiB, full {full_bytes / 1024:.0f} KiB, "
+          f"card {card_bytes / 1024:.0f} KiB")
+    return results
@@ -0,0 +1,632 @@
+"""
+Derives the composite indexes the app's queries need and checks them against
+firestore.indexes.json.
+
+Query shapes come from three places: the JSON lines load_test.py records while
+replaying traffic against the emulator, a static scan of the Dart query chains
+in lib/ (including `query = query.where(...)` builders, whose conditional
+clauses are expanded into every combination), and a scan of the
+`.where()/.order_by()` chains of the Python scripts. Each shape is turned
+into the index Firestore would ask for; shapes served by single-field indexes
+or index merging need none. Declared indexes are then classified as used,
+unused, single-field (not allowed as a composite) or mismatched (naming a field
+no query filters or orders on), and the minimal set of new indexes covering
+every shape is proposed. Queries the scans cannot see (dynamic collection
+names, other services) may still use an index, so --prune only drops indexes
+that are certainly wrong unless --prune-unused is given.
+"""
+import argparse
+import ast
+import difflib
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SHAPES_JSONL_FILE = os.path.join(os.path.dirname(__file__), 'query_shapes.jsonl')
+DART_SOURCE_DIR = os.path.join(os.path.dirname(__file__), '..', 'lib')
+PYTHON_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEXES_FILE = os.path.join(os.path.dirname(__file__), '..', 'firestore.indexes.json')
+# Conditional clauses beyond this many are treated as always applied
+MAX_OPTIONAL_CLAUSES = 6
+
+EQUALITY_OPS = {'==', 'in'}
+ARRAY_OPS = {'array_contains', 'array-contains', 'array_contains_any', 'array-contains-any'}
+RANGE_OPS = {'<', '<=', '>', '>=', '!=', 'not-in', 'not_in'}
+
+# Named arguments of the Dart Query.where() and the operator each stands for
+DART_WHERE_OPS = {
+    'isEqualTo': '==',
+    'isNull': '==',
+    'whereIn': 'in',
+    'arrayContains': 'array_contains',
+    'arrayContainsAny': 'array_contains_any',
+    'isNotEqualTo': '!=',
+    'whereNotIn': 'not-in',
+    'isLessThan': '<',
+    'isLessThanOrEqualTo': '<=',
+    'isGreaterThan': '>',
+    'isGreaterThanOrEqualTo': '>=',
+}
+# Methods that can follow a query without changing which index it needs
+DART_PASSTHROUGH_METHODS = {
+    'limit', 'limitToLast', 'startAt', 'startAfter', 'startAtDocument', 'startAfterDocument',
+    'endAt', 'endBefore', 'endAtDocument', 'endBeforeDocument', 'withConverter',
+}
+DART_TERMINAL_METHODS = {'get', 'snapshots', 'count', 'aggregate'}
+# Python query methods that do not change which index a query needs
+PYTHON_PASSTHROUGH_METHODS = {
+    'select', 'limit', 'limit_to_last', 'offset', 'start_at', 'start_after', 'end_at', 'end_before',
+    'stream', 'get', 'count', 'on_snapshot',
+}
+
+
+# --- Query shapes ---
+def load_recorded_shapes(path):
+    """Reads load_test.py query shapes: one {collection, filters, orderBy, count} object per line."""
+    shapes = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            shapes.append({
+                'collection': record['collection'],
+                'queryScope': record.get('queryScope', 'COLLECTION'),
+                'filters': [tuple(item) for item in record.get('filters', [])],
+                'orderBy': [tuple(item) for item in record.get('orderBy', [])],
+                'count': record.get('count', 1),
+                'source': os.path.basename(path),
+            })
+    return shapes
+
+
+_DART_TOKEN = re.compile(r"'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"|//[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+def _strip_comments(text):
+    """Blanks out Dart comments, keeping line breaks so positions still map to lines."""
+    def blank(match):
+        token = match.group(0)
+        if token.startswith('//') or token.startswith('/*'):
+            return re.sub(r'[^\n]', ' ', token)
+        return token
+    return _DART_TOKEN.sub(blank, text)
+
+
+def _statements(text):
+    """Splits Dart source into (start offset, brace depth, statement) at `;`, `{` and `}` outside parentheses."""
+    statements = []
+    depth = parens = 0
+    start = index = 0
+    while index < len(text):
+        char = text[index]
+        if char in '\'"':
+            match = _DART_TOKEN.match(text, index)
+            index = match.end() if match else index + 1
+            continue
+        if char in '([':
+            parens += 1
+        elif char in ')]':
+            parens = max(parens - 1, 0)
+        elif parens == 0 and char in ';{}':
+            statements.append((start, depth, text[start:index]))
+            depth += 1 if char == '{' else -1 if char == '}' else 0
+            start = index + 1
+        index += 1
+    statements.append((start, depth, text[start:]))
+    return statements
+
+
+def _call_chain(text, position):
+    """
+    Parses `.method(args)` calls starting at `position` and returns a list of
+    (method, args) plus the offset where the chain ends.
+    """
+    calls = []
+    while True:
+        match = re.compile(r'\s*\.\s*(\w+)\s*(\()?').match(text, position)
+        if not match:
+            return calls, position
+        if not match.group(2):  # a property such as `.docs` ends the query
+            return calls, position
+        depth, index = 1, match.end()
+        while index < len(text) and depth:
+            if text[index] in '\'"':
+                literal = _DART_TOKEN.match(text, index)
+                index = literal.end() if literal else index + 1
+                continue
+            depth += {'(': 1, ')': -1}.get(text[index], 0)
+            index += 1
+        calls.append((match.group(1), text[match.end():index - 1]))
+        position = index
+
+
+def _clauses(calls):
+    """
+    Returns the (kind, field, op-or-direction) clauses of a call chain and
+    whether it ends in a read; stops at the first call that is not part of a query.
+    """
+    clauses = []
+    for method, args in calls:
+        field = re.match(r"\s*'([\w.]+)'", args)
+        if method == 'where' and field:
+            named = re.search(r'\b(' + '|'.join(DART_WHERE_OPS) + r')\s*:', args)
+            if named:
+                clauses.append(('filter', field.group(1), DART_WHERE_OPS[named.group(1)]))
+        elif method == 'orderBy' and field:
+            descending = re.search(r'\bdescending\s*:\s*true\b', args)
+            clauses.append(('order', field.group(1), 'desc' if descending else 'asc'))
+        elif method in DART_TERMINAL_METHODS:
+            return clauses, True
+        elif method not in DART_PASSTHROUGH_METHODS:
+            return clauses, False
+    return clauses, False
+
+
+def _dart_shape(collection, scope, clauses, source):
+    return {
+        'collection': collection,
+        'queryScope': scope,
+        'filters': [(field, op) for kind, field, op in clauses if kind == 'filter'],
+        'orderBy': [(field, direction) for kind, field, direction in clauses if kind == 'order'],
+        'count': 1,
+        'source': source,
+    }
+
+
+def scan_dart_file(path, root):
+    """Returns the query shapes built in one Dart file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = _strip_comments(f.read())
+    relative = os.path.relpath(path, root)
+    # Fields and getters holding a bare collection reference, e.g. _activitiesCollection
+    references = {name: collection for name, collection in re.findall(
+        r"(\w+)\s*(?:=>|=)\s*[\w.\s]*?\.collection\(\s*'(\w+)'\s*\)\s*;", text)}
+    source_pattern = re.compile(
+        r"\.(collection|collectionGroup)\(\s*'(\w+)'\s*\)"
+        r'|\b(' + ('|'.join(map(re.escape, references)) or '(?!)') + r')\b(?=\s*\.)')
+
+    shapes = []
+    builders = {}  # variable -> [collection, scope, base clauses, optional clause groups, declaring depth]
+
+    def emit(builder, extra, line):
+        collection, scope, base, optional, _ = builder
+        always = optional[MAX_OPTIONAL_CLAUSES:]
+        optional = optional[:MAX_OPTIONAL_CLAUSES]
+        for size in range(len(optional) + 1):
+            for chosen in combinations(optional, size):
+                clauses = base + [clause for group in always + list(chosen) for clause in group] + extra
+                if clauses:
+                    shapes.append(_dart_shape(collection, scope, clauses, f"{relative}:{line}"))
+
+    for start, depth, statement in _statements(text):
+        line = text.count('\n', 0, start + len(statement) - len(statement.lstrip())) + 1
+        assignment = re.match(r'\s*(?:final\s+|var\s+|Query(?:<[^>]*>)?\s+)?(\w+)\s*=\s*(?!=)', statement)
+        target = assignment.group(1) if assignment else None
+
+        if target in builders and re.match(r'\s*' + re.escape(target) + r'\b', statement[assignment.end():]):
+            calls, _ = _call_chain(statement, assignment.end() + len(target))
+            clauses, _ = _clauses(calls)
+            builder = builders[target]
+            if clauses and depth > builder[4]:
+                builder[3].append(clauses)
+            else:
+                builder[2].extend(clauses)
+            continue
+
+        handled = False
+        for match in source_pattern.finditer(statement):
+            if match.group(3):
+                collection, scope = references[match.group(3)], 'COLLECTION'
+            else:
+                collection = match.group(2)
+                scope = 'COLLECTION_GROUP' if match.group(1) == 'collectionGroup' else 'COLLECTION'
+            calls, _ = _call_chain(statement, match.end())
+            if calls and calls[0][0] == 'doc':  # the parent of a subcollection
+                continue
+            clauses, terminal = _clauses(calls)
+            # The query is the assigned value itself, e.g. `Query query = _firestore.collection('x')...`
+            receiver = re.sub(r"\.collection\(\s*'\w+'\s*\)\s*\.doc\([^()]*\)", '',
+                              statement[assignment.end():match.start()] if assignment else '(')
+            if assignment and '(' not in receiver and not terminal:
+                builders[target] = [collection, scope, clauses, [], depth]
+                handled = True
+            elif clauses:
+                shapes.append(_dart_shape(collection, scope, clauses, f"{relative}:{line}"))
+        if handled:
+            continue
+
+        for name, builder in builders.items():
+            for use in re.finditer(r'\b' + re.escape(name) + r'\b(?=\s*\.)', statement):
+                calls, _ = _call_chain(statement, use.end())
+                clauses, terminal = _clauses(calls)
+                if terminal:
+                    emit(builder, clauses, line)
+    return shapes
+
+
+def scan_dart_sources(root):
+    """Returns the query shapes of every .dart file under `root`."""
+    shapes = []
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if name.endswith('.dart'):
+                shapes.extend(scan_dart_file(os.path.join(directory, name), root))
+    return shapes
+
+
+def _python_constants(tree):
+    """Returns the module-level string constants, e.g. BOOKINGS_COLLECTION = 'bookings'."""
+    constants = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+            constants[node.targets[0].id] = node.value.value
+    return constants
+
+
+def _python_string(node, constants):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    return None
+
+
+def _python_clause(method, call, constants):
+    """Returns the (kind, field, op-or-direction) clause of a .where()/.order_by() call, or None if not literal."""
+    args = {keyword.arg: keyword.value for keyword in call.keywords}
+    if method == 'where':
+        if isinstance(args.get('filter'), ast.Call):  # where(filter=FieldFilter(field, op, value))
+            call, args = args['filter'], {keyword.arg: keyword.value for keyword in args['filter'].keywords}
+        positional = list(call.args) + [None] * 2
+        field = _python_string(positional[0] or args.get('field_path'), constants)
+        op = _python_string(positional[1] or args.get('op_string'), constants)
+        return ('filter', field, op) if field and op else None
+    field = _python_string(call.args[0], constants) if call.args else None
+    direction = call.args[1] if len(call.args) > 1 else args.get('direction')
+    descending = ((isinstance(direction, ast.Attribute) and direction.attr == 'DESCENDING')
+                  or (isinstance(direction, ast.Constant) and direction.value == 'DESCENDING'))
+    return ('order', field, 'desc' if descending else 'asc') if field else None
+
+
+def _python_chain(node, constants, builders):
+    """
+    Resolves a Python call chain to (collection, scope, clauses, own clause
+    count), starting from a .collection()/.collection_group() call or a
+    variable holding a query. Returns None when the chain is not a query on a
+    collection the scan can name.
+    """
+    calls = []
+    while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        calls.append((node.func.attr, node))
+        node = node.func.value
+    calls.reverse()
+    root = builders.get(node.id) if isinstance(node, ast.Name) else None
+    collection, scope, clauses, _ = root if root else (None, None, [], 0)
+    clauses = list(clauses)
+    own = 0
+    for method, call in calls:
+        if method in ('collection', 'collection_group'):
+            name = _python_string(call.args[0], constants) if call.args else None
+            collection = name
+            scope = 'COLLECTION_GROUP' if method == 'collection_group' else 'COLLECTION'
+            clauses, own = [], 0
+        elif collection is None:
+            continue
+        elif method == 'document':
+            collection = None  # a document, until a subcollection call
+        elif method in ('where', 'order_by'):
+            clause = _python_clause(method, call, constants)
+            if clause is None:
+                return None
+            clauses.append(clause)
+            own += 1
+        elif method not in PYTHON_PASSTHROUGH_METHODS:
+            return None
+    return (collection, scope, clauses, own) if collection else None
+
+
+def scan_python_file(path, root):
+    """
+    Returns the query shapes built in one Python file. Variables assigned a
+    query (e.g. `reviews = db.collection('reviews')`) are followed within
+    their function; collections named by anything but a literal or
+    module-level constant are skipped.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    relative = os.path.relpath(path, root)
+    constants = _python_constants(tree)
+    shapes = []
+
+    def chains(node):
+        """Yields the outermost call chains within an expression."""
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            yield node
+            inner = node
+            while isinstance(inner, ast.Call) and isinstance(inner.func, ast.Attribute):
+                for argument in list(inner.args) + [keyword.value for keyword in inner.keywords]:
+                    yield from chains(argument)
+                inner = inner.func.value
+            yield from chains(inner)
+            return
+        for child in ast.iter_child_nodes(node):
+            yield from chains(child)
+
+    def scan_body(statements, builders):
+        """Scans statements in order; a function body starts from a copy of the enclosing builders."""
+        for statement in statements:
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                scan_body(statement.body, dict(builders))
+                continue
+            for child in ast.iter_child_nodes(statement):
+                if isinstance(child, (ast.stmt, ast.excepthandler)):
+                    continue
+                for chain in chains(child):
+                    resolved = _python_chain(chain, constants, builders)
+                    if resolved and resolved[3]:  # uses of a stored query were recorded where it was built
+                        collection, scope, clauses, _ = resolved
+                        shapes.append(_dart_shape(collection, scope, clauses, f"{relative}:{chain.lineno}"))
+            for field in ('body', 'orelse', 'finalbody'):
+                scan_body(getattr(statement, field, []), builders)
+            for handler in getattr(statement, 'handlers', []):
+                scan_body(handler.body, builders)
+            if (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+                    and isinstance(statement.targets[0], ast.Name)):
+                resolved = _python_chain(statement.value, constants, builders)
+                if resolved:
+                    builders[statement.targets[0].id] = resolved
+                else:
+                    builders.pop(statement.targets[0].id, None)
+
+    scan_body(tree.body, {})
+    return shapes
+
+
+def scan_python_sources(root):
+    """Returns the query shapes of every .py file directly in `root`."""
+    shapes = []
+    for name in sorted(os.listdir(root)):
+        if name.endswith('.py'):
+            shapes.extend(scan_python_file(os.path.join(root, name), root))
+    return shapes
+
+
+# --- Index requirements ---
+def _field_kind(op):
+    return 'array' if op in ARRAY_OPS else 'value'
+
+
+def required_index(shape, field_rank=None):
+    """
+    Returns the composite index a query shape needs as (collection, scope,
+    equality entries, sorted entries), or None when single-field indexes serve
+    it. Equality entries are (field, 'value' | 'array') and may appear in any
+    order in the index; sorted entries are (field, 'asc' | 'desc') and must
+    follow them exactly: the orderBy clauses, then inequality fields that were
+    not ordered explicitly.
+    """
+    equality = []
+    for field, op in shape['filters']:
+        if op in EQUALITY_OPS or op in ARRAY_OPS:
+            entry = (field, _field_kind(op))
+            if entry not in equality:
+                equality.append(entry)
+    equality_fields = {field for field, kind in equality if kind == 'value'}
+    ordered = [(field, direction) for field, direction in shape['orderBy'] if field not in equality_fields]
+    inequality = [field for field, op in shape['filters'] if op in RANGE_OPS]
+    for field in inequality:
+        if field not in {name for name, _ in ordered}:
+            # Implicit orderings follow the direction of the last explicit one
+            ordered.append((field, ordered[-1][1] if ordered else 'asc'))
+    if not ordered or len(equality) + len(ordered) < 2:
+        return None
+    if field_rank:
+        equality.sort(key=lambda entry: (-field_rank.get(entry[0], 0), entry[0]))
+    return shape['collection'], shape['queryScope'], tuple(equality), tuple(ordered)
+
+
+def covers(index, requirement):
+    """Whether a declared index (in firestore.indexes.json form) can serve a requirement."""
+    collection, scope, equality, ordered = requirement
+    if index.get('collectionGroup') != collection or index.get('queryScope', 'COLLECTION') != scope:
+        return False
+    entries = [
+        (field['fieldPath'], 'array' if 'arrayConfig' in field else field.get('order', 'ASCENDING'))
+        for field in index.get('fields', [])
+    ]
+    if len(entries) < len(equality) + len(ordered):
+        return False
+    prefix = entries[:len(equality)]
+    if {(path, 'array' if kind == 'array' else 'value') for path, kind in prefix} != set(equality):
+        return False
+    suffix = entries[len(equality):len(equality) + len(ordered)]
+    return suffix == [(field, 'DESCENDING' if direction == 'desc' else 'ASCENDING') for field, direction in ordered]
+
+
+def index_definition(requirement):
+    collection, scope, equality, ordered = requirement
+    fields = [
+        {'fieldPath': field, 'arrayConfig': 'CONTAINS'} if kind == 'array'
+        else {'fieldPath': field, 'order': 'ASCENDING'}
+        for field, kind in equality
+    ]
+    fields += [
+        {'fieldPath': field, 'order': 'DESCENDING' if direction == 'desc' else 'ASCENDING'}
+        for field, direction in ordered
+    ]
+    return {'collectionGroup': collection, 'queryScope': scope, 'fields': fields}
+
+
+def queried_fields(shapes):
+    """Returns {collection: set of fields any query filters or orders on}."""
+    fields = defaultdict(set)
+    for shape in shapes:
+        fields[shape['collection']].update(field for field, _ in shape['filters'])
+        fields[shape['collection']].update(field for field, _ in shape['orderBy'])
+    return fields
+
+
+def analyze(shapes, declared):
+    """
+    Matches query requirements against the declared indexes. Returns
+    (requirements with their shapes, a status per declared index, new index
+    definitions) where the new definitions are a greedy minimal set covering
+    every requirement no declared index serves.
+    """
+    # Put equality fields shared by many queries first, so one index can serve several shapes
+    field_rank = Counter()
+    for shape in shapes:
+        for field in {field for field, _ in shape['filters']} | {field for field, _ in shape['orderBy']}:
+            field_rank[field] += 1
+
+    requirements = defaultdict(list)
+    for shape in shapes:
+        requirement = required_index(shape, field_rank)
+        if requirement:
+            requirements[requirement].append(shape)
+
+    fields = queried_fields(shapes)
+    statuses = []
+    for index in declared:
+        collection = index.get('collectionGroup')
+        paths = [field['fieldPath'] for field in index.get('fields', [])]
+        unknown = [path for path in paths if path not in fields[collection]]
+        if len(paths) < 2:
+            statuses.append(('single-field', None))
+        elif unknown:
+            hints = {
+                path: difflib.get_close_matches(path, fields[collection], n=1, cutoff=0.6)
+                or [name for name in fields[collection] if name.lower().endswith(path.lower())][:1]
+                for path in unknown
+            }
+            statuses.append(('mismatched', {path: hint[0] if hint else None for path, hint in hints.items()}))
+        elif any(covers(index, requirement) for requirement in requirements):
+            statuses.append(('used', None))
+        else:
+            statuses.append(('unused', None))
+
+    missing = [requirement for requirement in requirements
+               if not any(covers(index, requirement) for index in declared)]
+    added = []
+    for requirement in sorted(missing, key=lambda req: len(req[2]) + len(req[3]), reverse=True):
+        if not any(covers(index, requirement) for index in added):
+            added.append(index_definition(requirement))
+    added.sort(key=lambda index: index['collectionGroup'])
+    return requirements, statuses, added
+
+
+def _describe(index):
+    fields = ', '.join(
+        f"{field['fieldPath']} {'contains' if 'arrayConfig' in field else field.get('order', 'ASCENDING')[:-6].lower()}"
+        for field in index.get('fields', [])
+    )
+    return f"{index.get('collectionGroup')} ({fields})"
+
+
+def print_report(shapes, requirements, declared, statuses, added):
+    print(f"\n--- 🔎 Index advice for {len(shapes)} query shape(s), {len(requirements)} needing a composite index ---")
+    for index, (status, details) in zip(declared, statuses):
+        if status == 'used':
+            print(f"✅ used          {_describe(index)}")
+        elif status == 'unused':
+            print(f"🟡 unused        {_describe(index)}")
+        elif status == 'single-field':
+            print(f"🟡 single-field  {_describe(index)} — served by the automatic single-field index")
+        else:
+            hints = ', '.join(
+                f"'{path}' (did you mean '{hint}'?)" if hint else f"'{path}'" for path, hint in details.items()
+            )
+            print(f"❌ mismatched    {_describe(index)} — no query uses {hints}")
+    for index in added:
+        served = [shape for requirement, items in requirements.items()
+                  if covers(index, requirement) for shape in items]
+        sources = sorted({shape['source'] for shape in served})
+        print(f"➕ missing       {_describe(index)} — {len(served)} shape(s), e.g. {', '.join(sources[:3])}")
+    if not added:
+        print("✅ Every recorded query is served by a declared or single-field index.")
+
+
+def prunable(status, prune, prune_unused):
+    """
+    Whether --prune may drop an index. Single-field composites are always
+    wrong, and so is a mismatched field with a close queried name (a likely
+    typo). An unused index, or a mismatched one with no such hint, may serve
+    a query the scans cannot see, so it goes only with --prune-unused.
+    """
+    kind, details = status
+    if kind == 'used' or not (prune or prune_unused):
+        return False
+    if kind == 'single-field' or (kind == 'mismatched' and all(details.values())):
+        return True
+    return prune_unused
+
+
+def main(args):
+    shapes = []
+    for path in args.shapes:
+        if os.path.exists(path):
+            shapes.extend(load_recorded_shapes(path))
+        else:
+            print(f"🟡 Query shape file '{path}' not found; run load_test.py to record one.")
+    for root in args.dart:
+        shapes.extend(scan_dart_sources(root))
+    for root in args.python:
+        shapes.extend(scan_python_sources(root))
+    if not shapes:
+        print("❌ No query shapes to analyze.")
+        return
+
+    try:
+        with open(args.indexes, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception as e:
+        print(f"❌ Could not read '{args.indexes}': {e}")
+        return
+    declared = config.get('indexes', [])
+
+    requirements, statuses, added = analyze(shapes, declared)
+    print_report(shapes, requirements, declared, statuses, added)
+
+    kept = [index for index, status in zip(declared, statuses) if not prunable(status, args.prune, args.prune_unused)]
+    config['indexes'] = kept + added
+    config.setdefault('fieldOverrides', [])
+    if not args.write:
+        print(f"\n🟡 Dry run: {len(config['indexes'])} index(es) would be written; pass --write to update the file.")
+        return
+    with open(args.indexes, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+        f.write('\n')
+    print(f"\n✅ Wrote {len(config['indexes'])} index(es) to '{args.indexes}' "
+          f"({len(added)} added, {len(declared) - len(kept)} removed).")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Propose composite indexes from recorded and scanned query shapes.")
+    parser.add_argument('--shapes', action='append', default=None,
+                        help='Query shape JSONL from load_test.py (repeatable; default: query_shapes.jsonl).')
+    parser.add_argument('--dart', action='append', default=None,
+                        help='Dart source directory to scan for queries (repeatable; default: lib).')
+    parser.add_argument('--no-dart', action='store_true', help='Do not scan Dart sources.')
+    parser.add_argument('--python', action='append', default=None,
+                        help='Python script directory to scan for queries (repeatable; default: scripts).')
+    parser.add_argument('--no-python', action='store_true', help='Do not scan Python scripts.')
+    parser.add_argument('--indexes', default=INDEXES_FILE, help='Path to firestore.indexes.json.')
+    parser.add_argument('--prune', action='store_true',
+                        help='Drop single-field composites and mismatched indexes whose field looks like a typo.')
+    parser.add_argument('--prune-unused', action='store_true',
+                        help='Also drop unused and unexplained mismatched indexes; only safe when every query '
+                             'source was scanned.')
+    parser.add_argument('--write', action='store_true', help='Write the updated index file (default: report only).')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    args.shapes = args.shapes or [SHAPES_JSONL_FILE]
+    args.dart = [] if args.no_dart else (args.dart or [DART_SOURCE_DIR])
+    args.python = [] if args.no_python else (args.python or [PYTHON_SOURCE_DIR])
+    run_entry_point(lambda: main(args), 'index_advisor', args)
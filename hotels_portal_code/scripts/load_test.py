@@ -0,0 +1,362 @@
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+PROJECT_ID = 'graduation-project-5f333'
+DEFAULT_EMULATOR_HOST = 'localhost:8080'
+RESULTS_JSON_FILE = os.path.join(os.path.dirname(__file__), 'load_test_results.json')
+SHAPES_JSONL_FILE = os.path.join(os.path.dirname(__file__), 'query_shapes.jsonl')
+BATCH_SIZE = 500
+ACTIVE_STATUSES = ['confirmed', 'checked_in']
+POPULAR_STATUSES = ['confirmed', 'checked_in', 'completed']
+BOOKING_STATUS_WEIGHTS = {'confirmed': 35, 'checked_in': 10, 'completed': 40, 'cancelled': 10, 'pending': 5}
+
+# Scenario -> (concurrency, requests per second); override with --scenario NAME=CONCURRENCY:RATE
+DEFAULT_SCENARIOS = {
+    'search_hotels': (8, 5.0),
+    'availability': (16, 20.0),
+    'popular_hotels': (4, 2.0),
+    'popular_hotels_leaderboard': (16, 20.0),
+    'create_booking': (8, 10.0),
+    'hotel_dashboard': (4, 2.0),
+    'ministry_dashboard': (2, 0.5),
+}
+
+
+def connect_to_emulator(host=DEFAULT_EMULATOR_HOST, project_id=PROJECT_ID):
+    """Returns a Firestore client bound to the local emulator, never to production."""
+    from google.cloud import firestore
+    os.environ['FIRESTORE_EMULATOR_HOST'] = host
+    print(f"✅ Connected to the Firestore emulator at {host} (project '{project_id}').")
+    return firestore.Client(project=project_id)
+
+
+class QueryRecorder:
+    """Counts the distinct query shapes issued, for index analysis."""
+
+    def __init__(self):
+        self.shapes = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, collection, filters, order_by):
+        shape = json.dumps({
+            'collection': collection,
+            'filters': [[field, op] for field, op, _ in filters],
+            'orderBy': [[field, direction] for field, direction in order_by],
+        }, sort_keys=True)
+        with self._lock:
+            self.shapes[shape] += 1
+
+    def write_jsonl(self, path=SHAPES_JSONL_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            for shape, count in self.shapes.most_common():
+                f.write(json.dumps({**json.loads(shape), 'count': count}) + '\n')
+        print(f"✅ Recorded {len(self.shapes)} query shape(s) to '{path}'.")
+
+
+def run_query(db, recorder, collection, filters=(), order_by=(), limit=None):
+    """Builds, records and runs a query; returns its documents."""
+    from google.cloud.firestore import Query
+    recorder.record(collection, filters, order_by)
+    query = db.collection(collection)
+    for field, op, value in filters:
+        query = query.where(field, op, value)
+    for field, direction in order_by:
+        query = query.order_by(field, direction=Query.DESCENDING if direction == 'desc' else Query.ASCENDING)
+    if limit:
+        query = query.limit(limit)
+    return list(query.stream())
+
+
+# --- Seeding ---
+def seed_emulator(db, guests=200, bookings=5000):
+    """
+    Loads the reset_data hotel catalogue plus synthetic guests and bookings,
+    shaped like the app writes them (bookings reference hotel, room and guest).
+    """
+    from reset_data import HOTEL_DATA
+    print(f"\n--- 🌱 Seeding emulator: {len(HOTEL_DATA)} hotels, {guests} guests, {bookings} bookings ---")
+    now = datetime.now(timezone.utc)
+    writes = []
+    rooms = []
+    for hotel_data in HOTEL_DATA:
+        hotel_id = str(uuid.uuid4())
+        hotel = {k: v for k, v in hotel_data.items() if k not in ('admin', 'rooms')}
+        writes.append((db.collection('hotels').document(hotel_id), {
+            **hotel, 'hotelId': hotel_id, 'images': [], 'createdAt': now, 'updatedAt': now}))
+        for room_data in hotel_data.get('rooms', []):
+            room_id = str(uuid.uuid4())
+            rooms.append((hotel_id, room_id, room_data, hotel_data))
+            writes.append((db.collection('rooms').document(room_id), {
+                'roomId': room_id, 'hotelId': hotel_id, 'roomType': room_data['roomType'],
+                'roomDescription': room_data['description'], 'maxAdults': 2, 'maxChildren': 1,
+                'pricePerNight': room_data['pricePerNight'], 'amenities': room_data['amenities'],
+                'images': [], 'available': True, 'createdAt': now, 'updatedAt': now}))
+
+    guest_ids = [str(uuid.uuid4()) for _ in range(guests)]
+    for guest_id in guest_ids:
+        writes.append((db.collection('guests').document(guest_id), {
+            'guestId': guest_id, 'FName': 'Load', 'LName': 'Test', 'email': f"{guest_id}@example.com",
+            'role': 'guest', 'active': True, 'favoriteHotelIds': [], 'createdAt': now, 'updatedAt': now}))
+
+    statuses, weights = zip(*BOOKING_STATUS_WEIGHTS.items())
+    for _ in range(bookings):
+        hotel_id, room_id, room_data, hotel_data = random.choice(rooms)
+        booking_id = str(uuid.uuid4())
+        check_in = now + timedelta(days=random.randint(-90, 60))
+        nights = random.randint(1, 7)
+        created_at = min(check_in, now) - timedelta(days=random.randint(0, 30))
+        writes.append((db.collection('bookings').document(booking_id), {
+            'bookingId': booking_id,
+            'guestId': db.collection('guests').document(random.choice(guest_ids)),
+            'hotelId': db.collection('hotels').document(hotel_id),
+            'roomId': db.collection('rooms').document(room_id),
+            'checkInDate': check_in, 'checkOutDate': check_in + timedelta(days=nights),
+            'adultsGuests': 2, 'childrenGuests': 0, 'roomType': room_data['roomType'], 'roomsQuantity': 1,
+            'totalAmount': room_data['pricePerNight'] * nights,
+            'bookingStatus': random.choices(statuses, weights)[0],
+            'confirmationCode': booking_id[:8].upper(), 'createdAt': created_at, 'updatedAt': created_at,
+            'guestName': 'Load Test', 'hotelName': hotel_data['hotelName'],
+            'hotelCity': hotel_data['hotelCity'], 'hotelState': hotel_data['hotelState']}))
+
+    for start in range(0, len(writes), BATCH_SIZE):
+        batch = db.batch()
+        for doc_ref, data in writes[start:start + BATCH_SIZE]:
+            batch.set(doc_ref, data)
+        batch.commit()
+    print(f"✅ Wrote {len(writes)} documents.")
+
+
+class SeedCatalog:
+    """IDs sampled by the scenarios, read once from the emulator."""
+
+    def __init__(self, db):
+        self.hotels = [(doc.id, doc.get('hotelState')) for doc in db.collection('hotels').select(['hotelState']).stream()]
+        self.rooms = [(doc.id, doc.get('hotelId'), doc.get('roomType'), doc.get('pricePerNight'))
+                      for doc in db.collection('rooms').select(['hotelId', 'roomType', 'pricePerNight']).stream()]
+        self.guests = [doc.id for doc in db.collection('guests').select([]).stream()]
+        self.states = sorted({state for _, state in self.hotels if state})
+        if not self.hotels or not self.rooms or not self.guests:
+            raise RuntimeError("The emulator has no seed data; run with --seed first.")
+
+
+def _random_stay():
+    check_in = datetime.now(timezone.utc) + timedelta(days=random.randint(0, 60))
+    return check_in, check_in + timedelta(days=random.randint(1, 5))
+
+
+# --- Scenarios: each mirrors the queries one app call issues ---
+def scenario_search_hotels(db, catalog, recorder):
+    """SearchService.searchHotels with a state, price range and dates."""
+    hotels = run_query(db, recorder, 'hotels',
+                       [('hotelState', '==', random.choice(catalog.states)), ('approved', '==', True)], limit=50)
+    check_in, check_out = _random_stay()
+    for hotel in hotels:
+        run_query(db, recorder, 'rooms', [('hotelId', '==', hotel.id)])
+        bookings = run_query(db, recorder, 'bookings',
+                             [('hotelId', '==', db.collection('hotels').document(hotel.id)),
+                              ('bookingStatus', 'in', ACTIVE_STATUSES)])
+        any(b.get('checkInDate') < check_out and b.get('checkOutDate') > check_in for b in bookings)
+
+
+def scenario_availability(db, catalog, recorder):
+    """BookingService.getAvailableRoomCounts: rooms and conflicting bookings in parallel."""
+    hotel_id, _ = random.choice(catalog.hotels)
+    _, check_out = _random_stay()
+    run_query(db, recorder, 'rooms', [('hotelId', '==', hotel_id), ('available', '==', True)])
+    run_query(db, recorder, 'bookings', [
+        ('hotelId', '==', db.collection('hotels').document(hotel_id)),
+        ('bookingStatus', 'in', ACTIVE_STATUSES),
+        ('checkInDate', '<', check_out),
+    ])
+
+
+def scenario_popular_hotels(db, catalog, recorder):
+    """SearchService.getPopularHotels without the leaderboard: 30-day scan plus one get per hotel."""
+    since = datetime.now(timezone.utc) - timedelta(days=30)
+    bookings = run_query(db, recorder, 'bookings',
+                         [('createdAt', '>=', since), ('bookingStatus', 'in', POPULAR_STATUSES)])
+    counts = Counter()
+    for booking in bookings:
+        hotel_id = booking.get('hotelId')
+        counts[hotel_id.id if hasattr(hotel_id, 'id') else hotel_id] += 1
+    for hotel_id, _ in counts.most_common(10):
+        db.collection('hotels').document(hotel_id).get()
+
+
+def scenario_popular_hotels_leaderboard(db, catalog, recorder):
+    """SearchService.getPopularHotels with the precomputed leaderboard: one read."""
+    db.collection('leaderboards').document('popular_hotels').get()
+
+
+def scenario_create_booking(db, catalog, recorder):
+    """BookingService.createBooking: booking write, notifications, hotel read, activity log."""
+    room_id, hotel_id, room_type, price = random.choice(catalog.rooms)
+    guest_id = random.choice(catalog.guests)
+    booking_id = str(uuid.uuid4())
+    check_in, check_out = _random_stay()
+    now = datetime.now(timezone.utc)
+    db.collection('bookings').document(booking_id).set({
+        'bookingId': booking_id,
+        'guestId': db.collection('guests').document(guest_id),
+        'hotelId': db.collection('hotels').document(hotel_id),
+        'roomId': db.collection('rooms').document(room_id),
+        'checkInDate': check_in, 'checkOutDate': check_out, 'adultsGuests': 2, 'childrenGuests': 0,
+        'roomType': room_type, 'roomsQuantity': 1, 'totalAmount': price or 0.0, 'bookingStatus': 'pending',
+        'confirmationCode': booking_id[:8].upper(), 'createdAt': now, 'updatedAt': now,
+        'guestName': 'Load Test', 'hotelName': '', 'hotelCity': '', 'hotelState': ''})
+    notifications = db.collection('guests').document(guest_id).collection('notifications')
+    notifications.add({'title': 'Booking pending', 'bookingId': booking_id, 'createdAt': now, 'read': False})
+    notifications.add({'title': 'Booking confirmed', 'bookingId': booking_id, 'createdAt': now, 'read': False})
+    db.collection('hotels').document(hotel_id).get()
+    db.collection('activities').add({'type': 'New Booking', 'entityId': booking_id, 'timestamp': now})
+
+
+def scenario_hotel_dashboard(db, catalog, recorder):
+    """AnalyticsService.getHotelDashboardStats: hotel, its rooms and all its bookings."""
+    hotel_id, _ = random.choice(catalog.hotels)
+    db.collection('hotels').document(hotel_id).get()
+    run_query(db, recorder, 'rooms', [('hotelId', '==', hotel_id)])
+    run_query(db, recorder, 'bookings', [('hotelId', '==', db.collection('hotels').document(hotel_id))])
+
+
+def scenario_ministry_dashboard(db, catalog, recorder):
+    """AnalyticsService.getDashboardStats: full bookings, hotels and guests reads."""
+    run_query(db, recorder, 'bookings')
+    run_query(db, recorder, 'hotels')
+    run_query(db, recorder, 'guests')
+
+
+SCENARIOS = {
+    'search_hotels': scenario_search_hotels,
+    'availability': scenario_availability,
+    'popular_hotels': scenario_popular_hotels,
+    'popular_hotels_leaderboard': scenario_popular_hotels_leaderboard,
+    'create_booking': scenario_create_booking,
+    'hotel_dashboard': scenario_hotel_dashboard,
+    'ministry_dashboard': scenario_ministry_dashboard,
+}
+
+
+# --- Runner ---
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def run_scenario(name, func, db, catalog, recorder, concurrency, rate, duration):
+    """
+    Issues `rate` calls per second for `duration` seconds with at most
+    `concurrency` in flight. Latency is measured from each call's scheduled
+    start, so queueing behind a saturated pool shows up in the percentiles.
+    """
+    latencies = []
+    errors = Counter()
+    lock = threading.Lock()
+
+    def call(scheduled_at):
+        try:
+            func(db, catalog, recorder)
+            with lock:
+                latencies.append(time.perf_counter() - scheduled_at)
+        except Exception as e:
+            with lock:
+                errors[type(e).__name__] += 1
+
+    started = time.perf_counter()
+    interval = 1.0 / rate
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        issued = 0
+        while True:
+            scheduled_at = started + issued * interval
+            if scheduled_at - started >= duration:
+                break
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(call, scheduled_at)
+            issued += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        'scenario': name, 'concurrency': concurrency, 'targetRate': rate, 'issued': issued,
+        'completed': len(latencies), 'errors': dict(errors), 'throughput': len(latencies) / elapsed,
+        'p50Ms': percentile(latencies, 0.50), 'p95Ms': percentile(latencies, 0.95),
+        'p99Ms': percentile(latencies, 0.99), 'maxMs': latencies[-1] if latencies else None,
+    }
+    for key in ('p50Ms', 'p95Ms', 'p99Ms', 'maxMs'):
+        if result[key] is not None:
+            result[key] = round(result[key] * 1000, 2)
+    return result
+
+
+def parse_scenarios(overrides, only):
+    scenarios = dict(DEFAULT_SCENARIOS)
+    for override in overrides or []:
+        name, _, settings = override.partition('=')
+        concurrency, _, rate = settings.partition(':')
+        scenarios[name] = (int(concurrency), float(rate))
+    if only:
+        scenarios = {name: scenarios[name] for name in only}
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+    return scenarios
+
+
+def run_load_test(args):
+    db = connect_to_emulator(args.emulator_host, args.project)
+    if args.seed:
+        seed_emulator(db, args.seed_guests, args.seed_bookings)
+
+    scenarios = parse_scenarios(args.scenario, args.only)
+    catalog = SeedCatalog(db)
+    recorder = QueryRecorder()
+    results = []
+
+    print(f"\n--- 🏋️ Running {len(scenarios)} scenario(s) for {args.duration}s each ---")
+    print(f"{'scenario':<28}{'conc':>5}{'rate':>7}{'done':>7}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, (concurrency, rate) in scenarios.items():
+        result = run_scenario(name, SCENARIOS[name], db, catalog, recorder, concurrency, rate, args.duration)
+        results.append(result)
+        print(f"{name:<28}{concurrency:>5}{rate:>7.1f}{result['completed']:>7}{sum(result['errors'].values()):>5}"
+              f"{result['p50Ms'] or 0:>9.1f}{result['p95Ms'] or 0:>9.1f}{result['p99Ms'] or 0:>9.1f}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'generatedAt': datetime.now().isoformat(), 'durationSeconds': args.duration,
+                   'results': results}, f, indent=2)
+    print(f"\n✅ Results written to '{args.output}'.")
+    recorder.write_jsonl(args.shapes_output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay the app's Firestore query patterns against the emulator.")
+    parser.add_argument('--emulator-host', default=os.environ.get('FIRESTORE_EMULATOR_HOST', DEFAULT_EMULATOR_HOST))
+    parser.add_argument('--project', default=PROJECT_ID)
+    parser.add_argument('--seed', action='store_true', help='Load seed data into the emulator first.')
+    parser.add_argument('--seed-guests', type=int, default=200)
+    parser.add_argument('--seed-bookings', type=int, default=5000)
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per scenario.')
+    parser.add_argument('--only', nargs='+', help='Run only these scenarios.')
+    parser.add_argument('--scenario', action='append', metavar='NAME=CONCURRENCY:RATE',
+                        help='Override concurrency and requests/second for a scenario.')
+    parser.add_argument('--output', default=RESULTS_JSON_FILE, help='Path of the JSON results.')
+    parser.add_argument('--shapes-output', default=SHAPES_JSONL_FILE, help='Path of the recorded query shapes.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: run_load_test(args), 'load_test', args)
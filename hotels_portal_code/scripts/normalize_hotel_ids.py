@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import backend
+from backend import firestore
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+HOTELS_COLLECTION = 'hotels'
+CHECKPOINT_FILE = os.path.join(os.path.dirname(__file__), 'normalize_hotel_ids.checkpoint.json')
+PAGE_SIZE = 500  # also the Firestore batch write limit
+MAX_WORKERS = 8
+
+# Canonical hotelId form per collection, matching the Dart models:
+# Booking.hotelId is a DocumentReference; Room, Review and Admin store the ID string.
+CANONICAL_FORMS = {
+    'bookings': 'reference',
+    'rooms': 'string',
+    'reviews': 'string',
+    'admins': 'string',
+}
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def classify(value):
+    """
+    Returns (kind, hotel_id) for a stored hotelId value. Kinds are 'string',
+    'reference', 'path' (a string like 'hotels/abc'), 'missing' and 'other'.
+    """
+    if value is None:
+        return 'missing', None
+    if isinstance(value, firestore.DocumentReference):
+        return 'reference', value.id
+    if isinstance(value, str):
+        if '/' in value:
+            return 'path', value.rstrip('/').rsplit('/', 1)[-1]
+        return ('string', value) if value else ('missing', None)
+    return 'other', None
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_FILE):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def stream_pages(collection, start_after_id=None, page_size=PAGE_SIZE):
+    """Yields pages of hotelId-only snapshots in document-ID order, resuming after `start_after_id`."""
+    query = collection.order_by('__name__').select(['hotelId']).limit(page_size)
+    cursor = collection.document(start_after_id) if start_after_id else None
+    while True:
+        page_query = query.start_after({'__name__': cursor}) if cursor is not None else query
+        page = list(page_query.stream())
+        if not page:
+            return
+        yield page
+        cursor = page[-1].reference
+
+
+def _commit(db, updates):
+    batch = db.batch()
+    for doc_ref, value in updates:
+        batch.update(doc_ref, {'hotelId': value})
+    batch.commit()
+    return len(updates)
+
+
+def normalize_collection(db, name, form, apply, checkpoint, executor):
+    """
+    Scans one collection, counting each hotelId representation. When `apply`
+    is set, rewrites every non-canonical value, one batch per page committed
+    in the background, recording the last fully committed page in the checkpoint.
+    """
+    hotels = db.collection(HOTELS_COLLECTION)
+    counts = Counter()
+    rewritten = 0
+    pending = []  # (future, last doc id of the page)
+
+    print(f"\nScanning '{name}' (canonical form: {form})...")
+    for page in stream_pages(db.collection(name), checkpoint.get(name) if apply else None):
+        updates = []
+        for snapshot in page:
+            kind, hotel_id = classify((snapshot.to_dict() or {}).get('hotelId'))
+            counts[kind] += 1
+            if hotel_id is None or kind == form:
+                continue
+            updates.append((snapshot.reference, hotels.document(hotel_id) if form == 'reference' else hotel_id))
+
+        if apply and updates:
+            pending.append((executor.submit(_commit, db, updates), page[-1].id))
+        elif apply:
+            pending.append((None, page[-1].id))
+        else:
+            rewritten += len(updates)
+
+        # Advance the checkpoint over the leading run of committed pages
+        while pending and (pending[0][0] is None or pending[0][0].done()):
+            future, last_id = pending.pop(0)
+            if future is not None:
+                rewritten += future.result()
+            checkpoint[name] = last_id
+            save_checkpoint(checkpoint)
+
+    for future, last_id in pending:
+        if future is not None:
+            rewritten += future.result()
+        checkpoint[name] = last_id
+        save_checkpoint(checkpoint)
+
+    summary = ', '.join(f"{kind}: {count}" for kind, count in sorted(counts.items())) or 'no documents'
+    verb = 'Rewrote' if apply else 'Would rewrite'
+    print(f"  {summary}")
+    print(f"  {verb} {rewritten} document(s).")
+    if counts['other'] or counts['missing']:
+        print(f"  ⚠️ {counts['other'] + counts['missing']} document(s) have a missing or unrecognized hotelId and were left as-is.")
+    return counts, rewritten
+
+
+def run_migration(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    forms = dict(CANONICAL_FORMS)
+    for override in args.form or []:
+        collection, _, form = override.partition('=')
+        forms[collection] = form
+
+    checkpoint = {} if args.restart else load_checkpoint()
+    mode = 'APPLY' if args.apply else 'DRY RUN'
+    print(f"\n--- 🧹 Normalizing hotelId references ({mode}) ---")
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for name, form in forms.items():
+                normalize_collection(db, name, form, args.apply, checkpoint, executor)
+        if args.apply and os.path.exists(CHECKPOINT_FILE):
+            os.remove(CHECKPOINT_FILE)
+        print("\n✅ Normalization complete.")
+    except Exception as e:
+        print(f"\n❌ An error occurred during normalization: {e}")
+        if args.apply:
+            print(f"Progress is saved in '{CHECKPOINT_FILE}'; re-run with --apply to resume.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Detect and fix mixed string/reference hotelId values.")
+    parser.add_argument('--apply', action='store_true', help='Rewrite non-canonical values (default is a dry run).')
+    parser.add_argument('--form', action='append', metavar='COLLECTION=string|reference',
+                        help='Override the canonical form for a collection.')
+    parser.add_argument('--restart', action='store_true', help='Ignore any saved checkpoint.')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Concurrent batch commits.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    for override in args.form or []:
+        collection, _, form = override.partition('=')
+        if collection not in CANONICAL_FORMS:
+            parser.error(f"--form: unknown collection '{collection}' (choose from {', '.join(CANONICAL_FORMS)})")
+        if form not in ('string', 'reference'):
+            parser.error(f"--form: {collection} must be 'string' or 'reference', not '{form}'")
+    run_entry_point(lambda: run_migration(args), 'normalize_hotel_ids', args)
@@ -0,0 +1,269 @@
+import argparse
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import backend
+from backend import firestore
+from favorites_index import AGGREGATES_COLLECTION, FAVORITES_STATE_DOC, favorited_by
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+MULTICAST_LIMIT = 500  # FCM's per-call token limit
+GET_ALL_CHUNK = 300
+PRUNE_CHUNK = 100  # guests read and cleared per pruning transaction
+MAX_WORKERS = 8
+TARGET_STATUSES = ['confirmed', 'checked_in', 'completed']
+# FCM error codes meaning the token will never work again
+INVALID_TOKEN_CODES = {'registration-token-not-registered', 'invalid-registration-token'}
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+# --- Senders ---
+class FcmSender:
+    """Sends multicast messages through Firebase Cloud Messaging."""
+
+    def send_multicast(self, tokens, title, body, data):
+        """Returns a list of (token, error_code or None), in token order."""
+        from firebase_admin import exceptions, messaging
+        message = messaging.MulticastMessage(
+            tokens=tokens,
+            notification=messaging.Notification(title=title, body=body),
+            data=data,
+        )
+        response = messaging.send_each_for_multicast(message)
+        return [(token, None if result.success else self._error_code(exceptions, messaging, result.exception))
+                for token, result in zip(tokens, response.responses)]
+
+    @staticmethod
+    def _error_code(exceptions, messaging, exception):
+        if isinstance(exception, messaging.UnregisteredError):
+            return 'registration-token-not-registered'
+        # INVALID_ARGUMENT also covers malformed payloads; only a rejected token is prunable
+        if isinstance(exception, exceptions.InvalidArgumentError) and 'registration token' in str(exception).lower():
+            return 'invalid-registration-token'
+        return str(getattr(exception, 'code', 'unknown')).lower().replace('_', '-')
+
+
+class LocalFcmStandIn:
+    """
+    An in-process FCM replacement for testing fan-out without a device or
+    project. Tokens starting with 'invalid' are reported as unregistered and
+    a `failure_rate` share of the rest fails transiently.
+    """
+
+    def __init__(self, latency=0.05, failure_rate=0.01, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send_multicast(self, tokens, title, body, data):
+        if len(tokens) > MULTICAST_LIMIT:
+            raise ValueError(f"A multicast message takes at most {MULTICAST_LIMIT} tokens.")
+        time.sleep(self.latency)
+        results = []
+        with self._lock:
+            for token in tokens:
+                if token.startswith('invalid'):
+                    results.append((token, 'registration-token-not-registered'))
+                elif self.random.random() < self.failure_rate:
+                    results.append((token, 'unavailable'))
+                else:
+                    results.append((token, None))
+                    self.sent.append((token, title, body, data))
+        return results
+
+
+# --- Targeting ---
+def guest_ids_from_bookings(db, hotel_ids=(), states=()):
+    """Returns the IDs of guests with a booking at any of the hotels or in any of the states."""
+    bookings = db.collection('bookings')
+    queries = [bookings.where('hotelId', '==', db.collection('hotels').document(hotel_id)) for hotel_id in hotel_ids]
+    queries += [bookings.where('hotelState', '==', state) for state in states]
+    guest_ids = set()
+    for query in queries:
+        for doc in query.where('bookingStatus', 'in', TARGET_STATUSES).select(['guestId']).stream():
+            guest_id = doc.get('guestId')
+            if guest_id is not None:
+                guest_ids.add(guest_id.id if hasattr(guest_id, 'id') else str(guest_id))
+    return guest_ids
+
+
+def guest_ids_from_favorites(db, hotel_ids):
+    """
+    Returns the IDs of guests who saved any of the hotels as a favorite, from
+    the favorites_index.py reverse index: one equality query per hotel. Falls
+    back to scanning favoriteHotelIds when the index has never been built.
+    """
+    if db.collection(AGGREGATES_COLLECTION).document(FAVORITES_STATE_DOC).get().exists:
+        return {guest_id for hotel_id in hotel_ids for guest_id in favorited_by(db, hotel_id)}
+    print("🟡 Favorites index not built; scanning guests' favoriteHotelIds instead. Run favorites_index.py --full.")
+    guest_ids = set()
+    # array_contains_any accepts at most 10 values per query
+    for start in range(0, len(hotel_ids), 10):
+        query = db.collection('guests').where('favoriteHotelIds', 'array_contains_any', hotel_ids[start:start + 10])
+        guest_ids.update(doc.id for doc in query.select([]).stream())
+    return guest_ids
+
+
+def stream_guest_tokens(db, guest_ids):
+    """Yields (guest_id, fcm_token) for active guests that have a token, reading guests in chunks."""
+    guests = db.collection('guests')
+    guest_ids = sorted(guest_ids)
+    for start in range(0, len(guest_ids), GET_ALL_CHUNK):
+        refs = [guests.document(guest_id) for guest_id in guest_ids[start:start + GET_ALL_CHUNK]]
+        for snapshot in db.get_all(refs, field_paths=['fcmToken', 'active']):
+            if not snapshot.exists:
+                continue
+            data = snapshot.to_dict()
+            if data.get('fcmToken') and data.get('active', True):
+                yield snapshot.id, data['fcmToken']
+
+
+# --- Fan-out ---
+def fan_out(sender, tokens_to_guests, title, body, data=None, max_workers=MAX_WORKERS):
+    """
+    Sends one message to every token in MULTICAST_LIMIT-sized batches across
+    `max_workers` threads. Returns (error counts, invalid tokens, delivered).
+    """
+    tokens = list(tokens_to_guests)
+    batches = [tokens[start:start + MULTICAST_LIMIT] for start in range(0, len(tokens), MULTICAST_LIMIT)]
+    errors = Counter()
+    invalid_tokens = set()
+    delivered = 0
+
+    def send(batch):
+        try:
+            return sender.send_multicast(batch, title, body, data or {})
+        except Exception as e:
+            print(f"  ⚠️ A batch of {len(batch)} failed entirely: {e}")
+            return [(token, 'batch-failed') for token in batch]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for results in executor.map(send, batches):
+            for token, error in results:
+                if error is None:
+                    delivered += 1
+                    continue
+                errors[error] += 1
+                if error in INVALID_TOKEN_CODES:
+                    invalid_tokens.add(token)
+    return errors, invalid_tokens, delivered
+
+
+def prune_tokens(db, invalid_tokens, tokens_to_guests):
+    """
+    Clears invalid tokens from their guest documents. Each chunk of guests is
+    re-read in a transaction and a token is cleared only if it is still the
+    one that failed, so a device that registered a new token meanwhile keeps it.
+    """
+    failed_tokens = {guest_id: token for token in invalid_tokens for guest_id in tokens_to_guests[token]}
+    guest_ids = sorted(failed_tokens)
+    guests = db.collection('guests')
+
+    @firestore.transactional
+    def prune_chunk(transaction, refs):
+        pruned = 0
+        for snapshot in transaction.get_all(refs):
+            if snapshot.exists and (snapshot.to_dict() or {}).get('fcmToken') == failed_tokens[snapshot.id]:
+                # Guest.fromMap treats a null fcmToken as "no device registered"
+                transaction.update(snapshot.reference, {'fcmToken': None, 'updatedAt': firestore.SERVER_TIMESTAMP})
+                pruned += 1
+        return pruned
+
+    pruned = 0
+    for start in range(0, len(guest_ids), PRUNE_CHUNK):
+        refs = [guests.document(guest_id) for guest_id in guest_ids[start:start + PRUNE_CHUNK]]
+        pruned += prune_chunk(db.transaction(), refs)
+    return pruned
+
+
+def notify_guests(db, sender, args):
+    targets = set()
+    if args.by in ('bookings', 'both'):
+        targets |= guest_ids_from_bookings(db, args.hotel, args.state)
+    if args.by in ('favorites', 'both'):
+        targets |= guest_ids_from_favorites(db, args.hotel)
+
+    tokens_to_guests = defaultdict(list)
+    for guest_id, token in stream_guest_tokens(db, targets):
+        tokens_to_guests[token].append(guest_id)
+    print(f"🎯 {len(targets)} targeted guest(s), {len(tokens_to_guests)} distinct device token(s).")
+    if not args.send:
+        print("Dry run: nothing sent. Pass --send to deliver.")
+        return
+
+    started = time.perf_counter()
+    errors, invalid_tokens, delivered = fan_out(
+        sender, tokens_to_guests, args.title, args.body, {'type': 'announcement'}, args.workers)
+    elapsed = time.perf_counter() - started
+    pruned = prune_tokens(db, invalid_tokens, tokens_to_guests) if invalid_tokens and not args.no_prune else 0
+
+    total = len(tokens_to_guests)
+    failed = sum(errors.values())
+    print("\n-----------------------------------------")
+    print(f"Delivered: {delivered}/{total} ({delivered / max(total, 1):.1%}), failed: {failed} ({failed / max(total, 1):.1%})")
+    for code, count in errors.most_common():
+        print(f"  {code}: {count}")
+    print(f"Invalid tokens: {len(invalid_tokens)}, guest documents pruned: {pruned}")
+    print(f"Sent in {elapsed:.2f}s ({total / max(elapsed, 1e-9):.0f} tokens/s)")
+    print("-----------------------------------------")
+
+
+def main(args):
+    if not args.hotel and not args.state:
+        print("❌ Select targets with --hotel and/or --state.")
+        return
+    if args.by != 'bookings' and not args.hotel:
+        print(f"❌ --by {args.by} needs at least one --hotel; favorites are per hotel.")
+        return
+    if args.by == 'favorites' and args.state:
+        print("❌ --state selects by booking history; use --by bookings or --by both.")
+        return
+    db = initialize_firebase()
+    if not db:
+        return
+    # The fake backend has no messaging; it always sends through the local stand-in
+    local = args.local or backend.is_fake()
+    sender = LocalFcmStandIn(seed=args.seed) if local else FcmSender()
+    mode = 'local FCM stand-in' if local else 'FCM'
+    print(f"\n--- 📣 Guest announcement fan-out via {mode} ---")
+    try:
+        notify_guests(db, sender, args)
+    except Exception as e:
+        print(f"❌ An error occurred during fan-out: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Send a push announcement to the guests of hotels or states.")
+    parser.add_argument('--hotel', nargs='+', default=[], help='Target guests of these hotel IDs.')
+    parser.add_argument('--state', nargs='+', default=[], help='Target guests who booked hotels in these states.')
+    parser.add_argument('--by', choices=['bookings', 'favorites', 'both'], default='bookings',
+                        help='Select guests by booking history, by favorited --hotel, or both (default: bookings).')
+    parser.add_argument('--title', default='Announcement')
+    parser.add_argument('--body', default='')
+    parser.add_argument('--send', action='store_true', help='Deliver the message (default only counts targets).')
+    parser.add_argument('--local', action='store_true', help='Send through the in-process FCM stand-in.')
+    parser.add_argument('--seed', type=int, help='Random seed for the local stand-in.')
+    parser.add_argument('--no-prune', action='store_true', help='Keep invalid tokens on guest documents.')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Concurrent multicast calls.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'notify_guests', args)
@@ -0,0 +1,117 @@
+import argparse
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import backend
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+HOTELS_COLLECTION = 'hotels'
+BOOKINGS_COLLECTION = 'bookings'
+LEADERBOARDS_COLLECTION = 'leaderboards'
+POPULAR_HOTELS_DOC = 'popular_hotels'
+WINDOW_DAYS = 30
+LEADERBOARD_SIZE = 20
+# Same statuses SearchService.getPopularHotels counts
+COUNTED_STATUSES = ['confirmed', 'checked_in', 'completed']
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def count_recent_bookings(db, now, window_days=WINDOW_DAYS):
+    """
+    Counts the window's bookings per hotel. Every run rescans the window,
+    reading only hotelId from each booking, so cancellations and status
+    changes inside the window are always reflected.
+    """
+    counts = Counter()
+    window_start = now - timedelta(days=window_days)
+    query = (db.collection(BOOKINGS_COLLECTION)
+             .where('createdAt', '>=', window_start)
+             .where('bookingStatus', 'in', COUNTED_STATUSES)
+             .select(['hotelId']))
+    for doc in query.stream():
+        hotel_id = doc.to_dict().get('hotelId')
+        if hotel_id is not None:
+            counts[hotel_id.id if hasattr(hotel_id, 'id') else str(hotel_id)] += 1
+    return counts
+
+
+def build_card(hotel_data, booking_count, rank):
+    """
+    Returns the leaderboard entry for one hotel: the whole hotel document plus
+    its rank, so the app builds complete Hotel models from the leaderboard.
+    """
+    card = dict(hotel_data)
+    card['bookingCount'] = booking_count
+    card['rank'] = rank
+    return card
+
+
+def build_leaderboard(db, size=LEADERBOARD_SIZE, window_days=WINDOW_DAYS):
+    """
+    Computes the rolling popular-hotels leaderboard and writes it to a single
+    document, so clients load the whole list with one read.
+    """
+    now = datetime.now(timezone.utc)
+    print(f"\n--- 🏆 Building popular hotels leaderboard ({window_days}-day window) ---")
+    counts = count_recent_bookings(db, now, window_days)
+    print(f"Counted bookings for {len(counts)} hotel(s).")
+
+    # Fetch a few spare candidates so unapproved or deleted hotels can be skipped
+    candidates = counts.most_common(size * 2)
+    hotels = db.collection(HOTELS_COLLECTION)
+    snapshots = {s.id: s for s in db.get_all([hotels.document(hotel_id) for hotel_id, _ in candidates])}
+
+    entries = []
+    for hotel_id, booking_count in candidates:
+        snapshot = snapshots.get(hotel_id)
+        if snapshot is None or not snapshot.exists:
+            continue
+        hotel_data = snapshot.to_dict()
+        if not hotel_data.get('approved', False):
+            continue
+        entries.append(build_card(hotel_data, booking_count, len(entries) + 1))
+        if len(entries) == size:
+            break
+
+    db.collection(LEADERBOARDS_COLLECTION).document(POPULAR_HOTELS_DOC).set({
+        'hotels': entries,
+        'windowDays': window_days,
+        'generatedAt': now,
+    })
+    print(f"✅ Wrote {len(entries)} hotel(s) to '{LEADERBOARDS_COLLECTION}/{POPULAR_HOTELS_DOC}'.")
+    for entry in entries[:5]:
+        print(f"  {entry['rank']}. {entry.get('hotelName', entry.get('hotelId'))} ({entry['bookingCount']} bookings)")
+    return entries
+
+
+def main(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    try:
+        build_leaderboard(db, args.size, args.window_days)
+    except Exception as e:
+        print(f"❌ An error occurred while building the leaderboard: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute the popular-hotels leaderboard document.")
+    parser.add_argument('--size', type=int, default=LEADERBOARD_SIZE, help='Number of hotels to keep.')
+    parser.add_argument('--window-days', type=int, default=WINDOW_DAYS, help='Length of the rolling window in days.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'popular_hotels', args)
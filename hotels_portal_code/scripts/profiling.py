@@ -0,0 +1,123 @@
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- CONFIGURATION ---
+PROFILE_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'profiles')
+SAMPLE_INTERVAL_SECONDS = 0.005
+TOP_STATS_COUNT = 15
+
+
+class StackSampler:
+    """
+    Periodically samples the call stack of a single thread and aggregates the
+    samples into "folded" stacks (one `frame;frame;frame count` line per stack),
+    the input format understood by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def write_folded(self, path):
+        """Writes the aggregated samples to `path` in folded-stack format."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_run(name, output_dir=PROFILE_OUTPUT_DIR, interval=SAMPLE_INTERVAL_SECONDS):
+    """
+    Profiles the enclosed block with cProfile, a sampling stack profiler and
+    tracemalloc. On exit it writes `<name>-<timestamp>.prof` (cProfile stats,
+    loadable by snakeviz or `python -m pstats`) and `<name>-<timestamp>.folded`
+    (flamegraph-ready stacks), then prints CPU hotspots and peak memory.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    run_id = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    prof_path = os.path.join(output_dir, f"{run_id}.prof")
+    folded_path = os.path.join(output_dir, f"{run_id}.folded")
+
+    tracemalloc.start()
+    sampler = StackSampler(threading.get_ident(), interval)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - started
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        profiler.dump_stats(prof_path)
+        sampler.write_folded(folded_path)
+
+        print("\n--- 📊 Profile Summary ---")
+        print(f"Wall time: {elapsed:.2f}s, {sum(sampler.samples.values())} stack samples")
+        print(f"Memory: current {current_bytes / 1024 / 1024:.1f} MiB, peak {peak_bytes / 1024 / 1024:.1f} MiB")
+        print(f"\nTop {TOP_STATS_COUNT} functions by cumulative time:")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(TOP_STATS_COUNT)
+        print(f"Top {TOP_STATS_COUNT} allocation sites:")
+        for stat in snapshot.statistics('lineno')[:TOP_STATS_COUNT]:
+            print(f"  {stat}")
+        print(f"\n✅ CPU profile written to '{prof_path}'")
+        print(f"✅ Folded stacks written to '{folded_path}' (feed to flamegraph.pl or speedscope)")
+
+
+def add_profile_arguments(parser):
+    """Adds the shared `--profile` flags to an argparse parser."""
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the run (cProfile, stack sampling and tracemalloc).')
+    parser.add_argument('--profile-dir', default=PROFILE_OUTPUT_DIR,
+                        help=f"Directory for profile output (default: {PROFILE_OUTPUT_DIR}).")
+    return parser
+
+
+def run_entry_point(func, name, args=None):
+    """
+    Runs a script's entry point, wrapped in `profile_run` when `--profile` was
+    given. `args` is an already-parsed namespace; when omitted, only the
+    profiling flags are parsed from the command line.
+    """
+    if args is None:
+        args, _ = add_profile_arguments(argparse.ArgumentParser(add_help=False)).parse_known_args()
+    if not args.profile:
+        return func()
+    with profile_run(name, output_dir=args.profile_dir):
+        return func()
@@ -0,0 +1,268 @@
+import argparse
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import backend
+from backend import firestore
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+HOTELS_COLLECTION = 'hotels'
+REVIEWS_COLLECTION = 'reviews'
+AGGREGATES_COLLECTION = 'aggregates'
+RATINGS_STATE_DOC = 'hotel_ratings'
+BATCH_SIZE = 500
+MAX_WORKERS = 8
+
+# The earliest possible watermark, used before the first run
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        backend.initialize_app(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return firestore.client()
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+class RatingTotals:
+    """Running sum, count and 1-5 star histogram for one hotel."""
+
+    __slots__ = ('sum', 'count', 'histogram')
+
+    def __init__(self):
+        self.sum = 0.0
+        self.count = 0
+        self.histogram = [0] * 5
+
+    def add(self, star_rate):
+        star_rate = float(star_rate)
+        self.sum += star_rate
+        self.count += 1
+        self.histogram[min(max(int(round(star_rate)), 1), 5) - 1] += 1
+
+    def average(self):
+        return round(self.sum / self.count, 2) if self.count else None
+
+    def to_fields(self):
+        """Returns the absolute hotel fields for a full recompute."""
+        average = self.average()
+        return {
+            'ratingSum': self.sum,
+            'ratingCount': self.count,
+            'ratingHistogram': {str(star): self.histogram[star - 1] for star in range(1, 6)},
+            'overallRating': average,
+            'averageRating': average,
+        }
+
+    def to_increments(self):
+        """Returns the hotel fields for an incremental update as server-side increments."""
+        fields = {
+            'ratingSum': firestore.Increment(self.sum),
+            'ratingCount': firestore.Increment(self.count),
+        }
+        for star in range(1, 6):
+            if self.histogram[star - 1]:
+                fields[f'ratingHistogram.{star}'] = firestore.Increment(self.histogram[star - 1])
+        return fields
+
+
+def _hotel_key(hotel_id):
+    """Returns the hotel document ID whether hotelId is stored as a string or a reference."""
+    return hotel_id.id if hasattr(hotel_id, 'id') else str(hotel_id)
+
+
+def _state_ref(db):
+    return db.collection(AGGREGATES_COLLECTION).document(RATINGS_STATE_DOC)
+
+
+def _read_state(db):
+    snapshot = _state_ref(db).get()
+    return snapshot.to_dict() if snapshot.exists else {}
+
+
+def _state_fields(watermark, mode):
+    """Returns the aggregates document fields recording the createdAt of the newest review aggregated."""
+    return {
+        'reviewsWatermark': watermark,
+        'lastRunMode': mode,
+        'lastRunAt': datetime.now(timezone.utc),
+        'fullRecomputeInProgress': False,
+    }
+
+
+def _commit_in_batches(db, writes, state=None):
+    """
+    Applies (doc_ref, fields) updates in batches of BATCH_SIZE. `state` is
+    merged into the aggregates document in the same batch as the last update,
+    so the watermark never moves without the totals it covers.
+    """
+    writes = list(writes)
+    step = BATCH_SIZE - 1
+    for start in range(0, max(len(writes), 1), step):
+        chunk = writes[start:start + step]
+        with_state = state is not None and start + step >= len(writes)
+        if not chunk and not with_state:
+            continue
+        batch = db.batch()
+        for doc_ref, fields in chunk:
+            batch.update(doc_ref, fields)
+        if with_state:
+            batch.set(_state_ref(db), state, merge=True)
+        batch.commit()
+
+
+def _refresh_averages(db, hotel_ids):
+    """Recomputes overallRating/averageRating from the stored sum and count."""
+    hotels = db.collection(HOTELS_COLLECTION)
+    refs = [hotels.document(hotel_id) for hotel_id in hotel_ids]
+    writes = []
+    for snapshot in db.get_all(refs, field_paths=['ratingSum', 'ratingCount']):
+        data = snapshot.to_dict() or {}
+        count = data.get('ratingCount') or 0
+        average = round(data.get('ratingSum', 0) / count, 2) if count else None
+        writes.append((snapshot.reference, {'overallRating': average, 'averageRating': average}))
+    _commit_in_batches(db, writes)
+
+
+def _apply_increments(db, totals, watermark, review_count):
+    """Commits one chunk of increments together with the watermark covering them."""
+    hotels = db.collection(HOTELS_COLLECTION)
+    existing = {snapshot.id for snapshot in db.get_all([hotels.document(h) for h in totals], field_paths=['hotelId'])
+                if snapshot.exists}
+    for hotel_id in set(totals) - existing:
+        skipped = totals.pop(hotel_id).count
+        review_count -= skipped
+        print(f"  ⚠️ Skipping {skipped} review(s) for missing hotel '{hotel_id}'")
+    _commit_in_batches(db, [(hotels.document(hotel_id), t.to_increments()) for hotel_id, t in totals.items()],
+                       state=_state_fields(watermark, 'incremental'))
+    _refresh_averages(db, list(totals))
+    return review_count
+
+
+def update_ratings_incrementally(db):
+    """
+    Folds every review created after the stored watermark into the running
+    totals on its hotel. Only new reviews are read, so a run after a handful
+    of new reviews costs a handful of reads. Each batch of increments carries
+    the watermark of the reviews it covers, so an interrupted run resumes
+    without counting any review twice. Edited or deleted reviews are not
+    detected; run a full recompute after bulk edits. Reviews stamped after
+    the run started are left for a later run, so a skewed client clock cannot
+    push the watermark past reviews that have not been written yet.
+    """
+    started = datetime.now(timezone.utc)
+    state = _read_state(db)
+    if state.get('fullRecomputeInProgress'):
+        print("❌ A full recompute was interrupted; run with --full before incremental updates.")
+        return 0
+    watermark = state.get('reviewsWatermark') or EPOCH
+    print(f"\n--- ⭐ Incremental rating update (reviews after {watermark.isoformat()}) ---")
+
+    totals = defaultdict(RatingTotals)
+    chunk_watermark = watermark
+    chunk_reviews = review_count = 0
+    hotels_seen = set()
+    query = (db.collection(REVIEWS_COLLECTION)
+             .where('createdAt', '>', watermark)
+             .where('createdAt', '<=', started)
+             .order_by('createdAt'))
+    for doc in query.stream():
+        data = doc.to_dict()
+        if data.get('hotelId') is None or data.get('starRate') is None:
+            continue
+        hotel_id = _hotel_key(data['hotelId'])
+        # Close a chunk only between distinct createdAt values, so the watermark never splits a tie
+        if hotel_id not in totals and len(totals) >= BATCH_SIZE - 1 and data['createdAt'] > chunk_watermark:
+            review_count += _apply_increments(db, totals, chunk_watermark, chunk_reviews)
+            totals, chunk_reviews = defaultdict(RatingTotals), 0
+        totals[hotel_id].add(data['starRate'])
+        hotels_seen.add(hotel_id)
+        chunk_watermark = max(chunk_watermark, data['createdAt'])
+        chunk_reviews += 1
+
+    if totals:
+        review_count += _apply_increments(db, totals, chunk_watermark, chunk_reviews)
+    if not hotels_seen:
+        print("🟡 No new reviews since the last run.")
+        return 0
+    print(f"✅ Applied {review_count} new review(s) to {len(hotels_seen)} hotel(s).")
+    return review_count
+
+
+def _aggregate_hotel(db, hotel_id, cutoff):
+    """
+    Scans one hotel's reviews and returns its totals and newest createdAt.
+    Reviews storing hotelId as a reference are counted too, like the incremental path does.
+    Reviews created after the cutoff are skipped; the next incremental run folds them in.
+    """
+    totals = RatingTotals()
+    newest = EPOCH
+    reviews = db.collection(REVIEWS_COLLECTION)
+    for hotel_value in (hotel_id, db.collection(HOTELS_COLLECTION).document(hotel_id)):
+        for doc in reviews.where('hotelId', '==', hotel_value).select(['starRate', 'createdAt']).stream():
+            data = doc.to_dict()
+            if data.get('starRate') is None:
+                continue
+            if data.get('createdAt') and data['createdAt'] > cutoff:
+                continue
+            totals.add(data['starRate'])
+            if data.get('createdAt'):
+                newest = max(newest, data['createdAt'])
+    return hotel_id, totals, newest
+
+
+def recompute_all_ratings(db, max_workers=MAX_WORKERS):
+    """
+    Rebuilds the rating fields of every hotel from scratch, scanning each
+    hotel's reviews concurrently, and resets the watermark. Until the last
+    batch lands the state is flagged in progress, so an interrupted recompute
+    is rerun instead of mixing with incremental updates.
+    """
+    print("\n--- ⭐ Full rating recompute ---")
+    started = datetime.now(timezone.utc)
+    _state_ref(db).set({'fullRecomputeInProgress': True}, merge=True)
+    hotels = db.collection(HOTELS_COLLECTION)
+    hotel_ids = [doc.id for doc in hotels.select([]).stream()]
+    print(f"Recomputing ratings for {len(hotel_ids)} hotels with {max_workers} workers...")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda hotel_id: _aggregate_hotel(db, hotel_id, started), hotel_ids))
+
+    watermark = max((newest for _, _, newest in results), default=EPOCH)
+    _commit_in_batches(db, [(hotels.document(hotel_id), totals.to_fields()) for hotel_id, totals, _ in results],
+                       state=_state_fields(watermark, 'full'))
+
+    review_count = sum(totals.count for _, totals, _ in results)
+    print(f"✅ Recomputed {len(results)} hotel(s) from {review_count} review(s).")
+    return review_count
+
+
+def main(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    try:
+        if args.full:
+            recompute_all_ratings(db, args.workers)
+        else:
+            update_ratings_incrementally(db)
+    except Exception as e:
+        print(f"❌ An error occurred while aggregating ratings: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain per-hotel rating aggregates from the reviews collection.")
+    parser.add_argument('--full', action='store_true', help='Recompute every hotel from scratch instead of applying new reviews.')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Concurrent hotel scans for --full.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'rating_aggregator', args)
@@ -0,0 +1,358 @@
+"""
+Compact records mirroring the Dart models in lib/models, for scripts that hold
+many documents at once. Records use __slots__, intern repeated strings
+(statuses, room types, cities, referenced IDs) and store timestamps as int64
+microseconds since the Unix epoch. BookingTable keeps bookings column-wise in
+typed arrays for millions of rows.
+"""
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_micros(value):
+    """Converts a Firestore timestamp (datetime) to int64 microseconds; None stays None."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(micros):
+    """Converts int64 microseconds back to an aware UTC datetime."""
+    if micros is None:
+        return None
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _ref_id(value):
+    """Returns the document ID of a DocumentReference or plain string ID, interned."""
+    if value is None:
+        return None
+    return sys.intern(value.id if hasattr(value, 'id') else str(value))
+
+
+class _Record:
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+class HotelRecord(_Record):
+    """Mirrors lib/models/hotel.dart."""
+
+    __slots__ = ('hotelId', 'hotelName', 'hotelState', 'hotelCity', 'hotelAddress', 'hotelEmail',
+                 'hotelPhone', 'hotelDescription', 'licenseNumber', 'starRate', 'approved', 'adminId',
+                 'createdAt', 'updatedAt', 'images', 'amenities', 'conferenceRoomsCount')
+
+    def __init__(self, hotelId, hotelName, hotelState, hotelCity, hotelAddress, hotelEmail=None,
+                 hotelPhone=None, hotelDescription='', licenseNumber=None, starRate=0, approved=False,
+                 adminId=None, createdAt=None, updatedAt=None, images=(), amenities=(),
+                 conferenceRoomsCount=0):
+        self.hotelId = hotelId
+        self.hotelName = hotelName
+        self.hotelState = _intern(hotelState)
+        self.hotelCity = _intern(hotelCity)
+        self.hotelAddress = hotelAddress
+        self.hotelEmail = hotelEmail
+        self.hotelPhone = hotelPhone
+        self.hotelDescription = hotelDescription
+        self.licenseNumber = licenseNumber
+        self.starRate = starRate
+        self.approved = approved
+        self.adminId = adminId
+        self.createdAt = createdAt
+        self.updatedAt = updatedAt
+        self.images = tuple(images)
+        self.amenities = tuple(_intern(a) for a in amenities)
+        self.conferenceRoomsCount = conferenceRoomsCount
+
+    @classmethod
+    def from_firestore(cls, doc_id, data):
+        return cls(
+            hotelId=data.get('hotelId') or doc_id,
+            hotelName=data.get('hotelName') or data.get('name'),
+            hotelState=data.get('hotelState') or data.get('state'),
+            hotelCity=data.get('hotelCity') or data.get('city'),
+            hotelAddress=data.get('hotelAddress') or data.get('address'),
+            hotelEmail=data.get('hotelEmail'),
+            hotelPhone=data.get('hotelPhone') or data.get('phone'),
+            hotelDescription=data.get('hotelDescription') or data.get('description') or '',
+            licenseNumber=data.get('licenseNumber'),
+            starRate=data.get('starRate') or 0,
+            approved=data.get('approved', False),
+            adminId=data.get('adminId'),
+            createdAt=to_micros(data.get('createdAt')),
+            updatedAt=to_micros(data.get('updatedAt')),
+            images=data.get('images') if isinstance(data.get('images'), list) else (),
+            amenities=data.get('amenities') or (),
+            conferenceRoomsCount=data.get('conferenceRoomsCount') or 0,
+        )
+
+    def to_firestore(self):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['createdAt'] = from_micros(self.createdAt)
+        data['updatedAt'] = from_micros(self.updatedAt)
+        data['images'] = list(self.images)
+        data['amenities'] = list(self.amenities)
+        return data
+
+
+class RoomRecord(_Record):
+    """Mirrors lib/models/room.dart."""
+
+    __slots__ = ('roomId', 'hotelId', 'roomType', 'roomDescription', 'maxAdults', 'maxChildren',
+                 'pricePerNight', 'amenities', 'images', 'available', 'createdAt', 'updatedAt')
+
+    def __init__(self, roomId, hotelId, roomType, roomDescription='', maxAdults=0, maxChildren=0,
+                 pricePerNight=0.0, amenities=(), images=(), available=True, createdAt=None,
+                 updatedAt=None):
+        self.roomId = roomId
+        self.hotelId = _ref_id(hotelId)
+        self.roomType = _intern(roomType)
+        self.roomDescription = roomDescription
+        self.maxAdults = maxAdults
+        self.maxChildren = maxChildren
+        self.pricePerNight = float(pricePerNight)
+        self.amenities = tuple(_intern(a) for a in amenities)
+        self.images = tuple(images)
+        self.available = available
+        self.createdAt = createdAt
+        self.updatedAt = updatedAt
+
+    @classmethod
+    def from_firestore(cls, doc_id, data):
+        return cls(
+            roomId=data.get('roomId') or doc_id,
+            hotelId=data.get('hotelId'),
+            roomType=data.get('roomType'),
+            roomDescription=data.get('roomDescription') or '',
+            maxAdults=data.get('maxAdults') or 0,
+            maxChildren=data.get('maxChildren') or 0,
+            pricePerNight=data.get('pricePerNight') or 0.0,
+            amenities=data.get('amenities') or (),
+            images=data.get('images') or (),
+            available=data.get('available', True),
+            createdAt=to_micros(data.get('createdAt')),
+            updatedAt=to_micros(data.get('updatedAt')),
+        )
+
+    def to_firestore(self):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['createdAt'] = from_micros(self.createdAt)
+        data['updatedAt'] = from_micros(self.updatedAt)
+        data['images'] = list(self.images)
+        data['amenities'] = list(self.amenities)
+        return data
+
+
+class BookingRecord(_Record):
+    """
+    Mirrors lib/models/booking.dart. guestId, hotelId and roomId are kept as
+    plain IDs; to_firestore(db) turns them back into DocumentReferences.
+    """
+
+    __slots__ = ('bookingId', 'guestId', 'hotelId', 'roomId', 'checkInDate', 'checkOutDate',
+                 'adultsGuests', 'childrenGuests', 'roomType', 'roomsQuantity', 'totalAmount',
+                 'bookingStatus', 'specialRequests', 'confirmationCode', 'createdAt', 'updatedAt',
+                 'guestName', 'hotelName', 'hotelCity', 'hotelState')
+
+    REFERENCE_COLLECTIONS = {'guestId': 'guests', 'hotelId': 'hotels', 'roomId': 'rooms'}
+
+    def __init__(self, bookingId, guestId, hotelId, roomId, checkInDate, checkOutDate, adultsGuests=0,
+                 childrenGuests=None, roomType=None, roomsQuantity=1, totalAmount=0.0,
+                 bookingStatus=None, specialRequests=None, confirmationCode=None, createdAt=None,
+                 updatedAt=None, guestName='', hotelName='', hotelCity='', hotelState=''):
+        self.bookingId = bookingId
+        self.guestId = _ref_id(guestId)
+        self.hotelId = _ref_id(hotelId)
+        self.roomId = _ref_id(roomId)
+        self.checkInDate = checkInDate
+        self.checkOutDate = checkOutDate
+        self.adultsGuests = adultsGuests
+        self.childrenGuests = childrenGuests
+        self.roomType = _intern(roomType)
+        self.roomsQuantity = roomsQuantity
+        self.totalAmount = float(totalAmount)
+        self.bookingStatus = _intern(bookingStatus)
+        self.specialRequests = specialRequests
+        self.confirmationCode = confirmationCode
+        self.createdAt = createdAt
+        self.updatedAt = updatedAt
+        self.guestName = guestName
+        self.hotelName = _intern(hotelName)
+        self.hotelCity = _intern(hotelCity)
+        self.hotelState = _intern(hotelState)
+
+    @classmethod
+    def from_firestore(cls, doc_id, data):
+        return cls(
+            bookingId=data.get('bookingId') or doc_id,
+            guestId=data.get('guestId'),
+            hotelId=data.get('hotelId'),
+            roomId=data.get('roomId'),
+            checkInDate=to_micros(data.get('checkInDate')),
+            checkOutDate=to_micros(data.get('checkOutDate')),
+            adultsGuests=data.get('adultsGuests') or 0,
+            childrenGuests=data.get('childrenGuests'),
+            roomType=data.get('roomType'),
+            roomsQuantity=data.get('roomsQuantity') or 1,
+            totalAmount=data.get('totalAmount') or 0.0,
+            bookingStatus=data.get('bookingStatus'),
+            specialRequests=data.get('specialRequests'),
+            confirmationCode=data.get('confirmationCode'),
+            createdAt=to_micros(data.get('createdAt')),
+            updatedAt=to_micros(data.get('updatedAt')),
+            guestName=data.get('guestName') or '',
+            hotelName=data.get('hotelName') or '',
+            hotelCity=data.get('hotelCity') or '',
+            hotelState=data.get('hotelState') or '',
+        )
+
+    def to_firestore(self, db=None):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        for field in ('checkInDate', 'checkOutDate', 'createdAt', 'updatedAt'):
+            data[field] = from_micros(data[field])
+        if db is not None:
+            for field, collection in self.REFERENCE_COLLECTIONS.items():
+                if data[field] is not None:
+                    data[field] = db.collection(collection).document(data[field])
+        return data
+
+
+class ReviewRecord(_Record):
+    """Mirrors lib/models/review.dart."""
+
+    __slots__ = ('reviewId', 'guestId', 'hotelId', 'bookingId', 'hotelName', 'guestName',
+                 'starRate', 'review', 'createdAt', 'updatedAt')
+
+    def __init__(self, reviewId, guestId, hotelId, bookingId='', hotelName=None, guestName='',
+                 starRate=0.0, review=None, createdAt=None, updatedAt=None):
+        self.reviewId = reviewId
+        self.guestId = _ref_id(guestId)
+        self.hotelId = _ref_id(hotelId)
+        self.bookingId = bookingId
+        self.hotelName = _intern(hotelName)
+        self.guestName = guestName
+        self.starRate = float(starRate)
+        self.review = review
+        self.createdAt = createdAt
+        self.updatedAt = updatedAt
+
+    @classmethod
+    def from_firestore(cls, doc_id, data):
+        return cls(
+            reviewId=data.get('reviewId') or doc_id,
+            guestId=data.get('guestId'),
+            hotelId=data.get('hotelId'),
+            bookingId=data.get('bookingId') or '',
+            hotelName=data.get('hotelName'),
+            guestName=data.get('guestName') or '',
+            starRate=data.get('starRate') or 0.0,
+            review=data.get('review'),
+            createdAt=to_micros(data.get('createdAt')),
+            updatedAt=to_micros(data.get('updatedAt')),
+        )
+
+    def to_firestore(self):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['createdAt'] = from_micros(self.createdAt)
+        data['updatedAt'] = from_micros(self.updatedAt)
+        return data
+
+
+class BookingTable:
+    """
+    Column-oriented booking storage for analysis over millions of rows.
+    Numeric columns live in typed arrays (int64 microseconds for dates,
+    float64 for amounts); repeated strings (IDs, status, room type) are stored
+    once in a per-column dictionary and referenced by int32 codes. Booking IDs
+    are unique, so they are kept as a plain list.
+    """
+
+    CODED_COLUMNS = ('guestId', 'hotelId', 'roomId', 'roomType', 'bookingStatus')
+    # int64 columns use this sentinel for missing values
+    MISSING = -(1 << 63)
+
+    def __init__(self):
+        self._codes = {name: array('i') for name in self.CODED_COLUMNS}
+        self._dictionaries = {name: [] for name in self.CODED_COLUMNS}
+        self._lookups = {name: {} for name in self.CODED_COLUMNS}
+        self.bookingId = []
+        self.checkInDate = array('q')
+        self.checkOutDate = array('q')
+        self.createdAt = array('q')
+        self.roomsQuantity = array('i')
+        self.totalAmount = array('d')
+
+    def __len__(self):
+        return len(self.checkInDate)
+
+    def _encode(self, column, value):
+        lookup = self._lookups[column]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self._dictionaries[column])
+            self._dictionaries[column].append(value)
+        return code
+
+    def append(self, record):
+        """Appends a BookingRecord."""
+        self.bookingId.append(record.bookingId)
+        for column in self.CODED_COLUMNS:
+            self._codes[column].append(self._encode(column, getattr(record, column)))
+        for column in ('checkInDate', 'checkOutDate', 'createdAt'):
+            value = getattr(record, column)
+            getattr(self, column).append(self.MISSING if value is None else value)
+        self.roomsQuantity.append(int(record.roomsQuantity or 0))
+        self.totalAmount.append(record.totalAmount)
+
+    def append_firestore(self, doc_id, data):
+        self.append(BookingRecord.from_firestore(doc_id, data))
+
+    def value(self, column, row):
+        """Returns the decoded value of a coded column for one row."""
+        return self._dictionaries[column][self._codes[column][row]]
+
+    def codes(self, column):
+        """Returns the int32 code array and value dictionary of a coded column."""
+        return self._codes[column], self._dictionaries[column]
+
+    def row(self, index):
+        """Materializes one row as a BookingRecord (fields outside the table are left empty)."""
+        def date(column):
+            value = getattr(self, column)[index]
+            return None if value == self.MISSING else value
+        return BookingRecord(
+            bookingId=self.bookingId[index],
+            guestId=self.value('guestId', index),
+            hotelId=self.value('hotelId', index),
+            roomId=self.value('roomId', index),
+            checkInDate=date('checkInDate'),
+            checkOutDate=date('checkOutDate'),
+            roomType=self.value('roomType', index),
+            roomsQuantity=self.roomsQuantity[index],
+            totalAmount=self.totalAmount[index],
+            bookingStatus=self.value('bookingStatus', index),
+            createdAt=date('createdAt'),
+        )
+
+    def nbytes(self):
+        """Approximate memory held by the numeric and code arrays."""
+        arrays = list(self._codes.values()) + [self.checkInDate, self.checkOutDate, self.createdAt,
+                                               self.roomsQuantity, self.totalAmount]
+        return sum(a.itemsize * len(a) for a in arrays)
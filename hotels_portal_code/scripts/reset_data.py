@@ -1,15 +1,20 @@
+import argparse
 import os
 import random
 import uuid
-import firebase_admin
-from firebase_admin import credentials, firestore, auth, storage
+import backend
+from backend import firestore, auth, storage
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from profiling import add_profile_arguments, run_entry_point
+import image_variants
 
 # --- CONFIGURATION ---
 SERVICE_ACCOUNT_KEY_PATH = 'scripts/serviceAccount.json'
 STORAGE_BUCKET = 'graduation-project-5f333.firebasestorage.app' # Replace with your actual storage bucket URL
 IMAGE_SOURCE_FOLDER = 'scripts/pictures'
 PASSWORD_FOR_ALL_ADMINS = "password123"
+PROVISIONING_WORKERS = 4
 
 # --- Collections ---
 HOTELS_COLLECTION = 'hotels'
@@ -24,8 +29,7 @@ MINISTRY_REPORTS_COLLECTION = 'ministry_reports'
 def initialize_firebase():
     """Initializes the Firebase Admin SDK."""
     try:
-        cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-        firebase_admin.initialize_app(cred, {
+        backend.initialize_app(SERVICE_ACCOUNT_KEY_PATH, {
             'storageBucket': STORAGE_BUCKET
         })
         print("✅ Firebase Admin SDK initialized successfully.")
@@ -113,6 +117,8 @@ def upload_image_and_get_url(file_path, destination_path):
     try:
         bucket = storage.bucket()
         blob = bucket.blob(destination_path)
+        # Object names are unique per upload, so clients may cache them indefinitely
+        blob.cache_control = 'public, max-age=31536000, immutable'
         blob.upload_from_filename(file_path)
         blob.make_public()
         return blob.public_url
@@ -120,6 +126,38 @@ def upload_image_and_get_url(file_path, destination_path):
         print(f"⚠️ Could not upload image {file_path}: {e}")
         return None
 
+
+def upload_image_variants(image_path, destination_prefix, preprocessed):
+    """
+    Uploads the preprocessed variants of an image and returns a dict of
+    variant name -> public URL. Falls back to uploading the original file as
+    the 'full' variant when the image was not preprocessed.
+    """
+    file_name = os.path.basename(image_path)
+    entry = preprocessed.get(image_path)
+    if entry is None:
+        url = upload_image_and_get_url(image_path, f"{destination_prefix}/{uuid.uuid4()}_{file_name}")
+        return {'full': url} if url else None
+
+    upload_id = uuid.uuid4()
+    urls = {}
+    uploaded = []
+    for name, (variant_path, _) in entry['variants'].items():
+        extension = os.path.splitext(variant_path)[1]
+        destination_path = f"{destination_prefix}/{upload_id}_{name}{extension}"
+        url = upload_image_and_get_url(variant_path, destination_path)
+        if not url:
+            # An image is only usable with all its variants; remove the ones already uploaded
+            for uploaded_path in uploaded:
+                try:
+                    storage.bucket().blob(uploaded_path).delete()
+                except Exception as e:
+                    print(f"⚠️ Could not delete orphaned image variant {uploaded_path}: {e}")
+            return None
+        uploaded.append(destination_path)
+        urls[name] = url
+    return urls
+
 HOTEL_DATA = [
     # Original Data
     {
@@ -689,24 +727,335 @@ HOTEL_DATA = [
 
 
 
-def populate_data():
+def prepare_images():
+    """
+    Returns (available_images, preprocessed): a pool of source images and their
+    resized variants, decoded once and in parallel before any upload.
+    """
+    available_images = get_random_image_paths(count=100) # Get a large pool of images
+    if not available_images:
+        print("⚠️ Warning: No images found in the source folder. Hotels and rooms will have no photos.")
+
+    preprocessed = {}
+    if available_images and image_variants.is_available():
+        print(f"Preprocessing {len(available_images)} images into {list(image_variants.VARIANT_SIZES)} variants...")
+        preprocessed = image_variants.build_all_variants(available_images)
+    elif available_images:
+        print("⚠️ Warning: Pillow is not installed. Uploading original images without resized variants.")
+    return available_images, preprocessed
+
+
+def upload_random_images(available_images, count, destination_prefix, preprocessed):
+    """Uploads `count` random images from the pool; returns (full URLs, variant dicts)."""
+    image_urls = []
+    image_variant_urls = []
+    if not available_images:
+        return image_urls, image_variant_urls
+    for image_path in random.sample(available_images, min(count, len(available_images))):
+        urls = upload_image_variants(image_path, destination_prefix, preprocessed)
+        if urls:
+            image_urls.append(urls['full'])
+            image_variant_urls.append(urls)
+    return image_urls, image_variant_urls
+
+
+def admin_email_for(hotel_data):
+    return f"{hotel_data['admin']['email_prefix']}@hotelportal.com"
+
+
+def declared_hotel_fields(hotel_data):
+    """The hotel document fields that come straight from HOTEL_DATA."""
+    return {k: v for k, v in hotel_data.items() if k not in ['admin', 'rooms']}
+
+
+def declared_admin_fields(hotel_data, hotel_id):
+    """The admin document fields derived from HOTEL_DATA and the hotel's ID."""
+    return {
+        "fName": hotel_data['admin']['fName'],
+        "lName": hotel_data['admin']['lName'],
+        "email": admin_email_for(hotel_data),
+        "hotelId": hotel_id,
+        "hotelName": hotel_data['hotelName'],
+        "hotelCity": hotel_data['hotelCity'],
+        "hotelState": hotel_data['hotelState'],
+        "hotelAddress": hotel_data['hotelAddress'],
+        "role": "hotel admin",
+        "active": True,
+    }
+
+
+def declared_room_fields(room_data):
+    """The room document fields that come straight from HOTEL_DATA."""
+    return {
+        "roomType": room_data['roomType'],
+        "roomDescription": room_data['description'],
+        "maxGuests": room_data['maxGuests'],
+        "pricePerNight": room_data['pricePerNight'],
+        "amenities": room_data['amenities'],
+    }
+
+
+def build_room_document(db, hotel_id, room_data, available_images, preprocessed):
+    """Uploads a new room's images and returns (room_doc_ref, room_document)."""
+    room_id = db.collection(ROOMS_COLLECTION).document().id
+    room_doc_ref = db.collection(ROOMS_COLLECTION).document(room_id)
+    room_image_urls, room_image_variants = upload_random_images(
+        available_images, 3, f"hotels/{hotel_id}/rooms/{room_id}", preprocessed)
+    new_room = {
+        "roomId": room_id,
+        "hotelId": hotel_id,
+        **declared_room_fields(room_data),
+        "images": room_image_urls,
+        "imageVariants": room_image_variants,
+        "available": True,
+        "createdAt": datetime.now(),
+        "updatedAt": datetime.now()
+    }
+    return room_doc_ref, new_room
+
+
+def provision_hotel(db, hotel_data, available_images, preprocessed, admin_user=None, created=None):
+    """
+    Creates one hotel end to end: its admin Auth user (unless an existing
+    `admin_user` is given), hotel and admin documents, images and rooms.
+    Everything created is recorded in `created` so it can be rolled back.
+    """
+    created = created if created is not None else {}
+    created.setdefault('doc_refs', [])
+    tag = f"  [{hotel_data['hotelName']}]"
+
+    # 1. Create Admin User in Firebase Auth
+    admin_email = admin_email_for(hotel_data)
+    if admin_user is None:
+        print(f"{tag} Creating admin auth user: {admin_email}")
+        admin_user = auth.create_user(
+            email=admin_email,
+            password=PASSWORD_FOR_ALL_ADMINS,
+            display_name=f"{hotel_data['admin']['fName']} {hotel_data['admin']['lName']}"
+        )
+        created['auth_uid'] = admin_user.uid
+
+    # 2. Create Hotel Document
+    hotel_id = db.collection(HOTELS_COLLECTION).document().id
+    hotel_doc_ref = db.collection(HOTELS_COLLECTION).document(hotel_id)
+    created['blob_prefix'] = f"hotels/{hotel_id}/"
+
+    new_hotel = {
+        "hotelId": hotel_id,
+        "adminId": admin_user.uid,
+        "createdAt": datetime.now(),
+        "updatedAt": datetime.now(),
+        "images": [], # Will be updated after upload
+        **declared_hotel_fields(hotel_data)
+    }
+    created['doc_refs'].append(hotel_doc_ref)
+    hotel_doc_ref.set(new_hotel)
+    print(f"{tag} Created hotel document with ID: {hotel_id}")
+
+    # 3. Create Admin Document in Firestore
+    admin_doc_ref = db.collection(ADMINS_COLLECTION).document(admin_user.uid)
+    new_admin = {
+        "adminId": admin_user.uid,
+        **declared_admin_fields(hotel_data, hotel_id),
+        "createdAt": datetime.now(),
+        "updatedAt": datetime.now(),
+    }
+    created['doc_refs'].append(admin_doc_ref)
+    admin_doc_ref.set(new_admin)
+    print(f"{tag} Created admin document for UID: {admin_user.uid}")
+
+    # 4. Upload Hotel Images
+    if available_images:
+        hotel_image_urls, hotel_image_variants = upload_random_images(
+            available_images, 5, f"hotels/{hotel_id}/images", preprocessed)
+        hotel_doc_ref.update({"images": hotel_image_urls, "imageVariants": hotel_image_variants})
+        print(f"{tag} Uploaded {len(hotel_image_urls)} hotel images.")
+
+    # 5. Create Rooms and Upload Room Images
+    for room_data in hotel_data.get('rooms', []):
+        room_doc_ref, new_room = build_room_document(db, hotel_id, room_data, available_images, preprocessed)
+        created['doc_refs'].append(room_doc_ref)
+        room_doc_ref.set(new_room)
+        print(f"{tag} Created room '{room_data['roomType']}' with ID: {room_doc_ref.id}")
+    return hotel_id
+
+
+def rollback_hotel(db, created):
+    """
+    Compensates a failed provision_hotel: deletes the documents and blobs it
+    wrote and the Auth user it created. Returns a list of cleanup errors.
+    """
+    errors = []
+    if created.get('doc_refs'):
+        try:
+            commit_writes(db, [('delete', doc_ref, None) for doc_ref in created['doc_refs']])
+        except Exception as e:
+            errors.append(f"documents: {e}")
+    if created.get('blob_prefix'):
+        try:
+            delete_blobs(created['blob_prefix'])
+        except Exception as e:
+            errors.append(f"storage: {e}")
+    if created.get('auth_uid'):
+        try:
+            auth.delete_user(created['auth_uid'])
+        except auth.UserNotFoundError:
+            pass
+        except Exception as e:
+            errors.append(f"auth user: {e}")
+    return errors
+
+
+def provision_hotel_or_rollback(db, hotel_data, available_images, preprocessed, admin_user=None):
+    """
+    Runs provision_hotel as a unit of work. Returns (status, detail) where
+    status is 'succeeded', 'rolled back' or 'rollback failed'.
+    """
+    created = {}
+    try:
+        return 'succeeded', provision_hotel(db, hotel_data, available_images, preprocessed, admin_user, created)
+    except Exception as e:
+        print(f"❌ An error occurred while processing {hotel_data['hotelName']}: {e}")
+        cleanup_errors = rollback_hotel(db, created)
+        if cleanup_errors:
+            return 'rollback failed', f"{e}; cleanup: {'; '.join(cleanup_errors)}"
+        return 'rolled back', str(e)
+
+
+def populate_data(max_workers=PROVISIONING_WORKERS):
     """Main function to populate the database with hotel data."""
     db = firestore.client()
     print("--- 🚀 Starting Data Population Process ---")
 
-    # Get a list of available image files
-    available_images = get_random_image_paths(count=100) # Get a large pool of images
-    if not available_images:
-        print("⚠️ Warning: No images found in the source folder. Hotels and rooms will have no photos.")
+    available_images, preprocessed = prepare_images()
+
+    print(f"\nProvisioning {len(HOTEL_DATA)} hotels with {max_workers} workers...")
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(provision_hotel_or_rollback, db, hotel_data, available_images, preprocessed):
+                hotel_data['hotelName']
+            for hotel_data in HOTEL_DATA
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    print_provisioning_summary(results)
+    print("\n--- ✅ Data Population Complete ---")
+    return results
+
+
+def print_provisioning_summary(results):
+    by_status = {}
+    for name, (status, detail) in results.items():
+        by_status.setdefault(status, []).append((name, detail))
+
+    print("\n-----------------------------------------")
+    print(', '.join(f"{status}: {len(entries)}" for status, entries in sorted(by_status.items())))
+    for status in ('rolled back', 'rollback failed'):
+        for name, detail in by_status.get(status, []):
+            print(f"  {'↩️' if status == 'rolled back' else '⚠️'} {name} ({status}): {detail}")
+    print("-----------------------------------------")
+
+
+# --- Reconcile ---
+def read_current_state(db):
+    """
+    Reads hotels, rooms, hotel admins and Auth users once, keyed on their
+    natural keys: hotelName, (hotelName, roomType) and admin email. Documents
+    that collide on a key or point at a missing hotel are returned as stale.
+    """
+    hotels, stale_hotels = {}, []
+    for doc in db.collection(HOTELS_COLLECTION).stream():
+        name = doc.get('hotelName')
+        if name in hotels:
+            stale_hotels.append(doc)
+        else:
+            hotels[name] = doc
+    hotel_names = {doc.id: name for name, doc in hotels.items()}
+
+    rooms, stale_rooms = {}, []
+    for doc in db.collection(ROOMS_COLLECTION).stream():
+        data = doc.to_dict()
+        key = (hotel_names.get(data.get('hotelId')), data.get('roomType'))
+        if key[0] is None or key in rooms:
+            stale_rooms.append(doc)
+        else:
+            rooms[key] = doc
+
+    admins, stale_admins = {}, []
+    for doc in db.collection(ADMINS_COLLECTION).where('role', '==', 'hotel admin').stream():
+        email = doc.get('email')
+        if email in admins:
+            stale_admins.append(doc)
+        else:
+            admins[email] = doc
+
+    auth_users = {user.email: user for user in auth.list_users().iterate_all() if user.email}
+    return {
+        'hotels': hotels, 'rooms': rooms, 'admins': admins, 'auth_users': auth_users,
+        'stale_hotels': stale_hotels, 'stale_rooms': stale_rooms, 'stale_admins': stale_admins,
+    }
+
+
+def changed_fields(current, declared):
+    """Returns the declared fields whose stored value differs."""
+    return {field: value for field, value in declared.items() if current.get(field) != value}
+
+
+def commit_writes(db, writes, batch_size=500):
+    """Commits (op, doc_ref, data) writes in batches; op is 'set', 'update' or 'delete'."""
+    for start in range(0, len(writes), batch_size):
+        batch = db.batch()
+        for op, doc_ref, data in writes[start:start + batch_size]:
+            if op == 'delete':
+                batch.delete(doc_ref)
+            else:
+                getattr(batch, op)(doc_ref, data)
+        batch.commit()
+
+
+def delete_blobs(prefix):
+    bucket = storage.bucket()
+    blobs = list(bucket.list_blobs(prefix=prefix))
+    if blobs:
+        bucket.delete_blobs(blobs)
+    return len(blobs)
+
+
+def reconcile_data(dry_run=False, max_workers=PROVISIONING_WORKERS):
+    """
+    Brings Firestore, Auth and Storage in line with HOTEL_DATA without wiping
+    anything: reads the current state once, diffs it on natural keys and
+    applies only the needed creates, updates and deletes, batched. Guests,
+    bookings and reviews are left untouched; existing images are kept.
+    """
+    db = firestore.client()
+    mode = 'DRY RUN' if dry_run else 'APPLY'
+    print(f"\n--- 🔁 Reconciling data with HOTEL_DATA ({mode}) ---")
+    state = read_current_state(db)
+    now = datetime.now()
+    writes = []
+    summary = {key: 0 for key in ('hotels created', 'hotels updated', 'hotels deleted',
+                                   'rooms created', 'rooms updated', 'rooms deleted',
+                                   'admins created', 'admins updated', 'admins deleted')}
+    hotels_to_create, rooms_to_create = [], []
+    declared_names, declared_rooms, declared_emails = set(), set(), set()
 
-    hotel_count = 0
     for hotel_data in HOTEL_DATA:
-        hotel_count += 1
-        print(f"\n--- Processing Hotel {hotel_count}/{len(HOTEL_DATA)}: {hotel_data['hotelName']} ---")
+        name = hotel_data['hotelName']
+        admin_email = admin_email_for(hotel_data)
+        declared_names.add(name)
+        declared_emails.add(admin_email)
+        declared_rooms.update((name, room_data['roomType']) for room_data in hotel_data.get('rooms', []))
 
-        try:
-            # 1. Create Admin User in Firebase Auth
-            admin_email = f"{hotel_data['admin']['email_prefix']}@hotelportal.com"
+        hotel_doc = state['hotels'].get(name)
+        if hotel_doc is None:
+            hotels_to_create.append(hotel_data)
+            continue
+
+        admin_user = state['auth_users'].get(admin_email)
+        if admin_user is None and not dry_run:
             print(f"  Creating admin auth user: {admin_email}")
             admin_user = auth.create_user(
                 email=admin_email,
@@ -714,100 +1063,115 @@ def populate_data():
                 display_name=f"{hotel_data['admin']['fName']} {hotel_data['admin']['lName']}"
             )
 
-            # 2. Create Hotel Document
-            hotel_id = db.collection(HOTELS_COLLECTION).document().id
-            hotel_doc_ref = db.collection(HOTELS_COLLECTION).document(hotel_id)
-
-            new_hotel = {
-                "hotelId": hotel_id,
-                "adminId": admin_user.uid,
-                "createdAt": datetime.now(),
-                "updatedAt": datetime.now(),
-                "images": [], # Will be updated after upload
-                **{k: v for k, v in hotel_data.items() if k not in ['admin', 'rooms']}
-            }
-            hotel_doc_ref.set(new_hotel)
-            print(f"  Created hotel document with ID: {hotel_id}")
-
-            # 3. Create Admin Document in Firestore
-            admin_doc_ref = db.collection(ADMINS_COLLECTION).document(admin_user.uid)
-            new_admin = {
-                "adminId": admin_user.uid,
-                "fName": hotel_data['admin']['fName'],
-                "lName": hotel_data['admin']['lName'],
-                "email": admin_email,
-                "hotelId": hotel_id,
-                "hotelName": hotel_data['hotelName'],
-                "hotelCity": hotel_data['hotelCity'],
-                "hotelState": hotel_data['hotelState'],
-                "hotelAddress": hotel_data['hotelAddress'],
-                "role": "hotel admin",
-                "active": True,
-                "createdAt": datetime.now(),
-                "updatedAt": datetime.now(),
-            }
-            admin_doc_ref.set(new_admin)
-            print(f"  Created admin document for UID: {admin_user.uid}")
-
-            # 4. Upload Hotel Images
-            hotel_image_urls = []
-            if available_images:
-                images_to_upload = random.sample(available_images, min(5, len(available_images)))
-                print(f"  Uploading {len(images_to_upload)} hotel images...")
-                for image_path in images_to_upload:
-                    file_name = os.path.basename(image_path)
-                    destination = f"hotels/{hotel_id}/images/{uuid.uuid4()}_{file_name}"
-                    url = upload_image_and_get_url(image_path, destination)
-                    if url:
-                        hotel_image_urls.append(url)
-                hotel_doc_ref.update({"images": hotel_image_urls})
-                print(f"  ...updated hotel with {len(hotel_image_urls)} image URLs.")
-
-            # 5. Create Rooms and Upload Room Images
-            if 'rooms' in hotel_data:
-                print(f"  Creating {len(hotel_data['rooms'])} room types...")
-                for room_data in hotel_data['rooms']:
-                    room_id = db.collection(ROOMS_COLLECTION).document().id
-                    room_doc_ref = db.collection(ROOMS_COLLECTION).document(room_id)
-
-                    room_image_urls = []
-                    if available_images:
-                        room_images_to_upload = random.sample(available_images, min(3, len(available_images)))
-                        for image_path in room_images_to_upload:
-                             file_name = os.path.basename(image_path)
-                             destination = f"hotels/{hotel_id}/rooms/{room_id}/{uuid.uuid4()}_{file_name}"
-                             url = upload_image_and_get_url(image_path, destination)
-                             if url:
-                                 room_image_urls.append(url)
-
-                    new_room = {
-                        "roomId": room_id,
-                        "hotelId": hotel_id,
-                        "roomType": room_data['roomType'],
-                        "roomDescription": room_data['description'],
-                        "maxGuests": room_data['maxGuests'],
-                        "pricePerNight": room_data['pricePerNight'],
-                        "amenities": room_data['amenities'],
-                        "images": room_image_urls,
-                        "available": True,
-                        "createdAt": datetime.now(),
-                        "updatedAt": datetime.now()
-                    }
-                    room_doc_ref.set(new_room)
-                    print(f"    - Created room '{room_data['roomType']}' with ID: {room_id}")
+        hotel_fields = declared_hotel_fields(hotel_data)
+        if admin_user is not None:
+            hotel_fields['adminId'] = admin_user.uid
+        changes = changed_fields(hotel_doc.to_dict(), hotel_fields)
+        if changes:
+            print(f"  ~ hotel '{name}': {', '.join(sorted(changes))}")
+            writes.append(('update', hotel_doc.reference, {**changes, 'updatedAt': now}))
+            summary['hotels updated'] += 1
 
-        except Exception as e:
-            print(f"❌ An error occurred while processing {hotel_data['hotelName']}: {e}")
-            # Consider adding rollback logic here if necessary
+        admin_fields = declared_admin_fields(hotel_data, hotel_doc.id)
+        admin_doc = state['admins'].get(admin_email)
+        if admin_doc is not None and admin_user is not None and admin_doc.id != admin_user.uid:
+            # Admin documents are keyed by Auth UID; re-home one left behind by a recreated user
+            writes.append(('delete', admin_doc.reference, None))
+            admin_doc = None
+        if admin_doc is None:
+            print(f"  + admin '{admin_email}'")
+            summary['admins created'] += 1
+            if admin_user is not None:
+                writes.append(('set', db.collection(ADMINS_COLLECTION).document(admin_user.uid), {
+                    'adminId': admin_user.uid, **admin_fields, 'createdAt': now, 'updatedAt': now}))
+        else:
+            changes = changed_fields(admin_doc.to_dict(), admin_fields)
+            if changes:
+                print(f"  ~ admin '{admin_email}': {', '.join(sorted(changes))}")
+                writes.append(('update', admin_doc.reference, {**changes, 'updatedAt': now}))
+                summary['admins updated'] += 1
 
-    print("\n--- ✅ Data Population Complete ---")
+        for room_data in hotel_data.get('rooms', []):
+            room_doc = state['rooms'].get((name, room_data['roomType']))
+            if room_doc is None:
+                print(f"  + room '{name}' / '{room_data['roomType']}'")
+                rooms_to_create.append((hotel_doc.id, room_data))
+                continue
+            changes = changed_fields(room_doc.to_dict(), declared_room_fields(room_data))
+            if changes:
+                print(f"  ~ room '{name}' / '{room_data['roomType']}': {', '.join(sorted(changes))}")
+                writes.append(('update', room_doc.reference, {**changes, 'updatedAt': now}))
+                summary['rooms updated'] += 1
+
+    stale_hotels = state['stale_hotels'] + [doc for name, doc in state['hotels'].items() if name not in declared_names]
+    stale_rooms = state['stale_rooms'] + [doc for key, doc in state['rooms'].items() if key not in declared_rooms]
+    stale_admins = state['stale_admins'] + [doc for email, doc in state['admins'].items() if email not in declared_emails]
+    for doc in stale_hotels:
+        print(f"  - hotel '{doc.get('hotelName')}' ({doc.id})")
+        writes.append(('delete', doc.reference, None))
+    for doc in stale_rooms:
+        print(f"  - room '{doc.get('roomType')}' ({doc.id})")
+        writes.append(('delete', doc.reference, None))
+    for doc in stale_admins:
+        print(f"  - admin '{doc.get('email')}'")
+        writes.append(('delete', doc.reference, None))
+    for hotel_data in hotels_to_create:
+        print(f"  + hotel '{hotel_data['hotelName']}' with {len(hotel_data.get('rooms', []))} room(s)")
+    summary['hotels deleted'] = len(stale_hotels)
+    summary['rooms deleted'] = len(stale_rooms)
+    summary['admins deleted'] = len(stale_admins)
+    summary['hotels created'] = len(hotels_to_create)
+    summary['rooms created'] = len(rooms_to_create) + sum(len(h.get('rooms', [])) for h in hotels_to_create)
+    summary['admins created'] += len(hotels_to_create)
 
+    if not dry_run:
+        available_images, preprocessed = [], {}
+        if hotels_to_create or rooms_to_create:
+            available_images, preprocessed = prepare_images()
+        for hotel_id, room_data in rooms_to_create:
+            room_doc_ref, new_room = build_room_document(db, hotel_id, room_data, available_images, preprocessed)
+            writes.append(('set', room_doc_ref, new_room))
 
-def main():
+        commit_writes(db, writes)
+        for doc in stale_hotels:
+            delete_blobs(f"hotels/{doc.id}/")
+        for doc in stale_rooms:
+            delete_blobs(f"hotels/{doc.get('hotelId')}/rooms/{doc.id}/")
+        for doc in stale_admins:
+            try:
+                auth.delete_user(doc.id)
+            except auth.UserNotFoundError:
+                pass
+        if hotels_to_create:
+            results = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(provision_hotel_or_rollback, db, hotel_data, available_images, preprocessed,
+                                    state['auth_users'].get(admin_email_for(hotel_data))): hotel_data['hotelName']
+                    for hotel_data in hotels_to_create
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+            print_provisioning_summary(results)
+
+    print("\n-----------------------------------------")
+    print(', '.join(f"{label}: {count}" for label, count in summary.items()))
+    if not any(summary.values()):
+        print("Everything is already up to date.")
+    print("-----------------------------------------")
+    print(f"\n--- ✅ Reconcile {'Preview' if dry_run else 'Complete'} ---")
+    return summary
+
+
+def main(args):
     """Main execution flow."""
     if not initialize_firebase():
         return
 
+    if args.reconcile:
+        reconcile_data(dry_run=args.dry_run, max_workers=args.workers)
+        return
+
     # Confirmation prompt before deleting data
     confirm = input("⚠️ This script will DELETE ALL existing data in collections, auth, and storage. \nAre you sure you want to continue? (yes/no): ")
     if confirm.lower() != 'yes':
@@ -815,8 +1179,15 @@ def main():
         return
 
     clear_all_data()
-    populate_data()
+    populate_data(max_workers=args.workers)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Reset or reconcile the hotel seed data.")
+    parser.add_argument('--reconcile', action='store_true',
+                        help='Apply only the differences from HOTEL_DATA instead of deleting everything.')
+    parser.add_argument('--dry-run', action='store_true', help='With --reconcile, print the changes without writing.')
+    parser.add_argument('--workers', type=int, default=PROVISIONING_WORKERS, help='Hotels provisioned concurrently.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'reset_data', args)
@@ -0,0 +1,248 @@
+import argparse
+import gzip
+import json
+import os
+import time
+from collections import defaultdict
+
+import backend
+from backend import firestore
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+HOTELS_COLLECTION = 'hotels'
+SUGGESTIONS_COLLECTION = 'search_suggestions'
+SUGGESTION_FIELDS = ['hotelName', 'hotelCity', 'hotelState']
+OUTPUT_JSON_FILE = os.path.join(os.path.dirname(__file__), 'search_suggestions.json.gz')
+# Longest n-gram stored. Queries up to this length are a single lookup; longer
+# queries look up their leading n-gram and verify candidates with a substring check.
+MAX_GRAM = 3
+# Firestore rejects documents over 1 MiB; shards above this estimate are split
+# by their second character, leaving headroom for the per-document overhead.
+SHARD_BYTE_LIMIT = 900 * 1024
+# Clients check this document before reading shards. Without it they fall
+# back to scanning hotels; with it, a missing shard simply means no matches.
+MANIFEST_DOC_ID = 'manifest'
+BATCH_SIZE = 500
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def shard_key(gram, split=False):
+    """
+    Returns the shard document ID holding `gram`: one shard per leading
+    character, or per leading character pair for grams of a split shard.
+    """
+    key = f"u{ord(gram[0]):04x}"
+    if split and len(gram) > 1:
+        key += f"u{ord(gram[1]):04x}"
+    return key
+
+
+def firestore_size(value):
+    """Estimates the stored size of a value using Firestore's documented sizing rules."""
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) + 1
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    if isinstance(value, (list, tuple)):
+        return sum(firestore_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(firestore_size(key) + firestore_size(item) for key, item in value.items())
+    raise TypeError(f"Cannot size a {type(value).__name__}.")
+
+
+class SuggestionIndex:
+    """
+    Substring index over hotel names, cities and states. Every term is stored
+    once; each 1..MAX_GRAM character n-gram of a lowercased term maps to the
+    sorted indices of the terms containing it. Results are ranked like
+    SearchService.getSearchSuggestions: prefix matches first, then by term.
+    """
+
+    def __init__(self, terms=None, grams=None):
+        self.terms = terms or []
+        self.grams = grams or {}
+        self._lowered = [term.lower() for term in self.terms]
+
+    @classmethod
+    def build(cls, hotels):
+        """Builds the index from an iterable of hotel dicts."""
+        unique_terms = set()
+        for hotel in hotels:
+            for field in SUGGESTION_FIELDS:
+                value = hotel.get(field)
+                if isinstance(value, str) and value.strip():
+                    unique_terms.add(value)
+
+        terms = sorted(unique_terms)
+        postings = defaultdict(set)
+        for term_index, term in enumerate(terms):
+            lowered = term.lower()
+            for size in range(1, MAX_GRAM + 1):
+                for start in range(len(lowered) - size + 1):
+                    postings[lowered[start:start + size]].add(term_index)
+        grams = {gram: sorted(indices) for gram, indices in postings.items()}
+        return cls(terms, grams)
+
+    def query(self, text, limit=10):
+        """Returns up to `limit` suggestions containing `text`, best first."""
+        lowered = text.lower()
+        if not lowered:
+            return []
+        candidates = self.grams.get(lowered[:MAX_GRAM], [])
+        if len(lowered) > MAX_GRAM:
+            candidates = [i for i in candidates if lowered in self._lowered[i]]
+        ranked = sorted(candidates, key=lambda i: (not self._lowered[i].startswith(lowered), self.terms[i]))
+        return [self.terms[i] for i in ranked[:limit]]
+
+    def to_json(self):
+        return {'maxGram': MAX_GRAM, 'terms': self.terms, 'grams': self.grams}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['terms'], data['grams'])
+
+    def _shard(self, grams):
+        used = sorted({i for indices in grams.values() for i in indices})
+        local = {global_index: local_index for local_index, global_index in enumerate(used)}
+        return {
+            'maxGram': MAX_GRAM,
+            'terms': [self.terms[i] for i in used],
+            'grams': {gram: [local[i] for i in indices] for gram, indices in grams.items()},
+        }
+
+    def shards(self):
+        """
+        Splits the index into self-contained shard dicts keyed by shard_key,
+        each carrying only the terms its grams reference, so a client needs a
+        single shard read to answer a query. A shard over SHARD_BYTE_LIMIT is
+        split by second character; its single-character gram stays under the
+        base key. Returns (shards, split base keys).
+        """
+        grouped = defaultdict(dict)
+        for gram, indices in self.grams.items():
+            grouped[shard_key(gram)][gram] = indices
+
+        shards = {}
+        split = []
+        for key, grams in grouped.items():
+            shard = self._shard(grams)
+            if firestore_size(shard) <= SHARD_BYTE_LIMIT:
+                shards[key] = shard
+                continue
+            split.append(key)
+            regrouped = defaultdict(dict)
+            for gram, indices in grams.items():
+                regrouped[shard_key(gram, split=True)][gram] = indices
+            for sub_key, sub_grams in regrouped.items():
+                shards[sub_key] = self._shard(sub_grams)
+
+        oversized = [key for key, shard in shards.items() if firestore_size(shard) > SHARD_BYTE_LIMIT]
+        if oversized:
+            raise ValueError(f"Shards {oversized} exceed {SHARD_BYTE_LIMIT} bytes even after splitting.")
+        return shards, sorted(split)
+
+
+def stream_approved_hotels(db):
+    """Streams only the suggestion fields of every approved hotel."""
+    query = db.collection(HOTELS_COLLECTION).where('approved', '==', True).select(SUGGESTION_FIELDS)
+    for doc in query.stream():
+        yield doc.to_dict()
+
+
+def write_index_file(index, path=OUTPUT_JSON_FILE):
+    """Writes the index as compact gzipped JSON, suitable as a static asset."""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(index.to_json(), f, ensure_ascii=False, separators=(',', ':'))
+    print(f"✅ Wrote index to '{path}' ({os.path.getsize(path) / 1024:.1f} KiB).")
+
+
+def load_index_file(path=OUTPUT_JSON_FILE):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return SuggestionIndex.from_json(json.load(f))
+
+
+def publish_shards(db, index):
+    """
+    Replaces the suggestion shard documents with the index's current shards,
+    then writes the manifest so clients never see it before its shards.
+    """
+    collection = db.collection(SUGGESTIONS_COLLECTION)
+    shards, split = index.shards()
+    keep = set(shards) | {MANIFEST_DOC_ID}
+    stale = [doc.reference for doc in collection.select([]).stream() if doc.id not in keep]
+
+    writes = [(collection.document(key), shard) for key, shard in shards.items()]
+    writes.append((collection.document(MANIFEST_DOC_ID), {
+        'maxGram': MAX_GRAM,
+        'splitShards': split,
+        'shardCount': len(shards),
+        'termCount': len(index.terms),
+        'generatedAt': firestore.SERVER_TIMESTAMP,
+    }))
+    for start in range(0, len(writes), BATCH_SIZE):
+        batch = db.batch()
+        for doc_ref, data in writes[start:start + BATCH_SIZE]:
+            batch.set(doc_ref, data)
+        batch.commit()
+    for start in range(0, len(stale), BATCH_SIZE):
+        batch = db.batch()
+        for doc_ref in stale[start:start + BATCH_SIZE]:
+            batch.delete(doc_ref)
+        batch.commit()
+    largest = max((firestore_size(shard) for shard in shards.values()), default=0)
+    print(f"✅ Published {len(shards)} shard(s) to '{SUGGESTIONS_COLLECTION}' "
+          f"({len(split)} split, largest {largest / 1024:.1f} KiB), removed {len(stale)} stale shard(s).")
+
+
+def build_and_publish(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    try:
+        print("\n--- 🔎 Building search suggestion index ---")
+        index = SuggestionIndex.build(stream_approved_hotels(db))
+        print(f"Indexed {len(index.terms)} distinct terms into {len(index.grams)} n-grams.")
+        write_index_file(index, args.output)
+        if not args.no_publish:
+            publish_shards(db, index)
+    except Exception as e:
+        print(f"❌ An error occurred while building the suggestion index: {e}")
+
+
+def query_local(args):
+    """Answers queries from the local index file and reports lookup latency."""
+    index = load_index_file(args.output)
+    for text in args.query:
+        started = time.perf_counter()
+        repeats = 1000
+        for _ in range(repeats):
+            results = index.query(text, args.limit)
+        elapsed_us = (time.perf_counter() - started) / repeats * 1e6
+        print(f"'{text}' -> {results} ({elapsed_us:.1f} µs/query)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the hotel search-suggestion index.")
+    parser.add_argument('--output', default=OUTPUT_JSON_FILE, help='Path of the gzipped JSON index.')
+    parser.add_argument('--no-publish', action='store_true', help='Only write the local index file.')
+    parser.add_argument('--query', nargs='+', help='Query the local index file instead of rebuilding it.')
+    parser.add_argument('--limit', type=int, default=10, help='Suggestions per query.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    entry_point = query_local if args.query else build_and_publish
+    run_entry_point(lambda: entry_point(args), 'search_suggestions', args)
@@ -1,7 +1,9 @@
-import firebase_admin
-from firebase_admin import credentials, firestore, auth
+import backend
+from backend import firestore, auth
 import random
-from datetime import datetime
+from datetime import datetime, timezone
+from profiling import run_entry_point
+from rating_aggregator import update_ratings_incrementally
 import os
 
 # --- Configuration ---
@@ -28,12 +30,11 @@ GENERIC_REVIEWS = [
 def initialize_firebase():
     """Initializes the Firebase Admin SDK."""
     try:
-        if not os.path.exists(SERVICE_ACCOUNT_KEY_PATH):
+        if not backend.is_fake() and not os.path.exists(SERVICE_ACCOUNT_KEY_PATH):
             print(f"Error: Service account key file not found at '{SERVICE_ACCOUNT_KEY_PATH}'")
             print("Please download it from your Firebase project settings and place it in the 'scripts' directory.")
             return None
-        cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-        firebase_admin.initialize_app(cred)
+        backend.initialize_app(SERVICE_ACCOUNT_KEY_PATH)
         print("Firebase Admin SDK initialized successfully.")
         return firestore.client()
     except Exception as e:
@@ -78,8 +79,8 @@ def create_guests(db, num_guests=5):
                 'fcmToken': None,
                 'role': 'guest',
                 'active': True,
-                'createdAt': datetime.now(),
-                'updatedAt': datetime.now(),
+                'createdAt': datetime.now(timezone.utc),
+                'updatedAt': datetime.now(timezone.utc),
                 'favoriteHotelIds': []
             }
             batch.set(guest_ref, guest_data)
@@ -115,9 +116,13 @@ def create_reviews(db):
     batch = db.batch()
 
     try:
-        # Fetch all hotels and guests
-        hotels = list(hotels_collection.stream())
-        guests = list(guests_collection.stream())
+        # Fetch all hotels and guests, keeping only (id, name) pairs in memory
+        hotels = [(doc.id, doc.to_dict().get('hotelName', 'Unknown Hotel'))
+                  for doc in hotels_collection.select(['hotelName']).stream()]
+        guests = []
+        for doc in guests_collection.select(['FName', 'LName']).stream():
+            guest_data = doc.to_dict()
+            guests.append((doc.id, f"{guest_data.get('FName', '')} {guest_data.get('LName', '')}".strip()))
 
         if not hotels:
             print("No hotels found in the database. Cannot add reviews.")
@@ -128,20 +133,13 @@ def create_reviews(db):
 
         print(f"Found {len(hotels)} hotels and {len(guests)} guests.")
 
-        for hotel_doc in hotels:
-            hotel_data = hotel_doc.to_dict()
-            hotel_id = hotel_doc.id
-            hotel_name = hotel_data.get('hotelName', 'Unknown Hotel')
-            
+        for hotel_id, hotel_name in hotels:
             num_reviews = random.randint(1, 3)
             print(f"\nGenerating {num_reviews} review(s) for '{hotel_name}'...")
 
             for _ in range(num_reviews):
                 # Select a random guest
-                reviewer_doc = random.choice(guests)
-                reviewer_data = reviewer_doc.to_dict()
-                guest_id = reviewer_doc.id
-                guest_name = f"{reviewer_data.get('FName', '')} {reviewer_data.get('LName', '')}".strip()
+                guest_id, guest_name = random.choice(guests)
 
                 # Generate review details
                 review_ref = reviews_collection.document()
@@ -154,8 +152,8 @@ def create_reviews(db):
                     'guestName': guest_name,
                     'starRate': float(random.randint(3, 5)), # Random positive rating (3, 4, or 5)
                     'review': random.choice(GENERIC_REVIEWS),
-                    'createdAt': datetime.now(),
-                    'updatedAt': datetime.now()
+                    'createdAt': datetime.now(timezone.utc),
+                    'updatedAt': datetime.now(timezone.utc)
                 }
                 
                 batch.set(review_ref, review_data)
@@ -181,6 +179,9 @@ def main():
         
         # Step 2: Create random reviews for existing hotels using any available guests
         create_reviews(db)
+
+        # Step 3: Fold the new reviews into each hotel's rating aggregates
+        update_ratings_incrementally(db)
         
         print("\nScript finished.")
     else:
@@ -188,4 +189,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_entry_point(main, 'seed_guests')
\ No newline at end of file
@@ -0,0 +1,401 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import backend
+from content_digest import digest
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+MIRROR_DB_FILE = os.path.join(os.path.dirname(__file__), 'firestore_mirror.sqlite')
+WATERMARK_FIELD = 'updatedAt'
+PAGE_SIZE = 1000
+# Suffix of the table a bootstrap loads into before it replaces the live one
+STAGING_SUFFIX = '__staging'
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Collection -> fields copied into indexed columns. Every document is also
+# stored whole as JSON in `data`, so other fields stay reachable through
+# json_extract(data, '$.field'). DocumentReferences are stored as their ID.
+MIRRORED_COLLECTIONS = {
+    'hotels': ['hotelName', 'hotelState', 'hotelCity', 'starRate', 'approved', 'adminId'],
+    'rooms': ['hotelId', 'roomType', 'pricePerNight', 'available'],
+    'bookings': ['hotelId', 'guestId', 'roomId', 'bookingStatus', 'checkInDate', 'checkOutDate', 'totalAmount', 'createdAt'],
+    'guests': ['email', 'active', 'fcmToken', 'createdAt'],
+    'admins': ['email', 'hotelId', 'role', 'active'],
+    'reviews': ['hotelId', 'guestId', 'starRate', 'createdAt'],
+}
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def to_sql_value(value):
+    """Converts a Firestore value to what the mirror stores: IDs for references, ISO strings for timestamps."""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat() if value.tzinfo else value.isoformat()
+    if hasattr(value, 'id') and hasattr(value, 'path'):  # DocumentReference
+        return value.id
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, dict):
+        return {key: to_sql_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_sql_value(item) for item in value]
+    if hasattr(value, 'latitude'):  # GeoPoint
+        return {'latitude': value.latitude, 'longitude': value.longitude}
+    return value
+
+
+class Mirror:
+    """An SQLite copy of the portal collections, one table per collection."""
+
+    def __init__(self, path=MIRROR_DB_FILE, collections=MIRRORED_COLLECTIONS):
+        self.collections = collections
+        # Snapshot listeners call back on their own threads
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                "collection TEXT PRIMARY KEY, watermark TEXT, synced_at TEXT, mode TEXT)")
+            for name in self.collections:
+                self._create_table(name, name)
+                existing = {row[1] for row in self.conn.execute(f'PRAGMA table_info("{name}")')}
+                if 'digest' not in existing:  # mirrors created before content hashing
+                    self.conn.execute(f'ALTER TABLE "{name}" ADD COLUMN digest TEXT')
+                self._create_indexes(name)
+
+    def _create_table(self, table, name):
+        column_sql = ''.join(f', "{column}"' for column in self.collections[name])
+        self.conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" (id TEXT PRIMARY KEY, data TEXT NOT NULL, digest TEXT{column_sql})')
+
+    def _create_indexes(self, name):
+        for column in self.collections[name]:
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{name}_{column}" ON "{name}" ("{column}")')
+
+    def upsert(self, name, snapshots, table=None):
+        """
+        Writes snapshots into a collection's table, or into `table` (a staging
+        table from begin_replace); returns the newest watermark seen.
+        """
+        columns = self.collections[name]
+        placeholders = ', '.join('?' * (len(columns) + 3))
+        column_sql = ''.join(f', "{column}"' for column in columns)
+        rows = []
+        newest = None
+        for snapshot in snapshots:
+            data = snapshot.to_dict() or {}
+            stored = to_sql_value(data)
+            rows.append((snapshot.id, json.dumps(stored, ensure_ascii=False), digest(data),
+                         *(_scalar(stored.get(column)) for column in columns)))
+            watermark = data.get(WATERMARK_FIELD)
+            if isinstance(watermark, datetime) and (newest is None or watermark > newest):
+                newest = watermark
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f'INSERT OR REPLACE INTO "{table or name}" (id, data, digest{column_sql}) VALUES ({placeholders})',
+                rows)
+        return newest
+
+    def begin_replace(self, name):
+        """Creates an empty staging table for a full reload of a collection and returns its name."""
+        staging = name + STAGING_SUFFIX
+        with self.lock, self.conn:
+            self.conn.execute(f'DROP TABLE IF EXISTS "{staging}"')  # left over from an interrupted run
+            self._create_table(staging, name)
+        return staging
+
+    def finish_replace(self, name, staging, watermark, mode):
+        """
+        Swaps a fully loaded staging table in for the live one and records the
+        sync state, all in one transaction: readers see the old rows or the
+        new ones, never an empty or partial table.
+        """
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute(f'DROP TABLE "{name}"')
+            self.conn.execute(f'ALTER TABLE "{staging}" RENAME TO "{name}"')
+            self._create_indexes(name)
+            self._write_state(name, watermark, mode)
+
+    def delete(self, name, doc_ids):
+        with self.lock, self.conn:
+            self.conn.executemany(f'DELETE FROM "{name}" WHERE id = ?', [(doc_id,) for doc_id in doc_ids])
+
+    def ids(self, name):
+        with self.lock:
+            return {row[0] for row in self.conn.execute(f'SELECT id FROM "{name}"')}
+
+    def digests(self, name):
+        with self.lock:
+            return dict(self.conn.execute(f'SELECT id, digest FROM "{name}"'))
+
+    def get_state(self, name):
+        """Returns (watermark, mode) of a collection's last sync, or None if it was never synced."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT watermark, mode FROM sync_state WHERE collection = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return (datetime.fromisoformat(row[0]) if row[0] else None), row[1]
+
+    def get_watermark(self, name):
+        state = self.get_state(name)
+        return state[0] if state else None
+
+    def set_state(self, name, watermark, mode):
+        with self.lock, self.conn:
+            self._write_state(name, watermark, mode)
+
+    def _write_state(self, name, watermark, mode):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state (collection, watermark, synced_at, mode) VALUES (?, ?, ?, ?)",
+            (name, watermark.isoformat() if watermark else None, datetime.now(timezone.utc).isoformat(), mode))
+
+    def close(self):
+        self.conn.close()
+
+
+def query_readonly(path, sql, params=()):
+    """
+    Runs SQL against the mirror file through a read-only connection, so a
+    query can never modify the mirror. Returns the rows as dicts.
+    """
+    conn = sqlite3.connect(f"{Path(path).absolute().as_uri()}?mode=ro", uri=True)
+    try:
+        conn.row_factory = sqlite3.Row
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def _scalar(value):
+    """Indexed columns hold scalars; lists and maps are kept as JSON text."""
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+
+
+def _latest(current, candidate):
+    if candidate is None:
+        return current
+    return candidate if current is None or candidate > current else current
+
+
+def stream_paged(query, page_size=PAGE_SIZE):
+    """Yields pages of snapshots for a query ordered on a single field, resuming after the last snapshot."""
+    cursor = None
+    while True:
+        page_query = query.limit(page_size)
+        if cursor is not None:
+            page_query = page_query.start_after(cursor)
+        page = list(page_query.stream())
+        if not page:
+            return
+        yield page
+        cursor = page[-1]
+
+
+def bootstrap_collection(db, mirror, name):
+    """
+    Reloads a collection's table from a full read. Rows load into a staging
+    table that replaces the live one only once the read has finished.
+    """
+    staging = mirror.begin_replace(name)
+    count = 0
+    watermark = None
+    for page in stream_paged(db.collection(name).order_by('__name__')):
+        watermark = _latest(watermark, mirror.upsert(name, page, staging))
+        count += len(page)
+    mirror.finish_replace(name, staging, watermark, 'bootstrap')
+    return count
+
+
+def sync_collection(db, mirror, name, prune=False):
+    """
+    Pulls documents whose updatedAt is at or after the stored watermark.
+    Deletes are invisible to a watermark query; `prune` reconciles them with
+    an ID-only projection of the collection. Falls back to a bootstrap when
+    the collection has never been synced. A collection synced before without
+    any updatedAt has no watermark; it is queried from the epoch, which picks
+    up documents that gained an updatedAt since, instead of re-bootstrapping.
+    """
+    state = mirror.get_state(name)
+    if state is None:
+        return bootstrap_collection(db, mirror, name), 0
+    watermark = state[0]
+
+    count = 0
+    # >= rather than >: documents sharing the watermark timestamp are re-read, not missed
+    query = db.collection(name).where(WATERMARK_FIELD, '>=', watermark or EPOCH).order_by(WATERMARK_FIELD)
+    for page in stream_paged(query):
+        watermark = _latest(watermark, mirror.upsert(name, page))
+        count += len(page)
+
+    removed = 0
+    if prune:
+        live = {doc.id for doc in db.collection(name).select([]).stream()}
+        stale = mirror.ids(name) - live
+        mirror.delete(name, stale)
+        removed = len(stale)
+    mirror.set_state(name, watermark, 'incremental')
+    return count, removed
+
+
+def rehash_collection(db, mirror, name):
+    """
+    Streams the whole collection but writes only documents whose content hash
+    differs from the mirrored row, and drops rows for deleted documents.
+    Catches edits that did not touch updatedAt, which a watermark sync misses.
+    Returns (documents read, rows written, rows removed).
+    """
+    stored = mirror.digests(name)
+    seen = set()
+    changed = []
+    count = written = 0
+    watermark = mirror.get_watermark(name)
+    for snapshot in db.collection(name).stream():
+        count += 1
+        seen.add(snapshot.id)
+        if stored.get(snapshot.id) != digest(snapshot.to_dict()):
+            changed.append(snapshot)
+        if len(changed) == PAGE_SIZE:
+            watermark = _latest(watermark, mirror.upsert(name, changed))
+            written += len(changed)
+            changed = []
+    if changed:
+        watermark = _latest(watermark, mirror.upsert(name, changed))
+        written += len(changed)
+    removed = stored.keys() - seen
+    mirror.delete(name, removed)
+    mirror.set_state(name, watermark, 'rehash')
+    return count, written, len(removed)
+
+
+def watch_collections(db, mirror, names):
+    """
+    Keeps the mirror live with on_snapshot listeners until interrupted. The
+    first callback per listener carries every document and replaces the
+    table, so no separate bootstrap is needed; later callbacks carry only the changes.
+    """
+    def make_callback(name):
+        first = [True]
+
+        def on_snapshot(_, changes, read_time):
+            upserts = [change.document for change in changes if change.type.name != 'REMOVED']
+            removals = [change.document.id for change in changes if change.type.name == 'REMOVED']
+            if first[0]:  # the initial snapshot is the whole collection
+                first[0] = False
+                staging = mirror.begin_replace(name)
+                mirror.finish_replace(name, staging, mirror.upsert(name, upserts, staging), 'watch')
+                print(f"  [{read_time}] {name}: {len(upserts)} loaded")
+                return
+            watermark = mirror.upsert(name, upserts) if upserts else None
+            if removals:
+                mirror.delete(name, removals)
+            mirror.set_state(name, _latest(mirror.get_watermark(name), watermark), 'watch')
+            print(f"  [{read_time}] {name}: {len(upserts)} upserted, {len(removals)} removed")
+        return on_snapshot
+
+    watches = [db.collection(name).on_snapshot(make_callback(name)) for name in names]
+    print(f"👀 Watching {', '.join(names)}. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for watch in watches:
+            watch.unsubscribe()
+
+
+def print_rows(rows, limit=50):
+    if not rows:
+        print("(no rows)")
+        return
+    columns = list(rows[0])
+    print(' | '.join(columns))
+    for row in rows[:limit]:
+        print(' | '.join('' if row[column] is None else str(row[column]) for column in columns))
+    if len(rows) > limit:
+        print(f"... {len(rows) - limit} more row(s)")
+
+
+def main(args):
+    if args.sql:
+        try:
+            started = time.perf_counter()
+            rows = query_readonly(args.db, args.sql)
+            print_rows(rows)
+            print(f"\n{len(rows)} row(s) in {(time.perf_counter() - started) * 1000:.1f} ms (local, no Firestore reads)")
+        except sqlite3.Error as e:
+            print(f"❌ Query failed: {e}")
+        return
+
+    mirror = Mirror(args.db)
+    names = args.collections or list(MIRRORED_COLLECTIONS)
+    try:
+        db = initialize_firebase()
+        if not db:
+            return
+        if args.watch:
+            watch_collections(db, mirror, names)
+            return
+
+        mode = 'full bootstrap' if args.full else 'content-hash resync' if args.rehash else 'incremental sync'
+        print(f"\n--- 🪞 Mirroring {len(names)} collection(s) to '{args.db}' ({mode}) ---")
+        for name in names:
+            started = time.perf_counter()
+            if args.rehash:
+                count, written, removed = rehash_collection(db, mirror, name)
+                print(f"  {name}: {count} document(s) read, {written} changed, {removed} removed "
+                      f"in {time.perf_counter() - started:.1f}s")
+                continue
+            if args.full:
+                count, removed = bootstrap_collection(db, mirror, name), 0
+            else:
+                count, removed = sync_collection(db, mirror, name, args.prune)
+            pruned = f", {removed} removed" if args.prune and not args.full else ''
+            print(f"  {name}: {count} document(s) read{pruned} in {time.perf_counter() - started:.1f}s")
+        print("\n✅ Mirror is up to date.")
+    except Exception as e:
+        print(f"❌ An error occurred while mirroring: {e}")
+    finally:
+        mirror.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Keep a local SQLite mirror of the portal collections and query it.",
+        epilog="Example: --sql \"SELECT id, email FROM guests WHERE fcmToken IS NULL\"")
+    parser.add_argument('--db', default=MIRROR_DB_FILE, help='Path of the SQLite mirror.')
+    parser.add_argument('--collections', nargs='+', choices=list(MIRRORED_COLLECTIONS), help='Limit to these collections.')
+    parser.add_argument('--full', action='store_true', help='Re-read every document instead of syncing from the watermark.')
+    parser.add_argument('--rehash', action='store_true',
+                        help='Re-read every document but write only rows whose content hash changed.')
+    parser.add_argument('--prune', action='store_true', help='Also remove documents deleted since the last sync.')
+    parser.add_argument('--watch', action='store_true', help='Stay running and apply changes from snapshot listeners.')
+    parser.add_argument('--sql', help='Run a query against the mirror and exit.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'sqlite_mirror', args)
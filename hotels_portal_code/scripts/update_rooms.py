@@ -1,7 +1,8 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import backend
+from backend import firestore
 import random
 import os
+from profiling import run_entry_point
 
 def update_all_rooms():
     """
@@ -19,8 +20,7 @@ def update_all_rooms():
 
     try:
         # Use application default credentials
-        cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-        firebase_admin.initialize_app(cred)
+        backend.initialize_app(SERVICE_ACCOUNT_KEY_PATH)
         print("Firebase app initialized successfully.")
     except Exception as e:
         print(f"Error initializing Firebase app: {e}")
@@ -74,4 +74,4 @@ def update_all_rooms():
     print(f"\nProcess complete. Total rooms updated: {updated_rooms_count}")
 
 if __name__ == '__main__':
-    update_all_rooms()
\ No newline at end of file
+    run_entry_point(update_all_rooms, 'update_rooms')
\ No newline at end of file
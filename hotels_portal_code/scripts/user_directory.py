@@ -0,0 +1,266 @@
+import argparse
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import backend
+from profiling import add_profile_arguments, run_entry_point
+
+# --- CONFIGURATION ---
+SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccount.json')
+DIRECTORY_COLLECTION = 'user_directory'
+AGGREGATES_COLLECTION = 'aggregates'
+DIRECTORY_STATE_DOC = 'user_directory'
+PAGE_SIZE = 200
+BATCH_SIZE = 500
+SOURCES = ['guests', 'admins']
+
+# One pre-sorted directory per userType offered by the ministry "Users" report.
+# Keys are the directory document IDs; values are the report's role labels.
+VIEWS = {
+    'all': None,
+    'guest': 'Guest',
+    'hotel_admin': 'Hotel Admin',
+    'ministry_admin': 'Ministry Admin',
+}
+
+# The earliest possible watermark, used before the first run
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def initialize_firebase():
+    """Initializes the Firebase Admin SDK."""
+    try:
+        db = backend.get_db(SERVICE_ACCOUNT_KEY_PATH)
+        print("✅ Firebase Admin SDK initialized successfully.")
+        return db
+    except Exception as e:
+        print(f"❌ Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure your 'serviceAccount.json' file is in the 'scripts' directory.")
+        return None
+
+
+def directory_row(source, doc_id, data):
+    """Returns the directory row for a guest or admin, with the role labels getUserDirectoryReportData uses."""
+    if source == 'guests':
+        first, last, role = data.get('FName'), data.get('LName'), 'Guest'
+    else:
+        first, last = data.get('fName'), data.get('lName')
+        role = 'Ministry Admin' if data.get('role') == 'ministry admin' else 'Hotel Admin'
+    row = {
+        'id': doc_id,
+        'source': source,
+        'name': f"{first} {last}",
+        'email': data.get('email'),
+        'role': role,
+        'active': bool(data.get('active')),
+        'createdAt': data.get('createdAt'),
+    }
+    if role == 'Hotel Admin':
+        row['hotelState'] = data.get('hotelState')
+    return row
+
+
+def sort_rows(rows):
+    """Sorts by name like the report does, with the document ID as a stable tie-breaker."""
+    return sorted(rows, key=lambda row: (row['name'], row['source'], row['id']))
+
+
+def summarize(rows):
+    """Returns counts by role, status, role and status, and hotel admins by hotel state."""
+    by_role = Counter(row['role'] for row in rows)
+    by_status = Counter('Active' if row['active'] else 'Inactive' for row in rows)
+    by_role_and_status = defaultdict(Counter)
+    for row in rows:
+        by_role_and_status[row['role']]['Active' if row['active'] else 'Inactive'] += 1
+    by_hotel_state = Counter(row.get('hotelState') or 'Unknown' for row in rows if row['role'] == 'Hotel Admin')
+    return {
+        'byRole': dict(by_role),
+        'byStatus': dict(by_status),
+        'byRoleAndStatus': {role: dict(counts) for role, counts in by_role_and_status.items()},
+        'hotelAdminsByState': dict(by_hotel_state),
+    }
+
+
+def paginate(rows, page_size=PAGE_SIZE):
+    return [rows[start:start + page_size] for start in range(0, len(rows), page_size)]
+
+
+def _pages(db, view):
+    return db.collection(DIRECTORY_COLLECTION).document(view).collection('pages')
+
+
+def page_id(index):
+    return f"{index:05d}"
+
+
+def read_view_pages(db, view):
+    """Returns a view's stored pages as {page index: rows}."""
+    return {int(doc.id): (doc.to_dict() or {}).get('rows', []) for doc in _pages(db, view).stream()}
+
+
+def _commit_in_batches(db, writes):
+    """Applies (op, doc_ref, fields) writes in batches of BATCH_SIZE; op is 'set', 'update' or 'delete'."""
+    for start in range(0, len(writes), BATCH_SIZE):
+        batch = db.batch()
+        for op, doc_ref, fields in writes[start:start + BATCH_SIZE]:
+            if op == 'delete':
+                batch.delete(doc_ref)
+            else:
+                getattr(batch, op)(doc_ref, fields)
+        batch.commit()
+
+
+def write_views(db, rows, stored_pages=None, page_size=PAGE_SIZE):
+    """
+    Writes every view's pages and summary document. With `stored_pages`
+    ({view: {index: rows}}), pages whose rows are unchanged are skipped and
+    pages past the new end are deleted. Returns the number of pages written.
+    """
+    now = datetime.now(timezone.utc)
+    writes = []
+    written = 0
+    for view, role in VIEWS.items():
+        view_rows = [row for row in rows if role is None or row['role'] == role]
+        pages = paginate(view_rows, page_size)
+        stored = (stored_pages or {}).get(view, {})
+        for index, page_rows in enumerate(pages):
+            if stored.get(index) == page_rows:
+                continue
+            writes.append(('set', _pages(db, view).document(page_id(index)), {
+                'index': index,
+                'rows': page_rows,
+                'firstName': page_rows[0]['name'],
+                'lastName': page_rows[-1]['name'],
+            }))
+            written += 1
+        stale = set(stored) - set(range(len(pages)))
+        if stored_pages is None:
+            stale = {int(doc.id) for doc in _pages(db, view).select([]).stream()} - set(range(len(pages)))
+        writes += [('delete', _pages(db, view).document(page_id(index)), None) for index in stale]
+        writes.append(('set', db.collection(DIRECTORY_COLLECTION).document(view), {
+            'userType': role or 'All',
+            'pageSize': page_size,
+            'pageCount': len(pages),
+            'total': len(view_rows),
+            'summary': summarize(view_rows),
+            'generatedAt': now,
+        }))
+    _commit_in_batches(db, writes)
+    return written
+
+
+def touch_views(db):
+    """
+    Bumps every view's generatedAt without rewriting it. A refresh that finds
+    no changes has still confirmed the views are current, and the app treats
+    a directory older than a day as stale.
+    """
+    now = datetime.now(timezone.utc)
+    views = db.collection(DIRECTORY_COLLECTION)
+    _commit_in_batches(db, [('update', views.document(view), {'generatedAt': now}) for view in VIEWS])
+
+
+def _read_watermarks(db):
+    snapshot = db.collection(AGGREGATES_COLLECTION).document(DIRECTORY_STATE_DOC).get()
+    data = snapshot.to_dict() if snapshot.exists else {}
+    return {source: data.get(f'{source}Watermark') or EPOCH for source in SOURCES}
+
+
+def _write_watermarks(db, watermarks, mode):
+    db.collection(AGGREGATES_COLLECTION).document(DIRECTORY_STATE_DOC).set({
+        **{f'{source}Watermark': watermark for source, watermark in watermarks.items()},
+        'lastRunMode': mode,
+        'lastRunAt': datetime.now(timezone.utc),
+    }, merge=True)
+
+
+def _newest(watermark, data):
+    updated_at = data.get('updatedAt')
+    return max(watermark, updated_at) if isinstance(updated_at, datetime) else watermark
+
+
+def rebuild_directory(db, page_size=PAGE_SIZE):
+    """Reads every guest and admin once and rewrites all directory views."""
+    print("\n--- 📇 Full user directory rebuild ---")
+    rows = []
+    watermarks = {source: EPOCH for source in SOURCES}
+    for source in SOURCES:
+        for doc in db.collection(source).stream():
+            data = doc.to_dict()
+            rows.append(directory_row(source, doc.id, data))
+            watermarks[source] = _newest(watermarks[source], data)
+    rows = sort_rows(rows)
+    written = write_views(db, rows, page_size=page_size)
+    _write_watermarks(db, watermarks, 'full')
+    print(f"✅ Wrote {written} page(s) for {len(rows)} user(s) across {len(VIEWS)} view(s).")
+    return len(rows)
+
+
+def _live_user_keys(db):
+    """Returns (source, id) for every guest and admin, from ID-only listings."""
+    return {(source, doc.id) for source in SOURCES for doc in db.collection(source).select([]).stream()}
+
+
+def refresh_directory(db, page_size=PAGE_SIZE):
+    """
+    Reads only guests and admins updated since their watermarks, merges them
+    into the rows of the stored 'all' view and rewrites just the pages whose
+    content changed. A changed name can shift every later page of a view.
+    Deleting a guest or admin leaves no updatedAt behind, so every run also
+    drops rows whose document no longer appears in an ID-only listing.
+    """
+    watermarks = _read_watermarks(db)
+    print("\n--- 📇 Incremental user directory refresh ---")
+    changed = {}
+    for source in SOURCES:
+        query = db.collection(source).where('updatedAt', '>', watermarks[source]).order_by('updatedAt')
+        for doc in query.stream():
+            data = doc.to_dict()
+            changed[(source, doc.id)] = directory_row(source, doc.id, data)
+            watermarks[source] = _newest(watermarks[source], data)
+
+    stored_pages = {view: read_view_pages(db, view) for view in VIEWS}
+    view_docs = db.get_all([db.collection(DIRECTORY_COLLECTION).document(view) for view in VIEWS])
+    if not stored_pages['all'] or not all(snapshot.exists for snapshot in view_docs):
+        print("🟡 No directory found; running a full rebuild instead.")
+        return rebuild_directory(db, page_size)
+
+    rows = {(row['source'], row['id']): row
+            for index in sorted(stored_pages['all']) for row in stored_pages['all'][index]}
+    removed = set(rows) - _live_user_keys(db) - set(changed)
+    if not changed and not removed:
+        touch_views(db)
+        _write_watermarks(db, watermarks, 'incremental')
+        print("🟡 No guests or admins changed since the last run; marked the directory as current.")
+        return 0
+
+    for key in removed:
+        del rows[key]
+    rows.update(changed)
+    written = write_views(db, sort_rows(rows.values()), stored_pages, page_size)
+    _write_watermarks(db, watermarks, 'incremental')
+    print(f"✅ Applied {len(changed)} changed and {len(removed)} deleted user(s); rewrote {written} page(s).")
+    return len(changed) + len(removed)
+
+
+def main(args):
+    db = initialize_firebase()
+    if not db:
+        return
+    try:
+        if args.full:
+            rebuild_directory(db, args.page_size)
+        else:
+            refresh_directory(db, args.page_size)
+    except Exception as e:
+        print(f"❌ An error occurred while building the user directory: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Materialize the paginated user directory for the ministry report.")
+    parser.add_argument('--full', action='store_true', help='Rebuild from every guest and admin.')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Users per page document.')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    run_entry_point(lambda: main(args), 'user_directory', args)